@@ -24,35 +24,299 @@ AUTHORS:
 # http://www.gnu.org/licenses/
 #*****************************************************************************
 
-import string
+import random
+
+import logiccnf
+import logiccount
+import logicequiv
+import logiceval
+import logiclex
+import logicmin
+import logicparser
+from logiccache import LRUCache, normalize
+import logicsat
+import logictable
 
 #constants
 tok_list = ['OPAREN', 'CPAREN', 'AND', 'OR', 'NOT', 'IFTHEN', 'IFF']
 bin_list = ['AND', 'OR', 'IFTHEN', 'IFF']
+tree_ops = {'AND': '&', 'OR': '|', 'IFTHEN': '->', 'IFF': '<->'}
 operators = '()&|!<->'
-#variables
-vars = {}
-vars_order = []
+lex_ops = dict(zip(['(', ')', '&', '|', '!', '->', '<->'], tok_list))
 
-class SymbolicLogic:
+#Statements made by SymbolicLogic.statement, keyed by the normalized string
+statement_cache = LRUCache(1024)
+
+class EvalContext:
+    r"""
+    The variables of a logic expression and their current values.
+
+    A context is carried explicitly through :func:`tokenize`, which
+    records the variables it finds, and through :func:`eval` and the
+    functions it calls, which look the variables up.  Nothing is kept
+    in module variables, so separate contexts can be used at the same
+    time, for instance from several threads.
+
+    INPUT:
+
+    - ``vars`` -- (default: empty) a dictionary with the variable names
+      and their current boolean value, ``'True'`` or ``'False'``.
+    - ``vars_order`` -- (default: empty) a list of the variable names in
+      the order they were found.
+
+    EXAMPLES::
+
+        sage: from sage.logic.logic import EvalContext
+        sage: ctx = EvalContext()
+        sage: toks = ['OPAREN']
+        sage: sage.logic.logic.tokenize("a|!b", toks, ctx)
+        sage: ctx.vars_order
+        ['a', 'b']
+        sage: ctx.vars['b'] = 'True'
+        sage: sage.logic.logic.eval(toks, ctx)
+        'False'
+    """
+    def __init__(self, vars=None, vars_order=None):
+        r"""
+        This function initializes the data fields. See
+        :class:`EvalContext` for full documentation.
+
+        EXAMPLES::
+
+            sage: from sage.logic.logic import EvalContext
+            sage: ctx = EvalContext({'a': 'True'}, ['a'])
+            sage: ctx.vars, ctx.vars_order
+            ({'a': 'True'}, ['a'])
+        """
+        if(vars is None):
+            vars = {}
+        if(vars_order is None):
+            vars_order = []
+        self.vars = vars
+        self.vars_order = vars_order
+
+class _FrozenDict(dict):
+    r"""
+    A dictionary that cannot be changed, used for the variables of a
+    statement.
+
+    EXAMPLES::
+
+        sage: d = sage.logic.logic._FrozenDict({'a': 'False'})
+        sage: d['a'] = 'True'
+        Traceback (most recent call last):
+        ...
+        TypeError: statements cannot be modified
+    """
+    def _immutable(self, *args, **kwds):
+        r"""
+        Raise a ``TypeError``.
+
+        EXAMPLES::
+
+            sage: sage.logic.logic._FrozenDict().clear()
+            Traceback (most recent call last):
+            ...
+            TypeError: statements cannot be modified
         """
+        raise TypeError('statements cannot be modified')
+
+    __setitem__ = __delitem__ = clear = pop = popitem = setdefault = update = _immutable
+
+    def __reduce__(self):
+        r"""
+        Return the data needed to pickle or copy this dictionary.
+
         EXAMPLES::
-        
+
+            sage: import copy
+            sage: copy.deepcopy(sage.logic.logic._FrozenDict({'a': 'False'}))
+            {'a': 'False'}
+        """
+        return (_FrozenDict, (dict(self),))
+
+class Prover:
+    r"""
+    A solver session for one statement, answering the questions of
+    :meth:`SymbolicLogic.prove` under assumptions on its variables.
+
+    The statement is encoded by :func:`sage.logic.logiccnf.tseitin` once,
+    into a :class:`sage.logic.logicsat.Solver` that is kept for the life
+    of the session.  Each query passes its assumptions to the solver
+    instead of adding clauses, so the clauses learned by earlier queries
+    stay valid and speed up the later ones.
+
+    A session is not safe to share between threads; each thread should
+    make its own with :meth:`SymbolicLogic.prover`.
+
+    INPUT:
+
+    - ``statement`` -- a statement created by
+      :meth:`SymbolicLogic.statement`: the tokens, vars and vars_order.
+
+    EXAMPLES::
+
+        sage: from sage.logic.logic import Prover
+        sage: log = SymbolicLogic()
+        sage: p = Prover(log.statement("(a->b)&(b->c)"))
+        sage: p.prove({'a': True})[0]
+        'contingent'
+        sage: p.prove({'a': True, 'c': False})[0]
+        'contradiction'
+        sage: p.prove(['!c', 'a'])[0]
+        'contradiction'
+    """
+    def __init__(self, statement):
+        r"""
+        This function initializes the data fields. See :class:`Prover`
+        for full documentation.
+
+        EXAMPLES::
+
+            sage: from sage.logic.logic import Prover
             sage: log = SymbolicLogic()
-            sage: s = log.statement("a&b|!(c|a)")
-            sage: t = log.truthtable(s)
-            sage: log.print_table(t)
-            a     | b     | c     | value |
-            --------------------------------
-            False | False | False | True  |
-            False | False | True  | False |
-            False | True  | False | True  |
-            False | True  | True  | False |
-            True  | False | False | False |
-            True  | False | True  | False |
-            True  | True  | False | True  |
-            True  | True  | True  | True  |
+            sage: Prover(log.statement("a|b")).vars_order()
+            ('a', 'b')
+        """
+        toks, vars, vars_order = statement
+        self.__tree = parse_toks(toks)
+        clauses, root, nvars = logiccnf.tseitin(self.__tree, vars_order)
+        self.__vars_order = tuple(vars_order)
+        self.__index = dict([(vars_order[i], i + 1) for i in range(len(vars_order))])
+        self.__root = root
+        self.__solver = logicsat.Solver(nvars)
+        for c in clauses:
+            self.__solver.add_clause(c)
+
+    def vars_order(self):
+        r"""
+        Return the variables of the statement in the order they were
+        found.
+
+        EXAMPLES::
+
+            sage: log = SymbolicLogic()
+            sage: log.prover(log.statement("b&!a")).vars_order()
+            ('b', 'a')
+        """
+        return self.__vars_order
+
+    def conflicts(self):
+        r"""
+        Return the number of conflicts met by all the queries so far,
+        which is the number of clauses learned.
+
+        EXAMPLES::
+
+            sage: log = SymbolicLogic()
+            sage: p = log.prover(log.statement("a|!a"))
+            sage: p.conflicts()
+            0
         """
+        return self.__solver.conflicts
+
+    def prove(self, assumptions=(), rounds=0, seed=None):
+        r"""
+        This function decides whether the statement is a tautology, a
+        contradiction or neither among the assignments that agree with
+        ``assumptions``.
+
+        If ``rounds`` is positive, the statement is first evaluated on
+        random assignments by :func:`sage.logic.logiceval.falsify`, and
+        the solver is only asked for the witness or counterexample that
+        these did not give.  A contingent statement is then usually
+        decided without the solver.
+
+        INPUT:
+
+        - ``assumptions`` -- (default: ``()``) either a dictionary
+          assigning ``True`` or ``False`` to some variables, or a sequence
+          of variable names, each meaning that the variable is true, or
+          preceded by ``!`` that it is false.
+        - ``rounds`` -- (default: 0) the number of rounds of random
+          assignments tried before the solver.
+        - ``seed`` -- (default: ``None``) the seed of the random
+          assignments.
+
+        OUTPUT:
+
+        - Returns the tuple ``(result, witness, counterexample)`` of
+          :meth:`SymbolicLogic.prove`, where ``witness`` and
+          ``counterexample`` agree with ``assumptions``.
+
+        EXAMPLES::
+
+            sage: log = SymbolicLogic()
+            sage: p = log.prover(log.statement("a->b"))
+            sage: p.prove(['!a'])
+            ('tautology', {'a': False, 'b': False}, None)
+            sage: p.prove({'a': True})
+            ('contingent', {'a': True, 'b': True}, {'a': True, 'b': False})
+            sage: p.prove(rounds=1, seed=0)
+            ('contingent', {'a': True, 'b': True}, {'a': True, 'b': False})
+
+        Assumptions on unknown variables are an error::
+
+            sage: p.prove(['c'])
+            Traceback (most recent call last):
+            ...
+            KeyError: 'c'
+        """
+        if(isinstance(assumptions, dict)):
+            lits = [(self.__index[v], -self.__index[v])[not value]
+                    for v, value in assumptions.items()]
+        else:
+            lits = []
+            for a in assumptions:
+                if(a.startswith('!')):
+                    lits.append(-self.__index[a[1:]])
+                else:
+                    lits.append(self.__index[a])
+        solver = self.__solver
+        vars_order = self.__vars_order
+        models = [None, None]
+        fixed = dict([(vars_order[abs(l) - 1], l > 0) for l in lits])
+        if(rounds > 0 and len(fixed) == len(set(lits))):
+            rng = random.Random(seed)
+            tree = self.__tree
+            for i in range(rounds):
+                if(models[0] is None):
+                    models[0] = logiceval.falsify(['~', tree, None], vars_order, rng, fixed=fixed)
+                if(models[1] is None):
+                    models[1] = logiceval.falsify(tree, vars_order, rng, fixed=fixed)
+        roots = (self.__root, -self.__root)
+        for k in range(2):
+            if(models[k] is None and solver.solve(lits + [roots[k]])):
+                model = solver.model()
+                models[k] = dict([(vars_order[i], model[i] > 0)
+                                  for i in range(len(vars_order))])
+        if(models[1] is None):
+            result = 'tautology'
+        elif(models[0] is None):
+            result = 'contradiction'
+        else:
+            result = 'contingent'
+        return result, models[0], models[1]
+
+class SymbolicLogic:
+    """
+    EXAMPLES::
+    
+        sage: log = SymbolicLogic()
+        sage: s = log.statement("a&b|!(c|a)")
+        sage: t = log.truthtable(s)
+        sage: log.print_table(t)
+        a     | b     | c     | value |
+        --------------------------------
+        False | False | False | True  |
+        False | False | True  | False |
+        False | True  | False | True  |
+        False | True  | True  | False |
+        True  | False | False | False |
+        True  | False | True  | False |
+        True  | True  | False | True  |
+        True  | True  | True  | True  |
+    """
     def statement(self, s):
         r"""
         This function returns a token list to be further manipulated
@@ -62,16 +326,17 @@ class SymbolicLogic:
         
         - ``self`` -- the calling object.
         - ``s`` -- a string containing the logic expression to be manipulated.
-        - ``global vars`` -- a dictionary with the variable names and their current boolean value.
-        - ``global vars_order`` -- a list of the variable names in the order they were found.
         
         OUTPUT:
         
-        Returns a list containing the following:
+        Returns a statement, a tuple containing the following:
         
-        1. A list of tokens
+        1. A tuple of tokens
         2. A dictionary of varaiable/value pairs (where the value is 'True' or 'False')
-        3. List of the variable names in the order they were found
+        3. Tuple of the variable names in the order they were found
+
+        A statement cannot be modified, so it can be shared freely, for
+        instance between threads.
         
         EXAMPLES:
         
@@ -87,12 +352,15 @@ class SymbolicLogic:
         ::
         
             sage: s2 = log.statement("!((!(a&b)))")
+            sage: s2
+            (('OPAREN', 'NOT', 'OPAREN', 'OPAREN', 'NOT', 'OPAREN', 'a', 'AND', 'b', 'CPAREN', 'CPAREN', 'CPAREN', 'CPAREN'), {'a': 'False', 'b': 'False'}, ('a', 'b'))
         
         It is an error to use invalid variable names::
         
             sage: s = log.statement("3fe & @q")
-            Invalid variable name:  3fe
-            Invalid variable name:  @q
+            invalid variable name '3fe' at 0:3
+            invalid variable name '@q' at 6:8
+            Malformed Statement
         
         It is an error to use invalid syntax::
         
@@ -100,19 +368,30 @@ class SymbolicLogic:
             Malformed Statement
             sage: s = log.statement("a&((b)")
             Malformed Statement
+
+        Statements are kept in ``statement_cache``, a
+        :class:`sage.logic.logiccache.LRUCache` keyed by ``s`` with its
+        whitespace normalized, so making a statement again is a lookup::
+
+            sage: log.statement("a & b") is log.statement("a  &  b")
+            True
         """
-        global vars, vars_order
-        toks, vars, vars_order = ['OPAREN'], {}, []
-        tokenize(s, toks)
-        statement = [toks, vars, vars_order]
+        key = normalize(s)
+        statement = statement_cache.get(key)
+        if(statement is not None):
+            return statement
+        toks, context = ['OPAREN'], EvalContext()
+        tokenize(s, toks, context)
         try:                           #verify the syntax
-            eval(toks)
+            parse_toks(toks)
         except(KeyError, RuntimeError):
             print 'Malformed Statement'
             return []
+        statement = (tuple(toks), _FrozenDict(context.vars), tuple(context.vars_order))
+        statement_cache.put(key, statement)
         return statement
     
-    def truthtable(self, statement, start=0, end=-1):
+    def truthtable(self, statement, start=0, end=-1, algorithm='compiled'):
         r"""
         This function returns a truthtable corresponding to
         the given statement.
@@ -120,8 +399,8 @@ class SymbolicLogic:
         INPUT:
         
         - ``self`` -- the calling object: not used.
-        - ``statement`` -- a list of 3 items, the tokens and two global
-          variables vars and vars_order.
+        - ``statement`` -- a statement created by :meth:`statement`:
+          the tokens, vars and vars_order.
         - ``start`` -- an integer representing the row of the truth
           table from which to start initialized to 0 which
           is the first row when all the variables are
@@ -130,15 +409,28 @@ class SymbolicLogic:
           truthtable to be created initialized to -1 which
           if left is converted to the last row of the
           full table.
-        - ``global vars`` -- a dictionary with the variable names and
-          their current boolean value.
-        - ``global vars_order`` -- a list of the variable names in
-          the order they were found.
+        - ``algorithm`` -- (default: ``'compiled'``) how the value
+          column is computed:
+
+          - ``'compiled'`` -- the statement is compiled once by
+            :meth:`compile` and evaluated row by row.
+          - ``'bitmask'`` -- every row is evaluated at once with
+            integer bitmasks by :func:`sage.logic.logiceval.eval_bitmask`.
+          - ``'numpy'`` -- the rows are evaluated in chunks of NumPy
+            arrays by :func:`sage.logic.logiceval.eval_chunks`, which
+            keeps memory bounded for very large tables.
+          - ``'gray'`` -- the rows are walked in Gray code order by
+            :func:`sage.logic.logiceval.eval_gray`, updating only the
+            part of the statement that depends on the one variable
+            changed between rows.
+
         
         OUTPUT:
         
         - Returns the truthtable (a 2-d array with the creating statement
-          tacked on the front) corresponding to the statement.
+          tacked on the front) corresponding to the statement. Its
+          columns are the variables in the order of vars_order followed
+          by the value; ``statement`` itself is not modified.
         
         EXAMPLES:
         
@@ -155,8 +447,22 @@ class SymbolicLogic:
         ::
         
             sage: s2 = log.truthtable(s, 1, 5); s2
-            [[['OPAREN', 'a', 'AND', 'b', 'OR', 'NOT', 'OPAREN', 'c', 'OR', 'a', 'CPAREN', 'CPAREN'], {'a': 'False', 'c': 'True', 'b': 'False'}, ['a', 'b', 'c']], ['False', 'False', 'True', 'False'], ['False', 'True', 'False', 'True'], ['False', 'True', 'True', 'True'], ['True', 'False', 'False', 'False']]
+            [(('OPAREN', 'a', 'AND', 'b', 'OR', 'NOT', 'OPAREN', 'c', 'OR', 'a', 'CPAREN', 'CPAREN'), {'a': 'False', 'c': 'False', 'b': 'False'}, ('a', 'b', 'c')), ['False', 'False', 'True', 'False'], ['False', 'True', 'False', 'True'], ['False', 'True', 'True', 'False'], ['True', 'False', 'False', 'False']]
         
+        The bitmask algorithm gives the same table much faster when
+        there are many variables.
+
+        ::
+
+            sage: log.truthtable(s, algorithm='bitmask') == log.truthtable(s)
+            True
+
+        Rows of tables with many variables can be given as long
+        integers::
+
+            sage: s = log.statement('&'.join(['x%d' % i for i in range(69)]) + '|x69')
+            sage: [r[-1] for r in log.truthtable(s, 2**69, 2**69 + 3, 'gray')[1:]]
+            ['False', 'True', 'False']
         
         There should be no errors if the statement did not return
         any errors.
@@ -167,24 +473,248 @@ class SymbolicLogic:
             exponential time function requiring `O(2^n)` time, where
             `n` is the number of variables in the logic expression.
         """
-        global vars, vars_order
+        return list(self.iter_truthtable(statement, start, end, algorithm))
+
+    def iter_truthtable(self, statement, start=0, end=-1, algorithm='compiled'):
+        r"""
+        This function iterates over the truthtable corresponding to
+        the given statement, computing each row only when it is asked
+        for.
+
+        INPUT:
+
+        The input is the same as for :meth:`truthtable`.
+
+        OUTPUT:
+
+        - Returns an iterator whose first item is ``statement`` and whose
+          other items are the rows that :meth:`truthtable` would return,
+          in the same order.
+
+        EXAMPLES:
+
+        The rows come one at a time, so very large tables can be paged
+        through or printed without being held in memory.
+
+        ::
+
+            sage: log = SymbolicLogic()
+            sage: s = log.statement("a&b|!(c|a)")
+            sage: t = log.iter_truthtable(s, 1, 5)
+            sage: log.print_table(t)
+            a     | b     | c     | value |
+            --------------------------------
+            False | False | True  | False |
+            False | True  | False | True  |
+            False | True  | True  | False |
+            True  | False | False | False |
+
+            sage: t = log.iter_truthtable(log.statement("a|b"))
+            sage: t.next()[0]
+            ('OPAREN', 'a', 'OR', 'b', 'CPAREN')
+            sage: t.next()
+            ['False', 'False', 'False']
+        """
         toks, vars, vars_order = statement
         if(end == -1):
-            end = 2 ** len(vars)
-        table = [statement]
-        keys = vars_order
-        keys.reverse()
-        for i in range(start,end):
-            j = 0
-            row = []
-            for key in keys:
-                bit = get_bit(i, j)
-                vars[key] = bit
-                j += 1
-                row.insert(0, bit)
-            row.append(eval(toks))
-            table.append(row)
-        return table
+            end = 2 ** len(vars_order)
+        values = logiceval.column(parse_toks(toks), vars_order, start, end, algorithm)
+        yield statement
+        shifts = range(len(vars_order) - 1, -1, -1)
+        for i in logiceval.row_numbers(start, end):
+            row = [(i >> j) & 1 == 1 for j in shifts]
+            yield [str(b) for b in row] + [str(values.next())]
+
+    def parallel_truthtable(self, statement, start=0, end=-1, processes=None):
+        r"""
+        This function builds the truthtable of the given statement
+        with a pool of worker processes.
+
+        INPUT:
+
+        - ``self`` -- the calling object: not used.
+        - ``statement`` -- a statement created by :meth:`statement`:
+          the tokens, vars and vars_order.
+        - ``start`` -- (default: 0) an integer representing the first row.
+        - ``end`` -- (default: -1) an integer representing the row after
+          the last one, where -1 is converted to the last row of the
+          full table.
+        - ``processes`` -- (default: ``None``) the number of worker
+          processes; ``None`` means one per CPU.
+
+        OUTPUT:
+
+        - Returns a :class:`~sage.logic.logictable.TruthTable` whose
+          columns are in the order of the statement's vars_order. The
+          rows are split among the workers as described in
+          :func:`sage.logic.logictable.parallel_truthtable`.
+
+        EXAMPLES::
+
+            sage: log = SymbolicLogic()
+            sage: s = log.statement("a&b|!(c|a)")
+            sage: log.parallel_truthtable(s, 1, 5, processes=2)
+            a      b      c      value
+            False  False  True   False
+            False  True   False  True
+            False  True   True   False
+            True   False  False  False
+        """
+        return logictable.parallel_truthtable(parse_toks(statement[0]),
+                                              list(statement[2]), start,
+                                              end, processes)
+
+    def multi_truthtable(self, statements, start=0, end=-1, values=None):
+        r"""
+        This function returns the truth table of several statements, with
+        one value column per statement, computed in a single pass over
+        the rows.
+
+        The statements are parsed into trees whose common subformulas
+        are shared, and :func:`sage.logic.logictable.multi_truthtable`
+        evaluates them together, so each row and each common subformula
+        is computed once however many statements there are.
+
+        INPUT:
+
+        - ``self`` -- the calling object: not used.
+        - ``statements`` -- a list of statements created by
+          :meth:`statement`.
+        - ``start`` -- (default: 0) the first row.
+        - ``end`` -- (default: -1) the row after the last one; -1 means
+          the last row.
+        - ``values`` -- (default: ``None``) the names of the value
+          columns; if ``None``, ``value1``, ``value2`` and so on.
+
+        OUTPUT:
+
+        - Returns a :class:`sage.logic.logictable.TruthTable` whose
+          variables are those of the statements in the order they first
+          appear.
+
+        EXAMPLES::
+
+            sage: log = SymbolicLogic()
+            sage: s1 = log.statement("a&b")
+            sage: s2 = log.statement("(a&b)->c")
+            sage: s3 = log.statement("c|a")
+            sage: log.multi_truthtable([s1, s2, s3])
+            a      b      c      value1  value2  value3
+            False  False  False  False   True    False
+            False  False  True   False   True    True
+            False  True   False  False   True    False
+            False  True   True   False   True    True
+            True   False  False  False   True    True
+            True   False  True   False   True    True
+            True   True   False  True    False   True
+            True   True   True   True    True    True
+        """
+        vars_order = []
+        seen = set()
+        for statement in statements:
+            for var in statement[2]:
+                if(var not in seen):
+                    seen.add(var)
+                    vars_order.append(var)
+        trees = [parse_toks(statement[0]) for statement in statements]
+        return logictable.multi_truthtable(trees, vars_order, start, end, values)
+
+    def compile(self, statement):
+        r"""
+        This function compiles ``statement`` into a reusable evaluator.
+
+        The token list is parsed once into a parse tree of the form used
+        by :mod:`sage.logic.logicparser`, and the tree is compiled into
+        straight-line code by :func:`sage.logic.logiceval.compile_tree`.  This is
+        what :meth:`truthtable` runs for every row.
+
+        INPUT:
+
+        - ``self`` -- the calling object: not used.
+        - ``statement`` -- a statement created by :meth:`statement`:
+          the tokens, vars and vars_order.
+
+        OUTPUT:
+
+        - Returns a function that takes a list of booleans, one for each
+          variable of ``statement`` in the order of its vars_order, and
+          returns ``True`` or ``False``.
+
+        EXAMPLES::
+
+            sage: log = SymbolicLogic()
+            sage: s = log.statement("a&b|!(c|a)")
+            sage: f = log.compile(s)
+            sage: f([True, True, False])
+            True
+            sage: f([True, False, False])
+            False
+
+        Binary operators are applied from left to right, just as
+        :func:`eval` does::
+
+            sage: f = log.compile(log.statement("a|b&c"))
+            sage: f([True, False, False])
+            False
+        """
+        return logiceval.compile_tree(parse_toks(statement[0]), statement[2])
+
+    def evaluate(self, statement, assignments, columns=None):
+        r"""
+        This function evaluates ``statement`` on a batch of assignments of
+        its variables.
+
+        The assignments are bit-sliced by
+        :func:`sage.logic.logiceval.eval_batch`, or evaluated column by
+        column by :func:`sage.logic.logiceval.eval_array` if they are a
+        NumPy array, so large batches take a few operations per node of
+        the statement rather than a call of :func:`eval` per assignment.
+
+        INPUT:
+
+        - ``self`` -- the calling object: not used.
+        - ``statement`` -- a statement created by :meth:`statement`:
+          the tokens, vars and vars_order.
+        - ``assignments`` -- an iterable of assignments, each either a
+          dictionary mapping the variable names to their values or a
+          sequence of values in the order of ``columns``, such as the
+          rows of a ``csv.reader``; or a two-dimensional NumPy array with
+          one row per assignment.  A value is ``True``, ``False``, ``1``,
+          ``0`` or the string of one of them.
+        - ``columns`` -- (default: ``None``) the list of the names of the
+          values of a sequence or the columns of an array, which may
+          include names that are not variables of ``statement``; if
+          ``None``, the vars_order of ``statement``.
+
+        OUTPUT:
+
+        - Returns the pair ``(bits, count)`` where ``count`` is the number
+          of assignments and bit ``k`` of the integer ``bits`` is the
+          value of ``statement`` for the ``k``-th, or a NumPy boolean
+          array of the values if ``assignments`` is an array.
+
+        EXAMPLES::
+
+            sage: log = SymbolicLogic()
+            sage: s = log.statement("admin | (owner & !locked)")
+            sage: bits, count = log.evaluate(s, [{'admin': False, 'owner': True, 'locked': False},
+            ....:                                {'admin': False, 'owner': True, 'locked': True},
+            ....:                                {'admin': True, 'owner': False, 'locked': True}])
+            sage: bin(bits), count
+            ('0b101', 3)
+
+        Rows of a CSV file name their values in the header::
+
+            sage: import csv, StringIO
+            sage: f = StringIO.StringIO("user,owner,admin,locked\nann,1,0,0\nbob,0,0,1\n")
+            sage: reader = csv.reader(f)
+            sage: log.evaluate(s, reader, reader.next())
+            (1, 2)
+        """
+        tree = parse_toks(statement[0])
+        if(hasattr(assignments, 'ndim')):
+            return logiceval.eval_array(tree, list(statement[2]), assignments, columns)
+        return logiceval.eval_batch(tree, list(statement[2]), assignments, columns)
 
     def print_table(self, table):
         r"""
@@ -195,10 +725,8 @@ class SymbolicLogic:
         
         - ``self`` -- the calling object: not used.
         - ``table`` -- an object created by :meth:`truthtable`
-          that contains variable values and the
-          corresponding evaluation of the statement.
-        - ``global vars_order`` -- a list of the variable names in
-          the order they were found.
+          or :meth:`iter_truthtable` that contains variable values
+          and the corresponding evaluation of the statement.
         
         OUTPUT:
         
@@ -232,24 +760,21 @@ class SymbolicLogic:
         
             sage: t = log.truthtable(s, 1, 5)
             sage: log.print_table(t)
-            a     | b     | c     | value | value |
-            ----------------------------------------
-            False | False | False | True  | True  |
-            False | False | True  | False | False |
-            False | False | True  | True  | False |
-            False | True  | False | False | True  |
+            a     | b     | c     | value |
+            --------------------------------
+            False | False | True  | False |
+            False | True  | False | True  |
+            False | True  | True  | False |
+            True  | False | False | False |
         
         There should be no errors if the statement did not return
         any errors.
         """
-        statement = table[0]
-        del table[0]
-        vars_order = statement[2]
+        table = iter(table)
+        statement = table.next()
         vars_len = []
         line = s = ""
-        vars_order.reverse()
-        vars_order.append('value')
-        for var in vars_order:
+        for var in list(statement[2]) + ['value']:
             vars_len.append(len(var))
             s = var + ' '
             while(len(s) < len('False ')):
@@ -306,7 +831,7 @@ class SymbolicLogic:
             sage: d=log.statement("c&d")
             sage: f=log.combine(s,d)
             sage: f
-            [['OPAREN',
+            (('OPAREN',
               'OPAREN',
               'a',
               'AND',
@@ -318,9 +843,9 @@ class SymbolicLogic:
               'AND',
               'd',
               'CPAREN',
-              'CPAREN'],
+              'CPAREN'),
             {'a': 'False', 'b': 'False', 'c': 'False', 'd': 'False'},
-            ['a', 'b', 'c', 'd']]
+            ('a', 'b', 'c', 'd'))
         
         We can also use a mix of strings and statement objects.
         
@@ -330,7 +855,7 @@ class SymbolicLogic:
             sage: s=log.statement("a&b")
             sage: f=log.combine(s,"c&d")
             sage: f
-            [['OPAREN',
+            (('OPAREN',
             'OPAREN',
             'a',
             'AND',
@@ -342,57 +867,393 @@ class SymbolicLogic:
             'AND',
             'd',
             'CPAREN',
-            'CPAREN'],
+            'CPAREN'),
             {'a': 'False', 'b': 'False', 'c': 'False', 'd': 'False'},
-            ['a', 'b', 'c', 'd']]
+            ('a', 'b', 'c', 'd'))
+        """
+        return self.combine_all([statement1, statement2])
+
+    def combine_all(self, statements, operator='OR'):
+        r"""
+        This function returns a statement that combines all the
+        ``statements`` with the binary ``operator``.
+
+        The tokens of the inputs are copied once into the new statement
+        and their variables are merged with one dictionary, so the time
+        taken is linear in the total size of the inputs.  For the
+        associative operators ``'OR'``, ``'AND'`` and ``'IFF'`` the
+        inputs are grouped into a balanced tree of parentheses, so the
+        parse tree of the result has logarithmic depth above the inputs,
+        while ``'IFTHEN'`` is applied from left to right.  The parse tree
+        of the result is interned by :func:`parse_toks`, so the subtree
+        of each input is the very tree of that input.
+
+        INPUT:
+
+        - ``self`` -- the calling object: not used.
+        - ``statements`` -- an iterable of statements from
+          :meth:`statement` or strings to be passed to it.
+        - ``operator`` -- (default: ``'OR'``) one of ``'OR'``, ``'AND'``,
+          ``'IFTHEN'`` or ``'IFF'``.
+
+        OUTPUT:
+
+        - Returns a new statement whose variables are those of the
+          inputs, in the order they first appear.
+
+        EXAMPLES::
+
+            sage: log = SymbolicLogic()
+            sage: rules = [log.statement("a&b"), "b->c", log.statement("!d")]
+            sage: f = log.combine_all(rules, 'AND')
+            sage: f[0]
+            ('OPAREN', 'OPAREN', 'a', 'AND', 'b', 'CPAREN', 'AND', 'OPAREN', 'OPAREN', 'b', 'IFTHEN', 'c', 'CPAREN', 'AND', 'OPAREN', 'NOT', 'd', 'CPAREN', 'CPAREN', 'CPAREN')
+            sage: f[2]
+            ('a', 'b', 'c', 'd')
+            sage: sage.logic.logic.parse_toks(f[0])[1] is sage.logic.logic.parse_toks(rules[0][0])
+            True
+            sage: log.combine_all(["a", "b", "c"], 'IFTHEN')[0]
+            ('OPAREN', 'OPAREN', 'a', 'CPAREN', 'IFTHEN', 'OPAREN', 'b', 'CPAREN', 'IFTHEN', 'OPAREN', 'c', 'CPAREN', 'CPAREN')
+
+        Ten thousand statements combine at once::
+
+            sage: f = log.combine_all(["x%d" % i for i in range(10000)])
+            sage: len(f[2]), len(log.truthtable(f, 0, 2))
+            (10000, 3)
         """
-        x = statement1
-        y = statement2
-        if(type(x) == list and type(y) == list and len(x) == 3 and len(y) == 3):
-            statement3=[['OPAREN'],x[1],x[2]]
-            for i in range(len(x[0])):
-                statement3[0].append(x[0][i])
-            #statement3[0].append('CPAREN')
-            statement3[0].append('OR')
-            #statement3[0].append('OPAREN')
-            for i in range(len(y[0])):
-                statement3[0].append(y[0][i])
-            #statement3[0].append('CPAREN')
-            statement3[0].append('CPAREN')
-            for key in y[1]:
-                statement3[1][key]=y[1][key]
-            for i in range(len(y[2])):
-                statement3[2].append(y[2][i])
-            statement3[2]=sorted(list(set(statement3[2])))
-            return statement3
-        elif(type(x) == str and type(y) == str):
-            z="("+ x + ")|(" + y + ")"
-            return self.statement(z)
-        elif(type(x) == list and type(y) == str and len(x) == 3):
-            y=self.statement(y)
-            return self.combine(x,y)
-        elif(type(y) == list and type(x) == str and len(y) == 3):
-            x=self.statement(x)
-            return self.combine(x,y)
+        if(operator not in bin_list):
+            raise ValueError("operator must be 'OR', 'AND', 'IFTHEN' or 'IFF'")
+        groups = []
+        vars = {}
+        vars_order = []
+        for x in statements:
+            if(type(x) == str):
+                x = self.statement(x)
+            if(not is_statement(x)):
+                raise TypeError('Malformed Inputs, combine accepts only strings and statement objects')
+            groups.append(tuple(x[0]))
+            for var in x[2]:
+                if(var not in vars):
+                    vars_order.append(var)
+            vars.update(x[1])
+        if(len(groups) == 0):
+            raise ValueError('combine needs at least one statement')
+        toks = []
+        if(operator == 'IFTHEN'):
+            toks.append('OPAREN')
+            for i in range(len(groups)):
+                if(i > 0):
+                    toks.append(operator)
+                toks.extend(groups[i])
+            toks.append('CPAREN')
         else:
-            raise TypeError('Malformed Inputs, combine accepts only strings and statement objects')
-    def simplify(self, table):
+            _combine_toks(groups, 0, len(groups), operator, toks)
+        if(len(groups) == 1):
+            toks = list(groups[0])
+        return (tuple(toks), _FrozenDict(vars), tuple(vars_order))
+
+    def simplify(self, table, algorithm='auto'):
         r"""
-        .. TODO::
-		
-            implement the simplify function which calls
-            a c++ implementation of the ESPRESSO algorithm
-            to simplify the truthtable: probably Minilog
+        This function returns a statement in sum-of-products form with
+        the same truth table as ``table``, using as few products and then
+        as few literals as it can find.
+
+        INPUT:
+
+        - ``self`` -- the calling object: not used.
+        - ``table`` -- a statement created by :meth:`statement`, or a
+          truth table created by :meth:`truthtable`.  The rows missing
+          from a table created with ``start`` and ``end`` may take any
+          value.
+        - ``algorithm`` -- (default: ``'auto'``) passed to
+          :func:`sage.logic.logicmin.minimize`: ``'qm'`` for an exact
+          minimum by Quine-McCluskey, ``'espresso'`` for the faster
+          ESPRESSO heuristic, or ``'auto'`` to choose by the number of
+          variables.
+
+        OUTPUT:
+
+        - Returns a statement over the same variables, a disjunction of
+          conjunctions of variables and negated variables.
+
+        EXAMPLES::
+
+            sage: log = SymbolicLogic()
+            sage: s = log.statement("(a&b&c)|(a&b&!c)|(!a&c)")
+            sage: s2 = log.simplify(s)
+            sage: s2[0]
+            ('OPAREN', 'OPAREN', 'NOT', 'a', 'AND', 'c', 'CPAREN', 'OR', 'OPAREN', 'a', 'AND', 'b', 'CPAREN', 'CPAREN')
+            sage: log.truthtable(s2)[1:] == log.truthtable(s)[1:]
+            True
+
+        The rows left out of a partial truth table are free::
+
+            sage: log.simplify(log.truthtable(log.statement("a->b"), 1, 4))[0]
+            ('OPAREN', 'b', 'CPAREN')
+
+        Constant statements are written with their first variable::
+
+            sage: log.simplify(log.statement("a|!a|b"))[0]
+            ('OPAREN', 'a', 'OR', 'NOT', 'a', 'CPAREN')
         """
+        if(is_statement(table) and isinstance(table[1], dict)):
+            statement = table
+            vars_order = list(statement[2])
+            on = logiceval.eval_bitmask(parse_toks(statement[0]), vars_order)
+            dc = 0
+        else:
+            rows = iter(table)
+            statement = rows.next()
+            vars_order = list(statement[2])
+            n = len(vars_order)
+            on = known = 0
+            for row in rows:
+                k = int(''.join([str(int(x == 'True')) for x in row[:-1]]), 2)
+                known |= 1 << k
+                if(row[-1] == 'True'):
+                    on |= 1 << k
+            dc = ((1 << 2 ** n) - 1) & ~known
+        n = len(vars_order)
+        cubes = logicmin.minimize(on, dc, n, algorithm)
+        v = vars_order[0]
+        if(len(cubes) == 0):
+            toks = ['OPAREN', v, 'AND', 'NOT', v, 'CPAREN']
+        elif(cubes[0][0] == 0):
+            toks = ['OPAREN', v, 'OR', 'NOT', v, 'CPAREN']
+        else:
+            toks = ['OPAREN']
+            for mask, value in cubes:
+                lits = []
+                for m in range(n):
+                    if(mask >> (n - 1 - m) & 1):
+                        if(not value >> (n - 1 - m) & 1):
+                            lits.append('NOT')
+                        lits.extend([vars_order[m], 'AND'])
+                if(len(cubes) > 1 and len(lits) > 3):
+                    lits = ['OPAREN'] + lits[:-1] + ['CPAREN']
+                else:
+                    lits = lits[:-1]
+                toks.extend(lits + ['OR'])
+            toks[-1] = 'CPAREN'
+        return (tuple(toks), _FrozenDict(statement[1]), tuple(vars_order))
     
-    def prove(self, statement):
+    def prove(self, statement, assumptions=(), rounds=0, seed=None):
         r"""
-        .. TODO::
-        
-            implement a prove function which test to
-            see if the statement is a tautology or contradiction
-            by calling a c++ library TBD
+        This function decides whether ``statement`` is a tautology, a
+        contradiction or neither, without building its truth table.
+
+        The statement is converted to conjunctive normal form by
+        :func:`sage.logic.logiccnf.tseitin` and the solver of
+        :mod:`sage.logic.logicsat` is asked for an assignment making it
+        true and for one making it false.  To ask several questions about
+        the same statement, make a :class:`Prover` with :meth:`prover`
+        instead, which encodes it once and keeps what the solver learns.
+
+        INPUT:
+
+        - ``self`` -- the calling object: not used.
+        - ``statement`` -- a statement created by :meth:`statement`:
+          the tokens, vars and vars_order.
+        - ``assumptions`` -- (default: ``()``) the assumptions on the
+          variables under which to decide, as for :meth:`Prover.prove`.
+        - ``rounds`` -- (default: 0) the number of rounds of random
+          assignments tried before the solver, as by :meth:`quick_check`.
+        - ``seed`` -- (default: ``None``) the seed of the random
+          assignments.
+
+        OUTPUT:
+
+        - Returns the tuple ``(result, witness, counterexample)``.
+          ``result`` is ``'tautology'``, ``'contradiction'`` or
+          ``'contingent'``.  ``witness`` is a dictionary assigning
+          ``True`` or ``False`` to each variable that makes the statement
+          true, and ``counterexample`` one that makes it false; either is
+          ``None`` if there is no such assignment.
+
+        EXAMPLES::
+
+            sage: log = SymbolicLogic()
+            sage: log.prove(log.statement("a|!a"))
+            ('tautology', {'a': False}, None)
+            sage: log.prove(log.statement("a&!a"))
+            ('contradiction', None, {'a': True})
+            sage: result, witness, counterexample = log.prove(log.statement("a->b"))
+            sage: result
+            'contingent'
+            sage: counterexample
+            {'a': True, 'b': False}
+
+        Statements with many variables are no problem::
+
+            sage: s = log.statement('&'.join(['(x%d->x%d)' % (i, i + 1) for i in range(200)]) + '->(x0->x200)')
+            sage: log.prove(s)[0]
+            'tautology'
+        """
+        return Prover(statement).prove(assumptions, rounds, seed)
+
+    def quick_check(self, statement, rounds=4, seed=None):
+        r"""
+        This function looks for a counterexample to ``statement`` being a
+        tautology among random assignments of its variables.
+
+        The statement is evaluated on thousands of random assignments at
+        once by :func:`sage.logic.logiceval.quick_check`, which refutes
+        most statements that are not tautologies far faster than
+        :meth:`prove` or :meth:`truthtable`.  Finding no counterexample
+        proves nothing; :meth:`prove` decides.
+
+        INPUT:
+
+        - ``self`` -- the calling object: not used.
+        - ``statement`` -- a statement created by :meth:`statement`:
+          the tokens, vars and vars_order.
+        - ``rounds`` -- (default: 4) the largest number of batches of
+          ``sage.logic.logiceval.sample_width`` random assignments.
+        - ``seed`` -- (default: ``None``) the seed of the random
+          assignments, so that runs can be repeated.
+
+        OUTPUT:
+
+        - Returns a dictionary assigning ``True`` or ``False`` to each
+          variable that makes ``statement`` false, or ``None`` if none was
+          found.
+
+        EXAMPLES::
+
+            sage: log = SymbolicLogic()
+            sage: log.quick_check(log.statement("(a->b)->(!b->!a)")) is None
+            True
+            sage: s = log.statement("(a->b)->(b->a)")
+            sage: log.quick_check(s, seed=5)
+            {'a': False, 'b': True}
+            sage: log.quick_check(s, seed=5) == log.quick_check(s, seed=5)
+            True
         """
+        return logiceval.quick_check(parse_toks(statement[0]), list(statement[2]),
+                                     rounds, seed)
+
+    def prover(self, statement):
+        r"""
+        This function returns a :class:`Prover` session for
+        ``statement``, deciding it repeatedly under different
+        assumptions without encoding it again.
+
+        INPUT:
+
+        - ``self`` -- the calling object: not used.
+        - ``statement`` -- a statement created by :meth:`statement`:
+          the tokens, vars and vars_order.
+
+        EXAMPLES::
+
+            sage: log = SymbolicLogic()
+            sage: s = log.statement('&'.join(['(x%d->x%d)' % (i, i + 1) for i in range(100)]))
+            sage: p = log.prover(s)
+            sage: [p.prove(['x%d' % i, '!x%d' % (i + 10)])[0] for i in range(0, 90, 30)]
+            ['contradiction', 'contradiction', 'contradiction']
+            sage: p.prove(['x99', '!x20'])[0]
+            'contingent'
+        """
+        return Prover(statement)
+
+    def equivalent(self, statement1, statement2, seed=None, algorithm='sat'):
+        r"""
+        This function decides whether two statements take the same value
+        for every assignment of their variables, without building their
+        truth tables.
+
+        The statements are compared by
+        :func:`sage.logic.logicequiv.equivalent`: on random assignments
+        first, then by showing that no assignment tells them apart.
+
+        INPUT:
+
+        - ``self`` -- the calling object: not used.
+        - ``statement1``, ``statement2`` -- statements created by
+          :meth:`statement`.
+        - ``seed`` -- (default: ``None``) the seed of the random
+          assignments, for reproducible counterexamples.
+        - ``algorithm`` -- (default: ``'sat'``) ``'sat'`` or ``'bdd'``, as
+          for :func:`sage.logic.logicequiv.equivalent`.
+
+        OUTPUT:
+
+        - Returns ``(True, None)`` if the statements are equivalent, and
+          otherwise ``(False, counterexample)`` where ``counterexample``
+          is a dictionary assigning ``True`` or ``False`` to each variable
+          of the statements on which they differ.
+
+        EXAMPLES::
+
+            sage: log = SymbolicLogic()
+            sage: s = log.statement("(a->b)&(b->a)")
+            sage: log.equivalent(s, log.statement("(a&b)|(!a&!b)"))
+            (True, None)
+            sage: log.equivalent(s, log.statement("a|!b"), seed=1)
+            (False, {'a': True, 'b': False})
+        """
+        vars_order = list(statement1[2])
+        for var in statement2[2]:
+            if(var not in statement1[1]):
+                vars_order.append(var)
+        return logicequiv.equivalent(parse_toks(statement1[0]), parse_toks(statement2[0]),
+                                     vars_order, seed=seed, algorithm=algorithm)
+
+    def count_models(self, statement):
+        r"""
+        This function returns the number of rows of the truth table of
+        ``statement`` on which it is true, without building the table.
+
+        The models are counted by
+        :func:`sage.logic.logiccount.count_models`, which splits the
+        statement into independent parts and remembers the counts of
+        those it meets again, so statements with many variables can be
+        counted.
+
+        INPUT:
+
+        - ``self`` -- the calling object: not used.
+        - ``statement`` -- a statement created by :meth:`statement`:
+          the tokens, vars and vars_order.
+
+        OUTPUT:
+
+        - Returns the number of assignments of the variables of
+          ``statement`` that make it true.
+
+        EXAMPLES::
+
+            sage: log = SymbolicLogic()
+            sage: log.count_models(log.statement("a|b&c"))
+            3
+            sage: log.count_models(log.statement("a&!a"))
+            0
+
+        Statements with many variables are no problem::
+
+            sage: s = log.statement('&'.join(['(x%d->x%d)' % (i, i + 1) for i in range(200)]))
+            sage: log.count_models(s)
+            202
+        """
+        toks, vars, vars_order = statement
+        return logiccount.count_models(parse_toks(toks), list(vars_order))
+
+def is_statement(x):
+    r"""
+    This function is for internal use by :class:`SymbolicLogic`.
+    It returns ``True`` if ``x`` is a statement, that is, a tuple (or
+    a list, as made by older versions) of the tokens, vars and
+    vars_order.
+
+    EXAMPLES::
+
+        sage: log = SymbolicLogic()
+        sage: sage.logic.logic.is_statement(log.statement("a|b"))
+        True
+        sage: sage.logic.logic.is_statement("a|b")
+        False
+    """
+    return type(x) in (tuple, list) and len(x) == 3
 
 def get_bit(x, c):
     r"""
@@ -428,30 +1289,157 @@ def get_bit(x, c):
     else:
         return bits[c]
 
-def eval(toks):
+def _combine_toks(groups, first, last, operator, toks):
+    r"""
+    Append to ``toks`` the tokens combining ``groups[first:last]``, the
+    token tuples of statements, with ``operator`` in a balanced tree of
+    parentheses.
+
+    EXAMPLES::
+
+        sage: toks = []
+        sage: sage.logic.logic._combine_toks([('a',), ('b',), ('c',)], 0, 3, 'OR', toks)
+        sage: toks
+        ['OPAREN', 'a', 'OR', 'OPAREN', 'b', 'OR', 'c', 'CPAREN', 'CPAREN']
+    """
+    if(last - first == 1):
+        toks.extend(groups[first])
+        return
+    middle = (first + last) // 2
+    toks.append('OPAREN')
+    _combine_toks(groups, first, middle, operator, toks)
+    toks.append(operator)
+    _combine_toks(groups, middle, last, operator, toks)
+    toks.append('CPAREN')
+
+def parse_toks(toks):
+    r"""
+    This function is for internal use by :class:`SymbolicLogic`.
+    It returns the parse tree of the expression contained in toks,
+    in the form used by :mod:`sage.logic.logicparser`.
+
+    INPUT:
+
+    - ``toks`` -- a token list representing a logic expression.
+
+    OUTPUT:
+
+    - Returns a parse tree whose leaves are variable names, interned
+      by :func:`sage.logic.logicparser.intern_tree` so that repeated
+      subexpressions are shared. A ``RuntimeError`` is raised if
+      ``toks`` is malformed.
+
+    EXAMPLES::
+
+        sage: log = SymbolicLogic()
+        sage: s = log.statement("a&b|!(c|a)")
+        sage: sage.logic.logic.parse_toks(s[0])
+        ['|', ['&', 'a', 'b'], ['~', ['|', 'c', 'a'], None]]
+        sage: t = sage.logic.logic.parse_toks(log.statement("(a&b)|(a&b)")[0])
+        sage: t[1] is t[2]
+        True
+        sage: sage.logic.logic.parse_toks(['OPAREN', 'a', 'AND', 'CPAREN'])
+        Traceback (most recent call last):
+        ...
+        RuntimeError
+    """
+    stack = []
+    for tok in toks:
+        if(tok == 'CPAREN'):
+            lrtoks = []
+            while(len(stack) > 0 and stack[-1] != 'OPAREN'):
+                lrtoks.append(stack.pop())
+            if(len(stack) == 0):
+                raise RuntimeError
+            stack.pop()
+            lrtoks.reverse()
+            stack.append(parse_ltor_toks(lrtoks))
+        else:
+            stack.append(tok)
+    if(len(stack) != 1 or not is_operand(stack[0])):
+        raise RuntimeError
+    return logicparser.intern_tree(stack[0])
+
+def parse_ltor_toks(lrtoks):
+    r"""
+    This function is for internal use by :class:`SymbolicLogic`.
+    It returns the parse tree of the tokens in lrtoks, which contain
+    no inner parentheses.  As in :func:`eval_ltor_toks`, the ``!``
+    operators are applied first and the binary operators are then
+    applied from left to right.
+
+    INPUT:
+
+    - ``lrtoks`` -- a token list representing part of a logical
+      expression that contains no inner parentheses.
+
+    OUTPUT:
+
+    - Returns a parse tree. A ``RuntimeError`` is raised if
+      ``lrtoks`` is malformed.
+
+    EXAMPLES::
+
+        sage: sage.logic.logic.parse_ltor_toks(['a', 'OR', 'NOT', 'b', 'AND', 'c'])
+        ['&', ['|', 'a', ['~', 'b', None]], 'c']
+    """
+    vals = []
+    i = 0
+    while(i < len(lrtoks)):
+        tok = lrtoks[i]
+        if(tok == 'NOT'):
+            i += 1
+            if(i == len(lrtoks) or not is_operand(lrtoks[i])):
+                raise RuntimeError
+            tok = ['~', lrtoks[i], None]
+        vals.append(tok)
+        i += 1
+    if(len(vals) % 2 == 0 or not is_operand(vals[0])):
+        raise RuntimeError
+    tree = vals[0]
+    for i in range(1, len(vals), 2):
+        if(vals[i] not in bin_list or not is_operand(vals[i + 1])):
+            raise RuntimeError
+        tree = [tree_ops[vals[i]], tree, vals[i + 1]]
+    return tree
+
+def is_operand(tok):
+    r"""
+    This function is for internal use by :class:`SymbolicLogic`.
+    It returns ``True`` if ``tok`` is a variable name or a parse tree
+    and ``False`` if it is an operator token.
+
+    EXAMPLES::
+
+        sage: sage.logic.logic.is_operand('a'), sage.logic.logic.is_operand('AND')
+        (True, False)
+    """
+    return type(tok) is list or tok not in tok_list
+
+def eval(toks, context=None):
     r"""
     This function is for internal use by :class:`SymbolicLogic`.
     It returns ``True`` if the expression contained in toks would
     evaluate to ``True`` and ``False`` otherwise.  It relies on
-    setting the values of the variables in the global dictionary vars.
+    the values of the variables in ``context``.
     
     INPUT:
     
     - ``toks`` -- a token list representing a logic expression.
+    - ``context`` -- (default: ``None``) an :class:`EvalContext`
+      holding the values of the variables.
     
     OUTPUT:
 	
-    - Returns ``True`` if evaluates to ``True`` with variables
-      in vars and ``False`` otherwise.
+    - Returns ``True`` if evaluates to ``True`` with the variables
+      in ``context`` and ``False`` otherwise.
     
     EXAMPLES::
     
-        sage: a=true
-        sage: b=false
-        sage: c=true
-        sage: d=true
-        sage: eval("(a&b)|(c&d)")
-        True
+        sage: ctx = sage.logic.logic.EvalContext({'a': 'True', 'b': 'False', 'c': 'True', 'd': 'True'})
+        sage: toks = ['OPAREN', 'OPAREN', 'a', 'AND', 'b', 'CPAREN', 'OR', 'OPAREN', 'c', 'AND', 'd', 'CPAREN', 'CPAREN']
+        sage: sage.logic.logic.eval(toks, ctx)
+        'True'
     """
     stack = []
     for tok in toks:
@@ -461,51 +1449,44 @@ def eval(toks):
             while(tok != 'OPAREN'):
                 tok = stack.pop()
                 lrtoks.insert(0, tok)
-            stack.append(eval_ltor_toks(lrtoks[1:-1]))
+            stack.append(eval_ltor_toks(lrtoks[1:-1], context))
     if(len(stack) > 1):
         raise RuntimeError
     return stack[0]
 
-def eval_ltor_toks(lrtoks):
+def eval_ltor_toks(lrtoks, context=None):
     r"""
     This function is for internal use by :class:`SymbolicLogic`.
     It returns ``True`` if the expression contained in lrtoks would
-    evaluate to ``True`` and ``False`` otherwise.  It relies on setting
-    the values of the variables in the global dictionary vars.
+    evaluate to ``True`` and ``False`` otherwise.  It relies on
+    the values of the variables in ``context``.
     
     INPUT:
     
     - ``lrtoks`` -- a token list representing part of a logical
       expression that contains no inner parentheses.
+    - ``context`` -- (default: ``None``) an :class:`EvalContext`
+      holding the values of the variables.
     
     OUTPUT:
     
-    - Returns ``True`` if evaluates to ``True`` with variables
-      in vars and ``False`` otherwise.
+    - Returns ``True`` if evaluates to ``True`` with the variables
+      in ``context`` and ``False`` otherwise.
     
     EXAMPLES::
     
-        sage: a=true
-        sage: b=false
-        sage: c=true
-        sage: d=true
-        sage: log=SymbolicLogic()
-        sage: s=log.statement("a&b&c&d")
-        sage: eval("(a&b)|(c&d)")
-        sage: g=[]
-        sage: for i in range (len(s[0])-1):
-        sage: 	if i != 0:
-        sage: 		g.append(s[0][i])
-        sage: sage.logic.logic.eval_ltor_toks(g)
+        sage: ctx = sage.logic.logic.EvalContext({'a': 'True', 'b': 'False', 'c': 'True', 'd': 'True'})
+        sage: g = ['a', 'AND', 'b', 'AND', 'c', 'AND', 'd']
+        sage: sage.logic.logic.eval_ltor_toks(g, ctx)
         'False'
     """
-    reduce_monos(lrtoks)        #monotonic ``!`` operators go first
-    reduce_bins(lrtoks)         #then the binary operators
+    reduce_monos(lrtoks, context)        #monotonic ``!`` operators go first
+    reduce_bins(lrtoks, context)         #then the binary operators
     if(len(lrtoks) > 1):
         raise RuntimeError
     return lrtoks[0]
 
-def reduce_bins(lrtoks):
+def reduce_bins(lrtoks, context=None):
     r"""
     This function is for internal use by :class:`SymbolicLogic`.
     It takes a series of tokens with no parentheses or monotonic
@@ -516,6 +1497,8 @@ def reduce_bins(lrtoks):
     - ``lrtoks`` -- a token list representing part of a logical
       expression that contains no inner parentheses or
       monotonic operators.
+    - ``context`` -- (default: ``None``) an :class:`EvalContext`
+      holding the values of the variables.
     
     OUTPUT:
     
@@ -533,13 +1516,13 @@ def reduce_bins(lrtoks):
     while(i < len(lrtoks)):
         if(lrtoks[i] in bin_list):
             args = [lrtoks[i - 1], lrtoks[i], lrtoks[i + 1]]
-            lrtoks[i - 1] = eval_bin_op(args)
+            lrtoks[i - 1] = eval_bin_op(args, context)
             del lrtoks[i]
             del lrtoks[i]
-            reduce_bins(lrtoks)
+            reduce_bins(lrtoks, context)
         i += 1
 
-def reduce_monos(lrtoks):
+def reduce_monos(lrtoks, context=None):
     r"""
     This function is for internal use by :class:`SymbolicLogic`.
     It takes a series of tokens with no parentheses and replaces
@@ -549,6 +1532,8 @@ def reduce_monos(lrtoks):
     
     - ``lrtoks`` -- a token list representing part of a logical
       expression that contains no inner parentheses.
+    - ``context`` -- (default: ``None``) an :class:`EvalContext`
+      holding the values of the variables.
     
     OUTPUT:
     
@@ -567,11 +1552,11 @@ def reduce_monos(lrtoks):
     while(i < len(lrtoks)):
         if(lrtoks[i] == 'NOT'):
             args = [lrtoks[i], lrtoks[i + 1]]
-            lrtoks[i] = eval_mon_op(args)
+            lrtoks[i] = eval_mon_op(args, context)
             del lrtoks[i + 1]
         i += 1
 
-def eval_mon_op(args):
+def eval_mon_op(args, context=None):
     r"""
     This function is for internal use by :class:`SymbolicLogic`.
     It returns a boolean value based on the truthtable of
@@ -581,8 +1566,8 @@ def eval_mon_op(args):
     
     - ``args`` -- a list of length 2 containing the token 'NOT' and
       then a variable name.
-    - ``global vars`` -- a dictionary with the variable names and
-      their current boolean value.
+    - ``context`` -- (default: ``None``) an :class:`EvalContext`
+      holding the values of the variables.
     
     OUTPUT:
     
@@ -591,21 +1576,18 @@ def eval_mon_op(args):
 	
     EXAMPLES::
     
-        sage: a=false
-        sage: sage.logic.logic.eval_mon_op(['NOT','a'])
+        sage: ctx = sage.logic.logic.EvalContext({'a': 'False'})
+        sage: sage.logic.logic.eval_mon_op(['NOT','a'], ctx)
         'True'
     """
-    if(args[1] != 'True' and args[1] != 'False'):
-        val = vars[args[1]]
-    else:
-        val = args[1]
+    val = eval_var(args[1], context)
 
     if(val == 'True'):
         return 'False'
     else:
         return 'True'
 
-def eval_bin_op(args):
+def eval_bin_op(args, context=None):
     r"""
     This function is for internal use by :class:`SymbolicLogic`.
     It returns a boolean value based on the truthtable of
@@ -616,8 +1598,8 @@ def eval_bin_op(args):
     - ``args`` -- a list of length 3 to containing a variable name
       then a token representing a binary logical operator
       then another variable name.
-    - ``global vars`` -- a dictionary with the variable names and
-      their current boolean value.
+    - ``context`` -- (default: ``None``) an :class:`EvalContext`
+      holding the values of the variables.
     
     OUTPUT:
     
@@ -626,24 +1608,12 @@ def eval_bin_op(args):
     
     EXAMPLES::
     
-        sage: a=false
-        sage: b=true
-        sage: sage.logic.logic.eval_bin_op(['a','AND','b'])
+        sage: ctx = sage.logic.logic.EvalContext({'a': 'False', 'b': 'True'})
+        sage: sage.logic.logic.eval_bin_op(['a','AND','b'], ctx)
         'False'
     """
-    if(args[0] == 'False'):
-        lval = 'False'
-    elif(args[0] == 'True'):
-        lval = 'True'
-    else:
-        lval = vars[args[0]]
-
-    if(args[2] == 'False'):
-        rval = 'False'
-    elif(args[2] == 'True'):
-        rval = 'True'
-    else:
-        rval = vars[args[2]]
+    lval = eval_var(args[0], context)
+    rval = eval_var(args[2], context)
 
     if(args[1] == 'AND'):
         return eval_and_op(lval, rval)
@@ -654,6 +1624,36 @@ def eval_bin_op(args):
     elif(args[1] == 'IFF'):
         return eval_iff_op(lval, rval)
 
+def eval_var(tok, context=None):
+    r"""
+    This function is for internal use by :class:`SymbolicLogic`.
+    It returns the value of the token ``tok``, which is either
+    ``'True'``, ``'False'`` or a variable name whose value is looked
+    up in ``context``.
+
+    INPUT:
+
+    - ``tok`` -- a string, ``'True'``, ``'False'`` or a variable name.
+    - ``context`` -- (default: ``None``) an :class:`EvalContext`
+      holding the values of the variables.
+
+    OUTPUT:
+
+    - Returns ``'True'`` or ``'False'``. A ``KeyError`` is raised if
+      ``tok`` is not a variable of ``context``.
+
+    EXAMPLES::
+
+        sage: ctx = sage.logic.logic.EvalContext({'a': 'True'})
+        sage: sage.logic.logic.eval_var('a', ctx), sage.logic.logic.eval_var('False')
+        ('True', 'False')
+    """
+    if(tok == 'True' or tok == 'False'):
+        return tok
+    if(context is None):
+        raise KeyError(tok)
+    return context.vars[tok]
+
 def eval_and_op(lval, rval):
     r"""
     This function is for internal use by :class:`SymbolicLogic`.
@@ -776,7 +1776,7 @@ def eval_iff_op(lval, rval):
     elif(lval == 'True' and rval == 'True'):
         return 'True'
 
-def tokenize(s, toks):
+def tokenize(s, toks, context=None):
     r"""
     This function is for internal use by :class:`SymbolicLogic`.
     It tokenizes the string s and places the tokens in toks.
@@ -785,73 +1785,42 @@ def tokenize(s, toks):
     
     - ``s`` -- a string that contains a logical expression.
     - ``toks`` -- a list to contain the tokens of s.
-    - ``global vars`` -- a dictionary with the variable names and
-      their current boolean value.
-    - ``global vars_order`` -- a list of the variable names in
-      the order they were found.
+    - ``context`` -- (default: ``None``) an :class:`EvalContext` in
+      which the variables are recorded, with the value ``'False'``,
+      in the order they were found.
     
     OUTPUT:
     
-    - The tokens are placed in ``toks``.
+    - The tokens are placed in ``toks``. If ``s`` has invalid variable
+      names or stray characters, each is printed with its offsets in
+      ``s`` and ``toks`` is left without the closing ``'CPAREN'``.
 	
     EXAMPLES::
     
         sage: g="(a&b)|(!c)"
         sage: toks=['OPAREN']
-        sage: sage.logic.logic.tokenize(g, toks)
+        sage: ctx = sage.logic.logic.EvalContext()
+        sage: sage.logic.logic.tokenize(g, toks, ctx)
         sage: toks
         ['OPAREN', 'OPAREN', 'a', 'AND', 'b', 'CPAREN', 'OR', 'OPAREN', 'NOT', 'c', 'CPAREN', 'CPAREN']
+        sage: ctx.vars_order
+        ['a', 'b', 'c']
     """
-    i = 0
-    while(i < len(s)):
-        tok = ""
-        skip = valid = 1
-        if(s[i] == '('):
-            tok = tok_list[0]
-        elif(s[i] == ')'):
-            tok = tok_list[1]
-        elif(s[i] == '&'):
-            tok = tok_list[2]
-        elif(s[i] == '|'):
-            tok = tok_list[3]
-        elif(s[i] == '!'):
-            tok = tok_list[4]
-        elif(s[i:i + 2] == '->'):
-            tok = tok_list[5]
-            skip = 2
-        elif(s[i:i + 3] == '<->'):
-            tok = tok_list[6]
-            skip = 3
-        
-        if(len(tok) > 0):
-            toks.append(tok)
-            i += skip
+    if(context is None):
+        context = EvalContext()
+    vars, vars_order = context.vars, context.vars_order
+    errors = []
+    tokens = logiclex.lex(s, lex_ops, errors)[0]
+    if(errors):
+        for e in errors:
+            print e
+        return
+    for tok in tokens:
+        if(tok.kind != 'NAME'):
+            toks.append(tok.kind)
             continue
-        else:
-            #token is a variable name
-            if(s[i] == ' '):
-                i += 1
-                continue
-            
-            while(i < len(s) and s[i] not in operators and s[i] != ' '):
-                tok += s[i]
-                i += 1
-            
-            if(len(tok) > 0):
-                if(tok[0] not in string.letters):
-                    valid = 0
-                for c in tok:
-                    if(c not in string.letters and c not in string.digits 
-                       and c != '_'):
-                        valid = 0
-            
-            if(valid == 1):
-                toks.append(tok)
-                vars[tok] = 'False'
-                if(tok not in vars_order):
-                    vars_order.append(tok)
-            else:
-                print 'Invalid variable name: ', tok
-                toks = []
-    
+        toks.append(tok.text)
+        if(tok.text not in vars):
+            vars_order.append(tok.text)
+        vars[tok.text] = 'False'
     toks.append('CPAREN')
@@ -0,0 +1,782 @@
+r"""
+LogicBDD
+
+Module that represents boolean formulas as reduced ordered binary
+decision diagrams (BDDs).
+
+A :class:`BDD` manager holds the nodes of any number of functions over
+its variables.  Nodes are unique, so two functions are equal exactly when
+they are the same edge, and edges carry a complement bit, so negation
+takes constant time.  Functions are built from the parse trees of
+:mod:`sage.logic.logicparser` with the ``ite`` operation, whose results
+are cached.
+
+EXAMPLES::
+
+    sage: import sage.logic.logicparser as logicparser
+    sage: from sage.logic.logicbdd import BDD
+    sage: tree, vars_order = logicparser.parse('(a->b)&(b->c)->(a->c)')
+    sage: bdd = BDD(vars_order)
+    sage: f = bdd.build(tree)
+    sage: f == bdd.true
+    True
+    sage: g = bdd.build(logicparser.parse('a&b|a&c')[0])
+    sage: g == bdd.build(logicparser.parse('a&(b|c)')[0])
+    True
+    sage: bdd.satcount(g)
+    3
+"""
+#*****************************************************************************
+# Distributed under the terms of the GNU General Public License (GPL)
+# http://www.gnu.org/licenses/
+#*****************************************************************************
+
+class BDD:
+    r"""
+    A manager of reduced ordered binary decision diagrams with complement
+    edges.
+
+    A function is an edge, an integer ``2*node + c`` where ``c`` is 1 if
+    the edge complements the function of ``node``.  Node 0 is the
+    terminal and stands for ``True``, so the edge ``bdd.true`` is 0 and
+    ``bdd.false`` is 1.  Every other node tests one variable and has a
+    low and a high edge, the high one never complemented.  The diagrams
+    are walked with explicit stacks, so the number of variables is not
+    limited by the recursion limit.
+
+    INPUT:
+
+    - ``vars_order`` -- (default: ``()``) the names of the variables, in
+      the order in which they are tested from the root.
+
+    EXAMPLES::
+
+        sage: from sage.logic.logicbdd import BDD
+        sage: bdd = BDD(['a', 'b'])
+        sage: a, b = bdd.var('a'), bdd.var('b')
+        sage: bdd.apply('|', a, b) == bdd.neg(bdd.apply('&', bdd.neg(a), bdd.neg(b)))
+        True
+    """
+    def __init__(self, vars_order=()):
+        r"""
+        This function initializes the data fields. See :class:`BDD` for
+        full documentation.
+
+        EXAMPLES::
+
+            sage: from sage.logic.logicbdd import BDD
+            sage: BDD(['x', 'y']).order()
+            ['x', 'y']
+        """
+        self.true = 0
+        self.false = 1
+        self.__names = []
+        self.__index = {}
+        self.__order = []
+        self.__level = []
+        self.__unique = []
+        self.__var = [None]
+        self.__lo = [None]
+        self.__hi = [None]
+        self.__cache = {}
+        self.__ref = None
+        self.__live = 0
+        for name in vars_order:
+            self.add_var(name)
+
+    def add_var(self, name):
+        r"""
+        Add the variable ``name`` below all the others and return the
+        function equal to it.
+
+        EXAMPLES::
+
+            sage: from sage.logic.logicbdd import BDD
+            sage: bdd = BDD(['a'])
+            sage: bdd.add_var('b') == bdd.var('b')
+            True
+            sage: bdd.order()
+            ['a', 'b']
+        """
+        if(name in self.__index):
+            raise ValueError('variable %s already exists' % name)
+        v = len(self.__names)
+        self.__names.append(name)
+        self.__index[name] = v
+        self.__level.append(len(self.__order))
+        self.__order.append(v)
+        self.__unique.append({})
+        return self.__mk(v, self.false, self.true)
+
+    def var(self, name):
+        r"""
+        Return the function equal to the variable ``name``.
+
+        EXAMPLES::
+
+            sage: from sage.logic.logicbdd import BDD
+            sage: bdd = BDD(['a'])
+            sage: bdd.var('a')
+            2
+            sage: bdd.var('b')
+            Traceback (most recent call last):
+            ...
+            KeyError: 'b'
+        """
+        return self.__mk(self.__index[name], self.false, self.true)
+
+    def order(self):
+        r"""
+        Return the names of the variables in the order in which they are
+        tested from the root.
+
+        EXAMPLES::
+
+            sage: from sage.logic.logicbdd import BDD
+            sage: BDD(['b', 'a']).order()
+            ['b', 'a']
+        """
+        return [self.__names[v] for v in self.__order]
+
+    def neg(self, f):
+        r"""
+        Return the negation of ``f``.
+
+        EXAMPLES::
+
+            sage: from sage.logic.logicbdd import BDD
+            sage: bdd = BDD()
+            sage: bdd.neg(bdd.true) == bdd.false
+            True
+        """
+        return f ^ 1
+
+    def build(self, tree):
+        r"""
+        Return the function of the parse tree ``tree``, as produced by
+        :func:`sage.logic.logicparser.parse`.  A subtree shared by several
+        parents is built once.
+
+        EXAMPLES::
+
+            sage: from sage.logic.logicbdd import BDD
+            sage: bdd = BDD(['a', 'b'])
+            sage: f = bdd.build(['<->', 'a', ['~', 'b', None]])
+            sage: f == bdd.apply('^', bdd.var('a'), bdd.var('b'))
+            True
+        """
+        memo = {}
+        results = []
+        stack = [(tree, False)]
+        while(stack):
+            node, ready = stack.pop()
+            if(not isinstance(node, list)):
+                results.append(self.var(node))
+            elif(id(node) in memo):
+                results.append(memo[id(node)])
+            elif(not ready):
+                stack.append((node, True))
+                if(node[2] is not None):
+                    stack.append((node[2], False))
+                stack.append((node[1], False))
+            else:
+                if(node[0] == '~'):
+                    f = results.pop() ^ 1
+                else:
+                    g = results.pop()
+                    f = self.apply(node[0], results.pop(), g)
+                memo[id(node)] = f
+                results.append(f)
+        return results[0]
+
+    def apply(self, op, f, g):
+        r"""
+        Return the function ``f op g`` where ``op`` is one of ``'&'``,
+        ``'|'``, ``'^'``, ``'->'`` or ``'<->'``.
+
+        EXAMPLES::
+
+            sage: from sage.logic.logicbdd import BDD
+            sage: bdd = BDD(['a'])
+            sage: a = bdd.var('a')
+            sage: bdd.apply('->', a, a) == bdd.true
+            True
+            sage: bdd.apply('=', a, a)
+            Traceback (most recent call last):
+            ...
+            ValueError: unknown operator =
+        """
+        if(op == '&'):
+            return self.ite(f, g, self.false)
+        elif(op == '|'):
+            return self.ite(f, self.true, g)
+        elif(op == '^'):
+            return self.ite(f, g ^ 1, g)
+        elif(op == '->'):
+            return self.ite(f, g, self.true)
+        elif(op == '<->'):
+            return self.ite(f, g, g ^ 1)
+        raise ValueError('unknown operator %s' % op)
+
+    def ite(self, f, g, h):
+        r"""
+        Return the function "if ``f`` then ``g`` else ``h``".
+
+        The arguments are first brought to a standard form, in which
+        ``f`` and ``g`` are not complemented, so that equivalent calls
+        share one entry of the cache.  The calls on the cofactors are kept
+        on an explicit stack, so the number of variables is not limited by
+        the recursion limit.
+
+        EXAMPLES::
+
+            sage: from sage.logic.logicbdd import BDD
+            sage: bdd = BDD(['a', 'b', 'c'])
+            sage: a, b, c = [bdd.var(x) for x in 'abc']
+            sage: f = bdd.ite(a, b, c)
+            sage: bdd.ite(bdd.neg(a), c, b) == f
+            True
+        """
+        cache, top_of, cofactors = self.__cache, self.__top, self.__cofactors
+        results = []
+        stack = [(f, g, h, 0, None)]
+        while(stack):
+            f, g, h, c, top = stack.pop()
+            if(top is not None):
+                r1 = results.pop()
+                r = self.__mk(self.__order[top], results.pop(), r1)
+                cache[(f, g, h)] = r
+                results.append(r ^ c)
+                continue
+            if(f == 0):
+                results.append(g)
+                continue
+            if(f == 1):
+                results.append(h)
+                continue
+            if(g == f):
+                g = 0
+            elif(g == f ^ 1):
+                g = 1
+            if(h == f):
+                h = 1
+            elif(h == f ^ 1):
+                h = 0
+            if(g == h):
+                results.append(g)
+                continue
+            if(g == 0 and h == 1):
+                results.append(f)
+                continue
+            if(g == 1 and h == 0):
+                results.append(f ^ 1)
+                continue
+            if(f & 1):
+                f ^= 1
+                g, h = h, g
+            c = g & 1
+            if(c):
+                g ^= 1
+                h ^= 1
+            r = cache.get((f, g, h))
+            if(r is not None):
+                results.append(r ^ c)
+                continue
+            top = min(top_of(f), top_of(g), top_of(h))
+            f0, f1 = cofactors(f, top)
+            g0, g1 = cofactors(g, top)
+            h0, h1 = cofactors(h, top)
+            stack.append((f, g, h, c, top))
+            stack.append((f1, g1, h1, 0, None))
+            stack.append((f0, g0, h0, 0, None))
+        return results[0]
+
+    def restrict(self, f, assignment):
+        r"""
+        Return the function ``f`` with the variables of ``assignment``
+        replaced by their values.
+
+        INPUT:
+
+        - ``f`` -- a function.
+        - ``assignment`` -- a dictionary from variable names to ``True``
+          or ``False``.
+
+        EXAMPLES::
+
+            sage: from sage.logic.logicbdd import BDD
+            sage: bdd = BDD(['a', 'b', 'c'])
+            sage: f = bdd.build(['|', ['&', 'a', 'b'], 'c'])
+            sage: bdd.restrict(f, {'a': True}) == bdd.build(['|', 'b', 'c'])
+            True
+            sage: bdd.restrict(f, {'b': False, 'c': False}) == bdd.false
+            True
+        """
+        values = {}
+        for name in assignment:
+            values[self.__index[name]] = bool(assignment[name])
+        if(len(values) == 0):
+            return f
+        bottom = max([self.__level[v] for v in values])
+        return self.__restrict(f, values, bottom, {})
+
+    def __restrict(self, e, values, bottom, memo):
+        r"""
+        Return ``e`` restricted by ``values``, a dictionary from variable
+        numbers to values none of which is below level ``bottom``.
+
+        EXAMPLES::
+
+            sage: from sage.logic.logicbdd import BDD
+            sage: bdd = BDD(['a'])
+            sage: bdd._BDD__restrict(bdd.var('a'), {0: False}, 0, {})
+            1
+        """
+        lo, hi = self.__lo, self.__hi
+        results = []
+        stack = [(e, False)]
+        while(stack):
+            e, ready = stack.pop()
+            node = e >> 1
+            v = self.__var[node]
+            if(ready):
+                if(v in values):
+                    r = results.pop()
+                else:
+                    h = results.pop()
+                    r = self.__mk(v, results.pop(), h)
+                memo[node] = r
+                results.append(r ^ (e & 1))
+            elif(v is None or self.__level[v] > bottom):
+                results.append(e)
+            elif(node in memo):
+                results.append(memo[node] ^ (e & 1))
+            else:
+                stack.append((e, True))
+                if(v in values):
+                    if(values[v]):
+                        stack.append((hi[node], False))
+                    else:
+                        stack.append((lo[node], False))
+                else:
+                    stack.append((hi[node], False))
+                    stack.append((lo[node], False))
+        return results[0]
+
+    def is_tautology(self, f):
+        r"""
+        Return ``True`` if ``f`` is true for every assignment.
+
+        EXAMPLES::
+
+            sage: from sage.logic.logicbdd import BDD
+            sage: bdd = BDD(['a'])
+            sage: bdd.is_tautology(bdd.build(['|', 'a', ['~', 'a', None]]))
+            True
+        """
+        return f == self.true
+
+    def equivalent(self, f, g):
+        r"""
+        Return ``True`` if ``f`` and ``g`` are the same function.
+
+        EXAMPLES::
+
+            sage: from sage.logic.logicbdd import BDD
+            sage: bdd = BDD(['a', 'b'])
+            sage: bdd.equivalent(bdd.build(['->', 'a', 'b']), bdd.build(['->', ['~', 'b', None], ['~', 'a', None]]))
+            True
+        """
+        return f == g
+
+    def satcount(self, f):
+        r"""
+        Return the number of assignments of all the variables of this
+        manager that make ``f`` true.
+
+        EXAMPLES::
+
+            sage: from sage.logic.logicbdd import BDD
+            sage: bdd = BDD(['a', 'b', 'c'])
+            sage: bdd.satcount(bdd.var('b')), bdd.satcount(bdd.false)
+            (4, 0)
+            sage: bdd.satcount(bdd.build(['^', 'a', ['^', 'b', 'c']]))
+            4
+
+        Diagrams as deep as the number of variables are no problem::
+
+            sage: import sage.logic.logicparser as logicparser
+            sage: xs = ['x%d' % i for i in range(1200)]
+            sage: bdd = BDD(xs)
+            sage: f = bdd.build(logicparser.parse('|'.join(reversed(xs)))[0])
+            sage: bdd.satcount(f) == 2 ** 1200 - 1
+            True
+            sage: g = bdd.apply('&', f, bdd.var('x1199'))
+            sage: bdd.satcount(g) == 2 ** 1199
+            True
+            sage: bdd.satcount(bdd.restrict(f, {'x1199': False})) == 2 ** 1200 - 2
+            True
+        """
+        return self.__count(f, {}) << self.__top(f)
+
+    def __count(self, e, memo):
+        r"""
+        Return the number of assignments of the variables from the level
+        of ``e`` down that make ``e`` true.
+
+        EXAMPLES::
+
+            sage: from sage.logic.logicbdd import BDD
+            sage: bdd = BDD(['a', 'b'])
+            sage: bdd._BDD__count(bdd.var('b'), {})
+            1
+        """
+        n = len(self.__order)
+        stack = [e >> 1]
+        while(stack):
+            node = stack[-1]
+            if(node in memo):
+                stack.pop()
+            elif(node == 0):
+                memo[node] = 1
+                stack.pop()
+            else:
+                edges = (self.__lo[node], self.__hi[node])
+                pending = [x >> 1 for x in edges if x >> 1 not in memo]
+                if(pending):
+                    stack.extend(pending)
+                    continue
+                stack.pop()
+                top = self.__level[self.__var[node]]
+                r = 0
+                for x in edges:
+                    below = self.__top(x)
+                    c = memo[x >> 1]
+                    if(x & 1):
+                        c = (1 << (n - below)) - c
+                    r += c << (below - top - 1)
+                memo[node] = r
+        r = memo[e >> 1]
+        if(e & 1):
+            return (1 << (n - self.__top(e))) - r
+        return r
+
+    def satone(self, f):
+        r"""
+        Return an assignment making ``f`` true, as a dictionary from the
+        names of the variables it needs to values, or ``None`` if there
+        is none.
+
+        EXAMPLES::
+
+            sage: from sage.logic.logicbdd import BDD
+            sage: bdd = BDD(['a', 'b', 'c'])
+            sage: bdd.satone(bdd.build(['&', ['~', 'a', None], 'c']))
+            {'a': False, 'c': True}
+            sage: bdd.satone(bdd.false) is None
+            True
+        """
+        if(f == self.false):
+            return None
+        assignment = {}
+        while(f >> 1 != 0):
+            node = f >> 1
+            lo = self.__lo[node] ^ (f & 1)
+            name = self.__names[self.__var[node]]
+            if(lo != self.false):
+                assignment[name] = False
+                f = lo
+            else:
+                assignment[name] = True
+                f = self.__hi[node] ^ (f & 1)
+        return assignment
+
+    def size(self, f):
+        r"""
+        Return the number of nodes of ``f``, including the terminal.
+
+        EXAMPLES::
+
+            sage: from sage.logic.logicbdd import BDD
+            sage: bdd = BDD(['a', 'b'])
+            sage: bdd.size(bdd.build(['<->', 'a', 'b']))
+            3
+        """
+        seen = set([f >> 1])
+        stack = [f >> 1]
+        while(stack):
+            node = stack.pop()
+            if(node != 0):
+                for e in (self.__lo[node], self.__hi[node]):
+                    if(e >> 1 not in seen):
+                        seen.add(e >> 1)
+                        stack.append(e >> 1)
+        return len(seen)
+
+    def reorder(self, roots, max_growth=1.2):
+        r"""
+        Reorder the variables by sifting to reduce the number of nodes of
+        the functions ``roots``.
+
+        Each variable in turn, starting with those tested by the most
+        nodes, is moved through all the levels by swapping adjacent
+        levels in place and left where the diagram was smallest.  A
+        variable stops moving in one direction once the diagram grows by
+        more than the factor ``max_growth``.
+
+        The functions in ``roots`` keep their values; other functions
+        built before the call are no longer valid.
+
+        EXAMPLES::
+
+            sage: from sage.logic.logicbdd import BDD
+            sage: bdd = BDD(['a1', 'a2', 'a3', 'b1', 'b2', 'b3'])
+            sage: f = bdd.build(['|', ['|', ['&', 'a1', 'b1'], ['&', 'a2', 'b2']], ['&', 'a3', 'b3']])
+            sage: bdd.size(f)
+            15
+            sage: bdd.reorder([f])
+            sage: bdd.size(f)
+            7
+            sage: bdd.satcount(f)
+            37
+            sage: f == bdd.build(['|', ['|', ['&', 'a1', 'b1'], ['&', 'a2', 'b2']], ['&', 'a3', 'b3']])
+            True
+        """
+        var, lo, hi = self.__var, self.__lo, self.__hi
+        ref = [0] * len(var)
+        seen = set()
+        stack = []
+        for f in roots:
+            ref[f >> 1] += 1
+            if(f >> 1 not in seen):
+                seen.add(f >> 1)
+                stack.append(f >> 1)
+        while(stack):
+            node = stack.pop()
+            if(node != 0):
+                for e in (lo[node], hi[node]):
+                    ref[e >> 1] += 1
+                    if(e >> 1 not in seen):
+                        seen.add(e >> 1)
+                        stack.append(e >> 1)
+        for v in range(len(self.__unique)):
+            table = self.__unique[v]
+            for key in table.keys():
+                if(table[key] not in seen):
+                    del table[key]
+        self.__ref = ref
+        self.__live = len(seen)
+        self.__cache = {}
+        sizes = [(-len(self.__unique[v]), v) for v in range(len(self.__order))]
+        sizes.sort()
+        for size, v in sizes:
+            self.__sift(v, max_growth)
+        self.__ref = None
+        self.__cache = {}
+
+    def __sift(self, v, max_growth):
+        r"""
+        Move variable ``v`` to the level where the live nodes are fewest.
+
+        EXAMPLES::
+
+            sage: from sage.logic.logicbdd import BDD
+            sage: bdd = BDD(['a', 'b', 'c', 'd'])
+            sage: f = bdd.build(['|', ['&', 'a', 'c'], ['&', 'b', 'd']])
+            sage: bdd.reorder([f])
+            sage: bdd.order()
+            ['a', 'c', 'b', 'd']
+        """
+        level = self.__level
+        limit = max_growth * self.__live
+        best, best_level = self.__live, level[v]
+        pos = level[v]
+        while(pos < len(self.__order) - 1 and self.__live <= limit):
+            self.__swap(pos)
+            pos += 1
+            if(self.__live < best):
+                best, best_level = self.__live, pos
+        while(pos > 0 and (self.__live <= limit or pos > best_level)):
+            self.__swap(pos - 1)
+            pos -= 1
+            if(self.__live < best):
+                best, best_level = self.__live, pos
+        while(pos < best_level):
+            self.__swap(pos)
+            pos += 1
+
+    def __swap(self, i):
+        r"""
+        Exchange the variables at levels ``i`` and ``i + 1``, rewriting
+        the nodes of the upper one in place so that every edge keeps its
+        function.
+
+        EXAMPLES::
+
+            sage: from sage.logic.logicbdd import BDD
+            sage: bdd = BDD(['a', 'b'])
+            sage: f = bdd.build(['&', 'a', ['~', 'b', None]])
+            sage: bdd._BDD__ref = [1] * 10
+            sage: bdd._BDD__swap(0)
+            sage: bdd._BDD__ref = None
+            sage: bdd.order(), bdd.satone(f)
+            (['b', 'a'], {'a': True, 'b': False})
+        """
+        var, lo, hi, ref = self.__var, self.__lo, self.__hi, self.__ref
+        x = self.__order[i]
+        y = self.__order[i + 1]
+        ux = self.__unique[x]
+        uy = self.__unique[y]
+        moved = [node for node in ux.values()
+                 if var[lo[node] >> 1] == y or var[hi[node] >> 1] == y]
+        for node in moved:
+            del ux[(lo[node], hi[node])]
+        self.__order[i], self.__order[i + 1] = y, x
+        self.__level[x], self.__level[y] = i + 1, i
+        for node in moved:
+            l, h = lo[node], hi[node]
+            f00, f01 = self.__cofactors_var(l, y)
+            f10, f11 = self.__cofactors_var(h, y)
+            nl = self.__mk_ref(x, f00, f10)
+            nh = self.__mk_ref(x, f01, f11)
+            ref[nl >> 1] += 1
+            ref[nh >> 1] += 1
+            var[node], lo[node], hi[node] = y, nl, nh
+            uy[(nl, nh)] = node
+            self.__deref(l)
+            self.__deref(h)
+
+    def __mk_ref(self, v, l, h):
+        r"""
+        Return the edge of the node testing ``v`` with low edge ``l`` and
+        high edge ``h``, counting the references of a new node to its
+        children.
+
+        EXAMPLES::
+
+            sage: from sage.logic.logicbdd import BDD
+            sage: bdd = BDD(['a', 'b'])
+            sage: bdd._BDD__ref = [0, 0, 0]
+            sage: bdd._BDD__mk_ref(0, 1, 4), bdd._BDD__ref
+            (6, [1, 0, 1, 0])
+        """
+        if(l == h):
+            return l
+        if(h & 1):
+            return self.__mk_ref(v, l ^ 1, h ^ 1) ^ 1
+        table = self.__unique[v]
+        node = table.get((l, h))
+        if(node is None):
+            node = len(self.__var)
+            self.__var.append(v)
+            self.__lo.append(l)
+            self.__hi.append(h)
+            self.__ref.append(0)
+            self.__ref[l >> 1] += 1
+            self.__ref[h >> 1] += 1
+            self.__live += 1
+            table[(l, h)] = node
+        return 2 * node
+
+    def __deref(self, e):
+        r"""
+        Drop one reference to the node of ``e``, removing the nodes left
+        without references.
+
+        EXAMPLES::
+
+            sage: from sage.logic.logicbdd import BDD
+            sage: bdd = BDD(['a'])
+            sage: bdd._BDD__ref = [1, 1]
+            sage: bdd._BDD__deref(bdd.var('a'))
+            sage: bdd._BDD__unique
+            [{}]
+        """
+        var, lo, hi, ref = self.__var, self.__lo, self.__hi, self.__ref
+        stack = [e >> 1]
+        while(stack):
+            node = stack.pop()
+            ref[node] -= 1
+            if(ref[node] == 0 and node != 0):
+                del self.__unique[var[node]][(lo[node], hi[node])]
+                self.__live -= 1
+                stack.append(lo[node] >> 1)
+                stack.append(hi[node] >> 1)
+
+    def __mk(self, v, l, h):
+        r"""
+        Return the edge of the unique node testing ``v`` with low edge
+        ``l`` and high edge ``h``, creating it if needed.
+
+        EXAMPLES::
+
+            sage: from sage.logic.logicbdd import BDD
+            sage: bdd = BDD(['a'])
+            sage: bdd._BDD__mk(0, 0, 1), bdd._BDD__mk(0, 1, 0), bdd._BDD__mk(0, 0, 0)
+            (3, 2, 0)
+        """
+        if(l == h):
+            return l
+        if(h & 1):
+            return self.__mk(v, l ^ 1, h ^ 1) ^ 1
+        table = self.__unique[v]
+        node = table.get((l, h))
+        if(node is None):
+            node = len(self.__var)
+            self.__var.append(v)
+            self.__lo.append(l)
+            self.__hi.append(h)
+            table[(l, h)] = node
+        return 2 * node
+
+    def __top(self, e):
+        r"""
+        Return the level of the variable tested at the root of ``e``, or
+        the number of variables for a constant.
+
+        EXAMPLES::
+
+            sage: from sage.logic.logicbdd import BDD
+            sage: bdd = BDD(['a', 'b'])
+            sage: bdd._BDD__top(bdd.var('b')), bdd._BDD__top(bdd.true)
+            (1, 2)
+        """
+        v = self.__var[e >> 1]
+        if(v is None):
+            return len(self.__order)
+        return self.__level[v]
+
+    def __cofactors(self, e, top):
+        r"""
+        Return the low and high cofactors of ``e`` with respect to the
+        variable at level ``top``.
+
+        EXAMPLES::
+
+            sage: from sage.logic.logicbdd import BDD
+            sage: bdd = BDD(['a', 'b'])
+            sage: bdd._BDD__cofactors(bdd.neg(bdd.var('a')), 0)
+            (0, 1)
+        """
+        node = e >> 1
+        v = self.__var[node]
+        if(v is None or self.__level[v] != top):
+            return e, e
+        return self.__lo[node] ^ (e & 1), self.__hi[node] ^ (e & 1)
+
+    def __cofactors_var(self, e, v):
+        r"""
+        Return the low and high cofactors of ``e`` with respect to the
+        variable ``v``, which is not above the root of ``e``.
+
+        EXAMPLES::
+
+            sage: from sage.logic.logicbdd import BDD
+            sage: bdd = BDD(['a', 'b'])
+            sage: bdd._BDD__cofactors_var(bdd.var('b'), 0)
+            (4, 4)
+        """
+        node = e >> 1
+        if(self.__var[node] != v):
+            return e, e
+        return self.__lo[node] ^ (e & 1), self.__hi[node] ^ (e & 1)
@@ -0,0 +1,297 @@
+r"""
+LogicCache
+
+Module providing the bounded least-recently-used caches that
+:func:`sage.logic.logicparser.parse` and
+:meth:`sage.logic.logic.SymbolicLogic.statement` keep of their results,
+so that a formula seen before is not tokenized and checked again.
+
+EXAMPLES::
+
+    sage: from sage.logic.logiccache import LRUCache
+    sage: cache = LRUCache(2)
+    sage: cache.put('a', 1); cache.put('b', 2)
+    sage: cache.get('a')
+    1
+    sage: cache.put('c', 3)
+    sage: cache.get('b') is None
+    True
+    sage: sorted(cache.stats().items())
+    [('evictions', 1), ('hits', 1), ('maxsize', 2), ('misses', 1), ('size', 2)]
+"""
+#*****************************************************************************
+# Distributed under the terms of the GNU General Public License (GPL)
+# http://www.gnu.org/licenses/
+#*****************************************************************************
+
+import threading
+
+def normalize(s):
+    r"""
+    This function returns the key under which the formula ``s`` is
+    cached: ``s`` with each run of whitespace replaced by a single space
+    and leading and trailing whitespace removed.
+
+    Tokens are still separated where they were, so formulas with the same
+    key have the same tokens.
+
+    EXAMPLES::
+
+        sage: from sage.logic.logiccache import normalize
+        sage: normalize('  a &  b\n| c ')
+        'a & b | c'
+    """
+    return ' '.join(s.split())
+
+class LRUCache:
+    r"""
+    A dictionary holding at most ``maxsize`` entries, which forgets the
+    least recently used entry to make room for a new one.
+
+    All operations take constant time and hold a lock, so a cache can be
+    shared between threads.  The values should not be modified, since
+    every caller getting them shares them.
+
+    INPUT:
+
+    - ``maxsize`` -- (default: 1024) the largest number of entries; 0
+      disables the cache.
+
+    EXAMPLES::
+
+        sage: from sage.logic.logiccache import LRUCache
+        sage: cache = LRUCache(0)
+        sage: cache.put('a', 1)
+        sage: len(cache), cache.get('a', 'missing')
+        (0, 'missing')
+    """
+    def __init__(self, maxsize=1024):
+        r"""
+        This function initializes the data fields. See :class:`LRUCache`
+        for full documentation.
+
+        EXAMPLES::
+
+            sage: from sage.logic.logiccache import LRUCache
+            sage: LRUCache(10).stats()['maxsize']
+            10
+        """
+        self.__maxsize = maxsize
+        self.__lock = threading.Lock()
+        self.__links = {}
+        #circular list of [previous, next, key, value], oldest first
+        self.__root = []
+        self.__root[:] = [self.__root, self.__root, None, None]
+        self.__hits = self.__misses = self.__evictions = 0
+
+    def __len__(self):
+        r"""
+        Return the number of entries.
+
+        EXAMPLES::
+
+            sage: from sage.logic.logiccache import LRUCache
+            sage: cache = LRUCache()
+            sage: cache.put('a', 1)
+            sage: len(cache)
+            1
+        """
+        return len(self.__links)
+
+    def __contains__(self, key):
+        r"""
+        Return ``True`` if ``key`` has an entry, without counting a hit or
+        a miss.
+
+        EXAMPLES::
+
+            sage: from sage.logic.logiccache import LRUCache
+            sage: cache = LRUCache()
+            sage: cache.put('a', 1)
+            sage: 'a' in cache, 'b' in cache
+            (True, False)
+        """
+        return key in self.__links
+
+    def get(self, key, default=None):
+        r"""
+        Return the value of ``key`` and mark it as the most recently used
+        entry, or return ``default`` if there is none.
+
+        EXAMPLES::
+
+            sage: from sage.logic.logiccache import LRUCache
+            sage: cache = LRUCache(2)
+            sage: cache.put('a', 1); cache.put('b', 2)
+            sage: cache.get('a'), cache.get('z')
+            (1, None)
+            sage: cache.put('c', 3)
+            sage: 'a' in cache, 'b' in cache
+            (True, False)
+        """
+        self.__lock.acquire()
+        try:
+            link = self.__links.get(key)
+            if(link is None):
+                self.__misses += 1
+                return default
+            self.__hits += 1
+            self.__unlink(link)
+            self.__append(link)
+            return link[3]
+        finally:
+            self.__lock.release()
+
+    def put(self, key, value):
+        r"""
+        Set the value of ``key`` to ``value``, as the most recently used
+        entry, forgetting the least recently used entries if the cache is
+        full.
+
+        EXAMPLES::
+
+            sage: from sage.logic.logiccache import LRUCache
+            sage: cache = LRUCache(1)
+            sage: cache.put('a', 1); cache.put('a', 2)
+            sage: cache.get('a'), cache.stats()['evictions']
+            (2, 0)
+        """
+        self.__lock.acquire()
+        try:
+            link = self.__links.get(key)
+            if(link is not None):
+                link[3] = value
+                self.__unlink(link)
+                self.__append(link)
+                return
+            if(self.__maxsize <= 0):
+                return
+            self.__shrink(self.__maxsize - 1)
+            link = [None, None, key, value]
+            self.__links[key] = link
+            self.__append(link)
+        finally:
+            self.__lock.release()
+
+    def resize(self, maxsize):
+        r"""
+        Change the largest number of entries to ``maxsize``, forgetting
+        the least recently used entries that no longer fit.
+
+        EXAMPLES::
+
+            sage: from sage.logic.logiccache import LRUCache
+            sage: cache = LRUCache()
+            sage: for k in range(5):
+            ....:     cache.put(k, k)
+            sage: cache.resize(2)
+            sage: sorted(cache.stats().items())
+            [('evictions', 3), ('hits', 0), ('maxsize', 2), ('misses', 0), ('size', 2)]
+            sage: 3 in cache, 2 in cache
+            (True, False)
+        """
+        self.__lock.acquire()
+        try:
+            self.__maxsize = maxsize
+            self.__shrink(maxsize)
+        finally:
+            self.__lock.release()
+
+    def clear(self):
+        r"""
+        Remove every entry and reset the statistics.
+
+        EXAMPLES::
+
+            sage: from sage.logic.logiccache import LRUCache
+            sage: cache = LRUCache()
+            sage: cache.put('a', 1)
+            sage: cache.get('a')
+            1
+            sage: cache.clear()
+            sage: len(cache), cache.stats()['hits']
+            (0, 0)
+        """
+        self.__lock.acquire()
+        try:
+            self.__links.clear()
+            self.__root[:] = [self.__root, self.__root, None, None]
+            self.__hits = self.__misses = self.__evictions = 0
+        finally:
+            self.__lock.release()
+
+    def stats(self):
+        r"""
+        Return a dictionary with the number of ``hits``, ``misses`` and
+        ``evictions`` since the cache was made or cleared, and its current
+        ``size`` and ``maxsize``.
+
+        EXAMPLES::
+
+            sage: from sage.logic.logiccache import LRUCache
+            sage: cache = LRUCache(5)
+            sage: cache.get('a') is None
+            True
+            sage: sorted(cache.stats().items())
+            [('evictions', 0), ('hits', 0), ('maxsize', 5), ('misses', 1), ('size', 0)]
+        """
+        return {'hits': self.__hits, 'misses': self.__misses,
+                'evictions': self.__evictions, 'size': len(self.__links),
+                'maxsize': self.__maxsize}
+
+    def __shrink(self, size):
+        r"""
+        Forget the least recently used entries until at most ``size``
+        remain. The lock must be held.
+
+        EXAMPLES::
+
+            sage: from sage.logic.logiccache import LRUCache
+            sage: cache = LRUCache()
+            sage: cache.put('a', 1); cache.put('b', 2)
+            sage: cache._LRUCache__shrink(1)
+            sage: 'a' in cache, 'b' in cache
+            (False, True)
+        """
+        root = self.__root
+        while(len(self.__links) > max(size, 0)):
+            oldest = root[1]
+            self.__unlink(oldest)
+            del self.__links[oldest[2]]
+            self.__evictions += 1
+
+    def __unlink(self, link):
+        r"""
+        Remove ``link`` from the list of entries.
+
+        EXAMPLES::
+
+            sage: from sage.logic.logiccache import LRUCache
+            sage: cache = LRUCache()
+            sage: cache.put('a', 1)
+            sage: link = cache._LRUCache__links['a']
+            sage: cache._LRUCache__unlink(link)
+            sage: cache._LRUCache__root[1] is cache._LRUCache__root
+            True
+        """
+        link[0][1] = link[1]
+        link[1][0] = link[0]
+
+    def __append(self, link):
+        r"""
+        Insert ``link`` as the most recently used entry.
+
+        EXAMPLES::
+
+            sage: from sage.logic.logiccache import LRUCache
+            sage: cache = LRUCache()
+            sage: cache.put('a', 1); cache.put('b', 2)
+            sage: cache._LRUCache__root[0][2]
+            'b'
+        """
+        root = self.__root
+        last = root[0]
+        link[0] = last
+        link[1] = root
+        last[1] = link
+        root[0] = link
@@ -0,0 +1,326 @@
+r"""
+LogicCNF
+
+Module that converts parse trees of boolean formulas to conjunctive
+normal form, for use by the SAT solver in :mod:`sage.logic.logicsat` or
+by external solvers reading DIMACS files.
+
+Clauses are lists of nonzero integers in the DIMACS convention: the
+variable number ``k`` stands for the ``k``-th variable of ``vars_order``
+(counting from 1), ``-k`` for its negation, and numbers above
+``len(vars_order)`` for the auxiliary variables of the encoding.
+
+The Tseitin encoding gives every binary operation a new variable with
+clauses stating that it equals the operation on its operands.  The
+Plaisted-Greenbaum encoding keeps only the half of those clauses that the
+polarity of the operation in the formula requires, which is enough to
+preserve satisfiability.
+
+EXAMPLES::
+
+    sage: import sage.logic.logiccnf as logiccnf
+    sage: logiccnf.tseitin(['|', 'a', ['&', 'b', 'c']], ['a', 'b', 'c'])
+    ([[-4, 2], [-4, 3], [4, -2, -3], [-5, 1, 4], [5, -1], [5, -4]], 5, 5)
+    sage: logiccnf.tseitin(['|', 'a', ['&', 'b', 'c']], ['a', 'b', 'c'], polarity=True)
+    ([[-4, 2], [-4, 3], [-5, 1, 4]], 5, 5)
+"""
+#*****************************************************************************
+# Distributed under the terms of the GNU General Public License (GPL)
+# http://www.gnu.org/licenses/
+#*****************************************************************************
+
+def tseitin(tree, vars_order, polarity=False):
+    r"""
+    This function computes the Tseitin encoding of ``tree``.
+
+    Every binary operation of ``tree`` gets a new variable together with
+    the clauses stating that the variable equals the operation on its
+    operands, so the result has size linear in ``tree``.  Negations only
+    flip the sign of a literal.  A subtree object shared by several
+    parents, as in the trees made by
+    :func:`sage.logic.logicparser.intern_tree`, is encoded once.
+
+    INPUT:
+
+    - ``tree`` -- a parse tree as produced by
+      :func:`sage.logic.logicparser.parse`.
+    - ``vars_order`` -- a list of the variable names in ``tree``.
+    - ``polarity`` -- (default: ``False``) if ``True``, use the
+      Plaisted-Greenbaum encoding, which only constrains the new
+      variables in the direction needed for ``tree`` to be true.
+
+    OUTPUT:
+
+    - Returns the tuple ``(clauses, root, nvars)``. The formula is
+      satisfiable exactly when ``clauses`` together with the unit clause
+      ``[root]`` are, and any such assignment restricted to the first
+      ``len(vars_order)`` variables satisfies the formula.  Unless
+      ``polarity`` is set, the same holds for ``[-root]`` and the
+      negation of the formula.  ``nvars`` is the number of variables
+      used.
+
+    EXAMPLES::
+
+        sage: import sage.logic.logiccnf as logiccnf
+        sage: logiccnf.tseitin(['->', 'a', ['~', 'b', None]], ['a', 'b'])
+        ([[-3, -1, -2], [3, 1], [3, 2]], 3, 3)
+        sage: logiccnf.tseitin(['~', 'a', None], ['a'])
+        ([], -1, 1)
+
+    Every variable in ``tree`` must appear in ``vars_order``::
+
+        sage: logiccnf.tseitin(['&', 'a', 'b'], ['a'])
+        Traceback (most recent call last):
+        ...
+        KeyError: 'b'
+    """
+    result = []
+    clauses = list(_gate_clauses(tree, vars_order, polarity, result))
+    return clauses, result[0], result[1]
+
+def iter_clauses(tree, vars_order, polarity=False):
+    r"""
+    This function iterates over the clauses of a formula in conjunctive
+    normal form that is satisfiable exactly when ``tree`` is.
+
+    The clauses of :func:`tseitin` are produced one at a time while the
+    tree is walked, followed by the unit clause of the root, so they
+    need not be held in memory.
+
+    INPUT:
+
+    - ``tree`` -- a parse tree as produced by
+      :func:`sage.logic.logicparser.parse`.
+    - ``vars_order`` -- a list of the variable names in ``tree``.
+    - ``polarity`` -- (default: ``False``) if ``True``, use the
+      Plaisted-Greenbaum encoding.
+
+    EXAMPLES::
+
+        sage: import sage.logic.logiccnf as logiccnf
+        sage: list(logiccnf.iter_clauses(['<->', 'a', 'b'], ['a', 'b'], True))
+        [[3, -1, 2], [3, 1, -2], [-3]]
+    """
+    result = []
+    for c in _gate_clauses(tree, vars_order, polarity, result):
+        yield c
+    yield [result[0]]
+
+def cnf_size(tree, vars_order, polarity=False):
+    r"""
+    This function returns the number of variables and of clauses produced
+    by :func:`iter_clauses`, without producing them.
+
+    EXAMPLES::
+
+        sage: import sage.logic.logiccnf as logiccnf
+        sage: tree = ['<->', ['&', 'a', 'b'], ['|', 'a', ['~', 'c', None]]]
+        sage: logiccnf.cnf_size(tree, ['a', 'b', 'c'])
+        (6, 11)
+        sage: logiccnf.cnf_size(tree, ['a', 'b', 'c'], True)
+        (6, 9)
+        sage: logiccnf.cnf_size(['->', ['&', 'a', 'b'], 'c'], ['a', 'b', 'c'], True)
+        (5, 3)
+    """
+    nodes, polarities = _polarities(tree, polarity)
+    nvars = len(vars_order)
+    nclauses = 1
+    for node in nodes:
+        op = node[0]
+        p = polarities[id(node)]
+        if(op == '~'):
+            continue
+        nvars += 1
+        if(op == '^' or op == '<->'):
+            nclauses += 2 * (p >= 0) + 2 * (p <= 0)
+        elif(op == '&'):
+            nclauses += 2 * (p >= 0) + (p <= 0)
+        else:
+            nclauses += (p >= 0) + 2 * (p <= 0)
+    return nvars, nclauses
+
+def write_dimacs(f, tree, vars_order, polarity=True):
+    r"""
+    This function writes to ``f`` the clauses of :func:`iter_clauses` in
+    the DIMACS format read by most SAT solvers.
+
+    The header is computed by :func:`cnf_size` and the clauses are then
+    written as they are produced, so formulas much larger than memory
+    allows for a list of clauses can be written.  Comment lines give the
+    name of each variable of ``vars_order``.
+
+    INPUT:
+
+    - ``f`` -- a file-like object with a ``write`` method.
+    - ``tree`` -- a parse tree as produced by
+      :func:`sage.logic.logicparser.parse`.
+    - ``vars_order`` -- a list of the variable names in ``tree``.
+    - ``polarity`` -- (default: ``True``) if ``True``, use the
+      Plaisted-Greenbaum encoding, otherwise the full Tseitin encoding.
+
+    EXAMPLES::
+
+        sage: import sys, sage.logic.logiccnf as logiccnf
+        sage: logiccnf.write_dimacs(sys.stdout, ['^', 'p', ['~', 'q', None]], ['p', 'q'])
+        c 1 p
+        c 2 q
+        p cnf 3 3
+        -3 1 -2 0
+        -3 -1 2 0
+        3 0
+    """
+    nvars, nclauses = cnf_size(tree, vars_order, polarity)
+    for i in range(len(vars_order)):
+        f.write('c %d %s\n' % (i + 1, vars_order[i]))
+    f.write('p cnf %d %d\n' % (nvars, nclauses))
+    for c in iter_clauses(tree, vars_order, polarity):
+        f.write(' '.join([str(l) for l in c]) + ' 0\n')
+
+def _gate_clauses(tree, vars_order, polarity, result):
+    r"""
+    Iterate over the clauses defining the new variables of the encoding
+    of ``tree`` and, when done, append the root literal and the number of
+    variables to the list ``result``.
+
+    EXAMPLES::
+
+        sage: import sage.logic.logiccnf as logiccnf
+        sage: result = []
+        sage: list(logiccnf._gate_clauses(['&', 'a', 'b'], ['a', 'b'], True, result))
+        [[-3, 1], [-3, 2]]
+        sage: result
+        [3, 3]
+    """
+    index = {}
+    for i in range(len(vars_order)):
+        index[vars_order[i]] = i + 1
+    nodes, polarities = _polarities(tree, polarity)
+    nvars = len(vars_order)
+    lits = {}
+    for node in nodes:
+        if(isinstance(node[1], list)):
+            a = lits[id(node[1])]
+        else:
+            a = index[node[1]]
+        if(node[0] == '~'):
+            lits[id(node)] = -a
+            continue
+        if(isinstance(node[2], list)):
+            b = lits[id(node[2])]
+        else:
+            b = index[node[2]]
+        p = polarities[id(node)]
+        nvars += 1
+        if(node[0] == '<->'):
+            for c in _encode('^', nvars, a, b, -p):
+                yield c
+            lits[id(node)] = -nvars
+        else:
+            for c in _encode(node[0], nvars, a, b, p):
+                yield c
+            lits[id(node)] = nvars
+    if(isinstance(tree, list)):
+        result.extend([lits[id(tree)], nvars])
+    else:
+        result.extend([index[tree], nvars])
+
+def _polarities(tree, polarity):
+    r"""
+    Return the list of the distinct operation nodes of ``tree`` in
+    post-order, and a dictionary giving the polarity of each node by
+    ``id``: 1 or -1 if all its occurrences have that polarity, 0 if not
+    or if ``polarity`` is ``False``.
+
+    EXAMPLES::
+
+        sage: import sage.logic.logiccnf as logiccnf
+        sage: t = ['&', 'a', 'b']
+        sage: nodes, polarities = logiccnf._polarities(['|', t, ['~', t, None]], True)
+        sage: nodes
+        [['&', 'a', 'b'], ['~', ['&', 'a', 'b'], None], ['|', ['&', 'a', 'b'], ['~', ['&', 'a', 'b'], None]]]
+        sage: [polarities[id(node)] for node in nodes]
+        [0, 1, 1]
+    """
+    nodes = []
+    seen = set()
+    stack = [(tree, False)]
+    while(stack):
+        node, ready = stack.pop()
+        if(not isinstance(node, list)):
+            continue
+        if(ready):
+            nodes.append(node)
+            continue
+        if(id(node) in seen):
+            continue
+        seen.add(id(node))
+        stack.append((node, True))
+        stack.append((node[2], False))
+        stack.append((node[1], False))
+    polarities = {id(tree): int(bool(polarity))}
+    for node in reversed(nodes):
+        for child, q in _children(node, polarities[id(node)]):
+            if(isinstance(child, list)):
+                p = polarities.get(id(child), q)
+                if(p != q):
+                    q = 0
+                polarities[id(child)] = q
+    return nodes, polarities
+
+def _children(node, p):
+    r"""
+    Return the operands of the operation ``node`` occurring with polarity
+    ``p``, each with its own polarity: 1 if it only needs to imply its
+    variable, -1 if it only needs to be implied by it, 0 for both.
+
+    EXAMPLES::
+
+        sage: import sage.logic.logiccnf as logiccnf
+        sage: logiccnf._children(['->', 'a', 'b'], 1)
+        [('a', -1), ('b', 1)]
+        sage: logiccnf._children(['~', 'a', None], 1)
+        [('a', -1)]
+    """
+    op = node[0]
+    if(op == '~'):
+        return [(node[1], -p)]
+    if(op == '^' or op == '<->'):
+        return [(node[1], 0), (node[2], 0)]
+    if(op == '->'):
+        return [(node[1], -p), (node[2], p)]
+    return [(node[1], p), (node[2], p)]
+
+def _encode(op, x, a, b, polarity=0):
+    r"""
+    Return the clauses stating that the variable ``x`` implies ``a op b``
+    if ``polarity`` is at least 0, and that ``a op b`` implies ``x`` if
+    ``polarity`` is at most 0.
+
+    EXAMPLES::
+
+        sage: import sage.logic.logiccnf as logiccnf
+        sage: logiccnf._encode('^', 3, 1, 2)
+        [[-3, 1, 2], [-3, -1, -2], [3, -1, 2], [3, 1, -2]]
+        sage: logiccnf._encode('|', 3, 1, 2, -1)
+        [[3, -1], [3, -2]]
+    """
+    if(op == '&'):
+        implies = [[-x, a], [-x, b]]
+        implied = [[x, -a, -b]]
+    elif(op == '|'):
+        implies = [[-x, a, b]]
+        implied = [[x, -a], [x, -b]]
+    elif(op == '->'):
+        implies = [[-x, -a, b]]
+        implied = [[x, a], [x, -b]]
+    elif(op == '^'):
+        implies = [[-x, a, b], [-x, -a, -b]]
+        implied = [[x, -a, b], [x, a, -b]]
+    else:
+        raise ValueError('unknown operator %s' % op)
+    clauses = []
+    if(polarity >= 0):
+        clauses.extend(implies)
+    if(polarity <= 0):
+        clauses.extend(implied)
+    return clauses
@@ -0,0 +1,444 @@
+r"""
+LogicCount
+
+Module that counts the rows of a truth table on which a formula is true
+without enumerating them.
+
+The formula is converted to conjunctive normal form by the Tseitin
+encoding of :mod:`sage.logic.logiccnf`, whose new variables are
+determined by the variables of the formula, so the formula and its
+encoding have the same number of models.  These are counted by a
+DPLL-style search: the variable occurring most often is chosen, both of
+its values are propagated, and the clauses left over are split into
+connected components, which share no variable and are counted
+separately.  The count of every component is kept in a cache, so a
+component met again on another branch is not searched twice, and a
+component of at most ``table_limit`` variables is counted from its
+truth table, computed with one bitwise operation per literal.
+
+EXAMPLES::
+
+    sage: from sage.logic.logiccount import count_models
+    sage: count_models(['|', 'a', ['&', 'b', 'c']], ['a', 'b', 'c'])
+    5
+    sage: count_models(['->', 'a', 'b'], ['a', 'b', 'c', 'd'])
+    12
+"""
+#*****************************************************************************
+# Distributed under the terms of the GNU General Public License (GPL)
+# http://www.gnu.org/licenses/
+#*****************************************************************************
+
+import logiccnf
+from logiccache import LRUCache
+from logiceval import row_mask
+
+#Largest number of variables of a component counted by its truth table
+table_limit = 16
+
+def count_models(tree, vars_order, cache_size=100000):
+    r"""
+    This function returns the number of assignments of the variables in
+    ``vars_order`` that make ``tree`` true.
+
+    INPUT:
+
+    - ``tree`` -- a parse tree as produced by
+      :func:`sage.logic.logicparser.parse`.
+    - ``vars_order`` -- a list of the variable names, which must include
+      those of ``tree``; the others may take either value.
+    - ``cache_size`` -- (default: 100000) the largest number of component
+      counts kept, in a :class:`sage.logic.logiccache.LRUCache`.
+
+    OUTPUT:
+
+    - Returns the exact number of models, an integer between 0 and
+      ``2^n`` for ``n`` variables.
+
+    EXAMPLES::
+
+        sage: from sage.logic.logiccount import count_models
+        sage: count_models(['<->', 'a', 'b'], ['a', 'b'])
+        2
+        sage: count_models(['&', 'a', ['~', 'a', None]], ['a'])
+        0
+
+    Independent parts of a formula are counted separately, so a formula
+    of many variables can be counted although its table could never be
+    built::
+
+        sage: t = 'x0'
+        sage: for i in range(1, 150):
+        ....:     t = ['&', t, ['|', 'x%d' % i, 'y%d' % i]]
+        sage: vars_order = ['x%d' % i for i in range(150)] + ['y%d' % i for i in range(1, 150)]
+        sage: count_models(t, vars_order) == 3 ** 149
+        True
+
+    The new variables of the encoding are branched on as well, which cuts
+    a chain of exclusive ors in two, and the search does not recurse, so
+    its depth is not limited::
+
+        sage: import sage.logic.logicparser as logicparser
+        sage: xs = ['x%d' % i for i in range(200)]
+        sage: count_models(logicparser.parse('^'.join(xs))[0], xs) == 2 ** 199
+        True
+        sage: xs = ['x%d' % i for i in range(1200)]
+        sage: count_models(logicparser.parse('|'.join(xs))[0], xs) == 2 ** 1200 - 1
+        True
+    """
+    n = len(vars_order)
+    index = {}
+    for i in range(n):
+        index[vars_order[i]] = i + 1
+    clauses, others = _split_clauses(tree, index)
+    nvars = n
+    if(others):
+        rest = others[0]
+        for t in others[1:]:
+            rest = ['&', rest, t]
+        gates, root, nvars = logiccnf.tseitin(rest, vars_order)
+        clauses.extend(gates)
+        clauses.append([root])
+    normal = []
+    units = []
+    for c in clauses:
+        c = tuple(sorted(set(c)))
+        for i in range(len(c) - 1):
+            if(c[i] == -c[i + 1]):       #a tautology
+                break
+        else:
+            normal.append(c)
+            if(len(c) == 1):
+                units.append(c[0])
+    result = _propagate(normal, units)
+    if(result is None):
+        return 0
+    rest, assigned = result
+    variables = set(range(1, nvars + 1)) - assigned
+    return _count(rest, variables, LRUCache(cache_size))
+
+def _split_clauses(tree, index):
+    r"""
+    Return the list of the clauses of the conjuncts of ``tree`` that are
+    disjunctions of variables and negated variables, numbered by
+    ``index``, and the list of the other conjuncts.
+
+    Only the other conjuncts need the new variables of the Tseitin
+    encoding.
+
+    EXAMPLES::
+
+        sage: import sage.logic.logiccount as logiccount
+        sage: t = ['&', ['->', 'a', 'b'], ['~', ['|', 'c', ['^', 'a', 'c']], None]]
+        sage: logiccount._split_clauses(t, {'a': 1, 'b': 2, 'c': 3})
+        ([[-1, 2], [-3]], [['~', ['^', 'a', 'c'], None]])
+    """
+    clauses = []
+    others = []
+    stack = [(tree, 1)]
+    while(stack):
+        t, sign = stack.pop()
+        op = _signed_op(t, sign)
+        if(op == '&'):
+            stack.append((t[2], _signs(t, sign)[1]))
+            stack.append((t[1], _signs(t, sign)[0]))
+            continue
+        if(op == '~'):
+            stack.append((t[1], -sign))
+            continue
+        lits = _clause(t, sign, index)
+        if(lits is not None):
+            clauses.append(lits)
+        elif(sign == 1):
+            others.append(t)
+        else:
+            others.append(['~', t, None])
+    return clauses, others
+
+def _clause(tree, sign, index):
+    r"""
+    Return the clause of ``tree``, negated if ``sign`` is -1, if it is a
+    disjunction of variables and negated variables, and ``None`` if not.
+
+    EXAMPLES::
+
+        sage: import sage.logic.logiccount as logiccount
+        sage: logiccount._clause(['->', 'a', ['|', 'b', ['~', 'c', None]]], 1, {'a': 1, 'b': 2, 'c': 3})
+        [-1, 2, -3]
+        sage: logiccount._clause(['|', 'a', 'b'], -1, {'a': 1, 'b': 2}) is None
+        True
+    """
+    lits = []
+    stack = [(tree, sign)]
+    while(stack):
+        t, sign = stack.pop()
+        op = _signed_op(t, sign)
+        if(op is None):
+            lits.append(sign * index[t])
+        elif(op == '~'):
+            stack.append((t[1], -sign))
+        elif(op == '|'):
+            signs = _signs(t, sign)
+            stack.append((t[2], signs[1]))
+            stack.append((t[1], signs[0]))
+        else:
+            return None
+    return lits
+
+def _signed_op(tree, sign):
+    r"""
+    Return the operation of ``tree``, negated if ``sign`` is -1, as
+    ``'&'`` or ``'|'`` when it is one of them, ``'~'`` for a negation,
+    ``None`` for a variable and ``'^'`` otherwise.
+
+    EXAMPLES::
+
+        sage: import sage.logic.logiccount as logiccount
+        sage: logiccount._signed_op(['->', 'a', 'b'], -1), logiccount._signed_op('a', -1)
+        ('&', None)
+    """
+    if(not isinstance(tree, list)):
+        return None
+    op = tree[0]
+    if(op == '~'):
+        return '~'
+    if(op == '->'):
+        op = '|'
+    if(op == '&' or op == '|'):
+        if(sign == -1):
+            return {'&': '|', '|': '&'}[op]
+        return op
+    return '^'
+
+def _signs(tree, sign):
+    r"""
+    Return the signs of the operands of the ``'&'``, ``'|'`` or
+    ``'->'`` node ``tree`` in its operation given by :func:`_signed_op`.
+
+    EXAMPLES::
+
+        sage: import sage.logic.logiccount as logiccount
+        sage: logiccount._signs(['->', 'a', 'b'], 1), logiccount._signs(['&', 'a', 'b'], -1)
+        ((-1, 1), (-1, -1))
+    """
+    if(tree[0] == '->'):
+        return -sign, sign
+    return sign, sign
+
+def _count(clauses, variables, cache):
+    r"""
+    Return the number of assignments of the set ``variables`` satisfying
+    ``clauses``, which only use variables of ``variables``.
+
+    The search is kept on an explicit stack rather than in recursive
+    calls, so the number of branchings on one path is not limited by the
+    recursion limit.  A frame of the stack is either a product over the
+    components of a set of clauses or the sum over the two values of the
+    variable branched on in a component, with the count found so far and
+    the components or values left.
+
+    EXAMPLES::
+
+        sage: import sage.logic.logiccount as logiccount
+        sage: from sage.logic.logiccache import LRUCache
+        sage: logiccount._count([(1, 2), (3, 4)], set([1, 2, 3, 4, 5]), LRUCache())
+        18
+    """
+    stack = [_product_frame(clauses, variables)]
+    value = None
+    while(True):
+        frame = stack[-1]
+        if(value is not None):
+            if(frame[0] is None):
+                frame[1] *= value
+                if(frame[1] == 0):
+                    del frame[2][:]
+            else:
+                frame[1] += value
+            value = None
+        if(not frame[2]):
+            stack.pop()
+            if(frame[0] is not None):
+                cache.put(frame[0], frame[1])
+            if(not stack):
+                return frame[1]
+            value = frame[1]
+        elif(frame[0] is None):
+            comp, comp_vars = frame[2].pop()
+            key = frozenset(comp)
+            value = cache.get(key)
+            if(value is not None):
+                continue
+            if(len(comp_vars) <= table_limit):
+                value = _count_table(comp, comp_vars)
+                cache.put(key, value)
+                continue
+            v = _branch_variable(comp)
+            stack.append([key, 0, [-v, v], comp, comp_vars])
+        else:
+            result = _propagate(frame[3], [frame[2].pop()])
+            if(result is not None):
+                rest, assigned = result
+                stack.append(_product_frame(rest, frame[4] - assigned))
+
+def _product_frame(clauses, variables):
+    r"""
+    Return the frame of :func:`_count` for the product over the connected
+    components of ``clauses``, starting from the number of assignments of
+    the variables of ``variables`` they do not use.
+
+    EXAMPLES::
+
+        sage: import sage.logic.logiccount as logiccount
+        sage: logiccount._product_frame([(1, 2), (-2, 3)], set([1, 2, 3, 4]))
+        [None, 2, [([(1, 2), (-2, 3)], set([1, 2, 3]))]]
+    """
+    components = _components(clauses)
+    free = len(variables) - sum([len(v) for c, v in components])
+    return [None, 2 ** free, components]
+
+def _branch_variable(clauses):
+    r"""
+    Return the variable branched on in the connected component
+    ``clauses``: the one occurring most often, counting the new variables
+    of the Tseitin encoding as well, so that a chain of gates falls
+    apart into components.
+
+    EXAMPLES::
+
+        sage: import sage.logic.logiccount as logiccount
+        sage: logiccount._branch_variable([(1, 2), (-2, 3), (2, -3)])
+        2
+    """
+    occurrences = {}
+    for c in clauses:
+        for lit in c:
+            v = abs(lit)
+            occurrences[v] = occurrences.get(v, 0) + 1
+    return max(occurrences, key=occurrences.get)
+
+def _count_table(clauses, variables):
+    r"""
+    Return the number of assignments of the set ``variables`` satisfying
+    ``clauses`` by evaluating the clauses on the rows of the truth table
+    of ``variables`` at once, as :func:`sage.logic.logiceval.eval_bitmask`
+    does.
+
+    EXAMPLES::
+
+        sage: import sage.logic.logiccount as logiccount
+        sage: logiccount._count_table([(1, 2), (-2, 3)], set([1, 2, 3]))
+        4
+    """
+    size = 1 << len(variables)
+    full = (1 << size) - 1
+    masks = {}
+    j = 0
+    for v in variables:
+        masks[v] = row_mask(j, 0, size)
+        masks[-v] = masks[v] ^ full
+        j += 1
+    rows = full
+    for c in clauses:
+        x = 0
+        for l in c:
+            x |= masks[l]
+        rows &= x
+    return bin(rows).count('1')
+
+def _propagate(clauses, lits):
+    r"""
+    Set the literals ``lits`` true in ``clauses`` and propagate the unit
+    clauses that follow.
+
+    OUTPUT:
+
+    - Returns ``None`` if a clause becomes false, and otherwise the pair
+      of the list of the clauses not yet satisfied, without their false
+      literals, and the set of the variables assigned.
+
+    EXAMPLES::
+
+        sage: import sage.logic.logiccount as logiccount
+        sage: logiccount._propagate([(-1, 2), (-2, 3), (3, 4), (-3, 4, 5)], [1])
+        ([(4, 5)], set([1, 2, 3]))
+        sage: logiccount._propagate([(-1, 2), (-1, -2)], [1]) is None
+        True
+        sage: logiccount._propagate([(1, 2)], [1, -1]) is None
+        True
+    """
+    occurs = {}
+    for i in range(len(clauses)):
+        for l in clauses[i]:
+            occurs.setdefault(l, []).append(i)
+    size = [len(c) for c in clauses]
+    true = set(lits)
+    for lit in lits:
+        if(-lit in true):
+            return None
+    queue = list(true)
+    while(queue):
+        l = queue.pop()
+        for i in occurs.get(-l, ()):
+            size[i] -= 1
+            if(size[i] > 1):
+                continue
+            unit = None
+            for l2 in clauses[i]:
+                if(l2 in true):
+                    break
+                if(-l2 not in true):
+                    unit = l2
+            else:
+                if(unit is None):
+                    return None
+                true.add(unit)
+                queue.append(unit)
+    rest = []
+    for c in clauses:
+        for l in c:
+            if(l in true):
+                break
+        else:
+            rest.append(tuple([l for l in c if -l not in true]))
+    return rest, set([abs(l) for l in true])
+
+def _components(clauses):
+    r"""
+    Return the list of the connected components of ``clauses``, two
+    clauses being connected if they share a variable, each as the pair of
+    its list of clauses and its set of variables.
+
+    EXAMPLES::
+
+        sage: import sage.logic.logiccount as logiccount
+        sage: logiccount._components([(1, 2), (3,), (-2, 4)])
+        [([(1, 2), (-2, 4)], set([1, 2, 4])), ([(3,)], set([3]))]
+    """
+    by_var = {}
+    for i in range(len(clauses)):
+        for l in clauses[i]:
+            by_var.setdefault(abs(l), []).append(i)
+    done = [False] * len(clauses)
+    components = []
+    for i in range(len(clauses)):
+        if(done[i]):
+            continue
+        done[i] = True
+        members = [i]
+        variables = set()
+        k = 0
+        while(k < len(members)):
+            for l in clauses[members[k]]:
+                v = abs(l)
+                if(v in variables):
+                    continue
+                variables.add(v)
+                for j in by_var[v]:
+                    if(not done[j]):
+                        done[j] = True
+                        members.append(j)
+            k += 1
+        members.sort()
+        components.append(([clauses[j] for j in members], variables))
+    return components
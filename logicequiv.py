@@ -0,0 +1,180 @@
+r"""
+LogicEquiv
+
+Module that decides whether two boolean formulas are equivalent without
+building their truth tables.
+
+Two formulas are first evaluated together on random assignments of
+their variables, many at once in the bits of an integer as in
+:func:`sage.logic.logiceval.eval_bitmask`.  Formulas that differ usually
+differ on some of these, which gives a counterexample at once.
+Otherwise a miter, the exclusive or of the two formulas, is built from
+interned nodes by :func:`sage.logic.logicparser.intern_tree`, so that the
+subformulas they share are encoded once, and it is shown unsatisfiable
+by the solver of :mod:`sage.logic.logicsat` or reduced to ``False`` by a
+:class:`sage.logic.logicbdd.BDD`.
+
+EXAMPLES::
+
+    sage: import sage.logic.logicparser as logicparser
+    sage: from sage.logic.logicequiv import equivalent
+    sage: a = logicparser.parse('(p->q)&(q->p)')[0]
+    sage: b = logicparser.parse('p<->q')[0]
+    sage: equivalent(a, b)
+    (True, None)
+    sage: equivalent(a, logicparser.parse('p|q')[0], seed=0)
+    (False, {'q': True, 'p': False})
+"""
+#*****************************************************************************
+# Distributed under the terms of the GNU General Public License (GPL)
+# http://www.gnu.org/licenses/
+#*****************************************************************************
+
+import random
+
+import logicbdd
+import logiccnf
+import logiceval
+import logicparser
+import logicsat
+
+def equivalent(tree1, tree2, vars_order=None, rounds=4, seed=None, algorithm='sat'):
+    r"""
+    This function decides whether ``tree1`` and ``tree2`` take the same
+    value for every assignment of their variables.
+
+    INPUT:
+
+    - ``tree1``, ``tree2`` -- parse trees as produced by
+      :func:`sage.logic.logicparser.parse`.
+    - ``vars_order`` -- (default: ``None``) a list of the variable names,
+      which must include those of both trees; if ``None``, the variables
+      of ``tree1`` and then those of ``tree2``, in the order they appear.
+    - ``rounds`` -- (default: 4) the number of rounds of random
+      simulation, each on ``sage.logic.logiceval.sample_width``
+      assignments, before the miter is built; 0 skips the simulation.
+    - ``seed`` -- (default: ``None``) the seed of the random assignments,
+      for reproducible counterexamples.
+    - ``algorithm`` -- (default: ``'sat'``) how the miter is decided:
+
+      - ``'sat'`` -- by the solver of :mod:`sage.logic.logicsat`, which
+        suits formulas with many variables.
+      - ``'bdd'`` -- by building both formulas in a
+        :class:`sage.logic.logicbdd.BDD`.
+
+    OUTPUT:
+
+    - Returns ``(True, None)`` if the trees are equivalent, and otherwise
+      ``(False, counterexample)`` where ``counterexample`` is a
+      dictionary assigning ``True`` or ``False`` to each variable on
+      which the trees differ.
+
+    EXAMPLES::
+
+        sage: import sage.logic.logicparser as logicparser
+        sage: from sage.logic.logicequiv import equivalent
+        sage: a = logicparser.parse('~(x&y)|z')[0]
+        sage: b = logicparser.parse('(x->(y->z))')[0]
+        sage: equivalent(a, b, algorithm='bdd')
+        (True, None)
+
+    A difference on one assignment among many is found by the miter::
+
+        sage: xs = ['x%d' % i for i in range(40)]
+        sage: a = logicparser.parse('|'.join(xs))[0]
+        sage: b = logicparser.parse('|'.join(xs[:-1]) + '|(x39&x0)')[0]
+        sage: result, counterexample = equivalent(a, b)
+        sage: result, [x for x in xs if counterexample[x]]
+        (False, ['x39'])
+        sage: equivalent(a, b, algorithm='bdd')[1] == counterexample
+        True
+    """
+    if(vars_order is None):
+        vars_order = _variables([tree1, tree2])
+    if(rounds > 0):
+        rng = random.Random(seed)
+        for i in range(rounds):
+            counterexample = simulate(tree1, tree2, vars_order, rng)
+            if(counterexample is not None):
+                return False, counterexample
+    miter = logicparser.intern_tree(['^', tree1, tree2])
+    if(miter[1] is miter[2]):          #structurally equal
+        return True, None
+    if(algorithm == 'sat'):
+        clauses, root, nvars = logiccnf.tseitin(miter, vars_order)
+        solver = logicsat.Solver(nvars)
+        for c in clauses:
+            solver.add_clause(c)
+        if(not solver.solve([root])):
+            return True, None
+        model = solver.model()
+        return False, dict([(vars_order[i], model[i] > 0)
+                            for i in range(len(vars_order))])
+    elif(algorithm == 'bdd'):
+        bdd = logicbdd.BDD(vars_order)
+        assignment = bdd.satone(bdd.build(miter))
+        if(assignment is None):
+            return True, None
+        return False, dict([(v, assignment.get(v, False)) for v in vars_order])
+    else:
+        raise ValueError('unknown algorithm %s' % algorithm)
+
+def simulate(tree1, tree2, vars_order, rng, width=None):
+    r"""
+    This function evaluates ``tree1`` and ``tree2`` on ``width`` random
+    assignments at once and returns one on which they differ.
+
+    The assignments are drawn by :func:`sage.logic.logiceval.falsify`
+    looking for one that makes the equivalence of the trees false, so the
+    nodes they share are evaluated once.
+
+    INPUT:
+
+    - ``tree1``, ``tree2`` -- parse trees.
+    - ``vars_order`` -- a list of the variable names in the trees.
+    - ``rng`` -- a ``random.Random`` instance giving the assignments.
+    - ``width`` -- (default: ``None``) the number of assignments; if
+      ``None``, ``sage.logic.logiceval.sample_width``.
+
+    OUTPUT:
+
+    - Returns the first assignment on which the trees differ, as a
+      dictionary from the variable names to ``True`` or ``False``, or
+      ``None`` if they agree on all of them.
+
+    EXAMPLES::
+
+        sage: import random
+        sage: from sage.logic.logicequiv import simulate
+        sage: simulate(['&', 'a', 'b'], ['~', ['|', 'a', 'b'], None], ['a', 'b'], random.Random(1), 8)
+        {'a': False, 'b': False}
+        sage: simulate(['->', 'a', 'b'], ['|', ['~', 'a', None], 'b'], ['a', 'b'], random.Random(1)) is None
+        True
+    """
+    return logiceval.falsify(['<->', tree1, tree2], vars_order, rng, width)
+
+def _variables(trees):
+    r"""
+    Return the list of the variable names of ``trees`` in the order they
+    first appear.
+
+    EXAMPLES::
+
+        sage: import sage.logic.logicequiv as logicequiv
+        sage: logicequiv._variables([['&', 'b', ['~', 'a', None]], ['|', 'c', 'b']])
+        ['b', 'a', 'c']
+    """
+    seen = set()
+    names = []
+    stack = list(reversed(trees))
+    while(stack):
+        node = stack.pop()
+        if(isinstance(node, list)):
+            if(id(node) not in seen):
+                seen.add(id(node))
+                stack.append(node[2])
+                stack.append(node[1])
+        elif(node is not None and node not in seen):
+            seen.add(node)
+            names.append(node)
+    return names
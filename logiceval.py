@@ -0,0 +1,926 @@
+r"""
+LogicEval
+
+Module that evaluates parse trees of boolean formulas without parsing
+them again for every assignment of the variables.
+
+A parse tree has the form produced by :mod:`sage.logic.logicparser`:
+a variable name is a leaf, a negation is the list ``['~', t, None]``
+and a binary operation is the list ``[op, lt, rt]`` where ``op`` is one
+of ``'&'``, ``'|'``, ``'^'``, ``'->'`` or ``'<->'``.
+
+EXAMPLES::
+
+    sage: import sage.logic.logiceval as logiceval
+    sage: f = logiceval.compile_tree(['|', 'a', ['&', 'b', 'c']], ['a', 'b', 'c'])
+    sage: f([False, True, True])
+    True
+    sage: f([False, True, False])
+    False
+"""
+#*****************************************************************************
+# Distributed under the terms of the GNU General Public License (GPL)
+# http://www.gnu.org/licenses/
+#*****************************************************************************
+
+import itertools
+import random
+import sys
+
+import logicparser
+
+#Number of random assignments evaluated at once by falsify
+sample_width = 4096
+
+#Bit of each accepted value of a variable in an assignment of eval_rows
+__bit_text = {True: '1', False: '0', 'True': '1', 'False': '0',
+              'true': '1', 'false': '0', '1': '1', '0': '0'}
+
+def compile_tree(tree, vars_order):
+    r"""
+    This function compiles ``tree`` into a function of one row assignment.
+
+    The returned function takes a sequence of booleans, one per variable
+    in the order of ``vars_order``, and returns the value of ``tree`` for
+    that assignment.  The tree is compiled once into straight-line code
+    with one assignment per node, so evaluating a row does no parsing at
+    all.
+
+    INPUT:
+
+    - ``tree`` -- a parse tree.
+    - ``vars_order`` -- a list of the variable names in ``tree``, in the
+      order the row values are given.
+
+    OUTPUT:
+
+    - Returns a function mapping a row assignment to ``True`` or ``False``.
+
+    EXAMPLES::
+
+        sage: import sage.logic.logiceval as logiceval
+        sage: f = logiceval.compile_tree(['->', 'a', ['~', 'b', None]], ['b', 'a'])
+        sage: [f([b, a]) for a in [False, True] for b in [False, True]]
+        [True, True, True, False]
+
+    Every variable in ``tree`` must appear in ``vars_order``::
+
+        sage: logiceval.compile_tree(['&', 'a', 'b'], ['a'])
+        Traceback (most recent call last):
+        ...
+        KeyError: 'b'
+    """
+    index = {}
+    for i in range(len(vars_order)):
+        index[vars_order[i]] = i
+    return _compile_node(tree, index)
+
+def _compile_node(tree, index):
+    r"""
+    Return the function evaluating ``tree`` where ``index`` maps each
+    variable name to its position in the row assignment.  The function
+    is straight-line code with one assignment per node, in post-order,
+    so neither making nor calling it recurses however deep ``tree`` is,
+    and a subtree shared by several parents is computed once.
+
+    EXAMPLES::
+
+        sage: import sage.logic.logiceval as logiceval
+        sage: f = logiceval._compile_node(['^', 'a', 'b'], {'a': 0, 'b': 1})
+        sage: f([True, True]), f([True, False])
+        (False, True)
+        sage: t = 'x'
+        sage: for i in range(5000):
+        ....:     t = ['|', t, 'y']
+        sage: logiceval._compile_node(t, {'x': 0, 'y': 1})([False, True])
+        True
+    """
+    lines = []
+    def visit(node, l, r):
+        name = 'x%d' % len(lines)
+        lines.append('    %s = %s' % (name, _node_code[node[0]] % _operands(node, l, r)))
+        return name
+    root = logicparser._post_order(tree, visit, lambda v: 'v[%d]' % index[v])
+    return _make_function(lines + ['    return ' + root])
+
+def eval_bitmask(tree, vars_order, start=0, end=-1):
+    r"""
+    This function evaluates ``tree`` on every row of a truth table at once.
+
+    Row ``i`` of the table assigns to the variable ``vars_order[m]`` bit
+    ``n - 1 - m`` of ``i``, where ``n`` is the number of variables, so the
+    rows are counted in binary with the first variable as the high bit.
+    Each variable is given the integer whose bit ``k`` is its value in row
+    ``start + k``, and each node of ``tree`` is then a single bitwise
+    operation on arbitrary-precision integers.
+
+    INPUT:
+
+    - ``tree`` -- a parse tree.
+    - ``vars_order`` -- a list of the variable names in ``tree``.
+    - ``start`` -- an integer representing the first row, initialized
+      to 0.
+    - ``end`` -- an integer representing the row after the last one,
+      initialized to -1 which is converted to ``2^n``.
+
+    OUTPUT:
+
+    - Returns an integer whose bit ``k`` is the value of ``tree`` in
+      row ``start + k``.
+
+    EXAMPLES::
+
+        sage: import sage.logic.logiceval as logiceval
+        sage: hex(logiceval.eval_bitmask('b', ['a', 'b']))
+        '0xa'
+        sage: bin(logiceval.eval_bitmask(['&', 'a', 'b'], ['a', 'b']))
+        '0b1000'
+        sage: bin(logiceval.eval_bitmask(['~', 'c', None], ['a', 'b', 'c'], 2, 7))
+        '0b10101'
+    """
+    n = len(vars_order)
+    if(end == -1):
+        end = 2 ** n
+    length = max(end - start, 0)
+    masks = {}
+    for m in range(n):
+        masks[vars_order[m]] = row_mask(n - 1 - m, start, end)
+    return _eval_bitmask_node(tree, masks, (1 << length) - 1)
+
+def eval_bitmasks(trees, vars_order, start=0, end=-1):
+    r"""
+    This function evaluates each tree of ``trees`` on every row of a truth
+    table at once, as :func:`eval_bitmask` does for one tree.
+
+    The masks of the variables are built once for all the trees and the
+    bitmask of each node is kept, so a subtree object shared by several
+    trees, as in the trees made by
+    :func:`sage.logic.logicparser.intern_tree`, is evaluated once.
+
+    INPUT:
+
+    - ``trees`` -- a list of parse trees.
+    - ``vars_order`` -- a list of the variable names in the trees.
+    - ``start`` -- an integer representing the first row, initialized
+      to 0.
+    - ``end`` -- an integer representing the row after the last one,
+      initialized to -1 which is converted to ``2^n``.
+
+    OUTPUT:
+
+    - Returns the list of the bitmasks of the trees, as computed by
+      :func:`eval_bitmask`.
+
+    EXAMPLES::
+
+        sage: import sage.logic.logiceval as logiceval
+        sage: ab = ['&', 'a', 'b']
+        sage: [bin(x) for x in logiceval.eval_bitmasks([ab, ['~', ab, None], 'c'], ['a', 'b', 'c'])]
+        ['0b11000000', '0b111111', '0b10101010']
+    """
+    n = len(vars_order)
+    if(end == -1):
+        end = 2 ** n
+    length = max(end - start, 0)
+    masks = {}
+    for m in range(n):
+        masks[vars_order[m]] = row_mask(n - 1 - m, start, end)
+    full = (1 << length) - 1
+    memo = {}
+    return [_eval_bitmask_node(tree, masks, full, memo) for tree in trees]
+
+def _eval_bitmask_node(tree, masks, full, memo=None):
+    r"""
+    Return the bitmask of ``tree`` given the bitmask of each variable in
+    ``masks``; ``full`` is the mask with a bit set for every row.  The
+    nodes are walked with an explicit stack by
+    :func:`sage.logic.logicparser._post_order`, and the bitmask of each node is
+    kept in ``memo`` by ``id``, so subtrees shared by several parents are
+    evaluated once.
+
+    EXAMPLES::
+
+        sage: import sage.logic.logiceval as logiceval
+        sage: logiceval._eval_bitmask_node(['->', 'a', 'b'], {'a': 12, 'b': 10}, 15)
+        11
+    """
+    def visit(node, lval, rval):
+        op = node[0]
+        if(op == '~'):
+            return lval ^ full
+        if(op == '&'):
+            return lval & rval
+        if(op == '|'):
+            return lval | rval
+        if(op == '^'):
+            return lval ^ rval
+        if(op == '->'):
+            return (lval ^ full) | rval
+        if(op == '<->'):
+            return lval ^ rval ^ full
+        raise SyntaxError('unknown operator ' + str(op))
+    return logicparser._post_order(tree, visit, masks.__getitem__, memo)
+
+def row_mask(c, start, end):
+    r"""
+    This function returns the integer whose bit ``k`` is bit ``c`` of the
+    row number ``start + k``, for ``start <= start + k < end``.
+
+    Over a whole table these are the familiar alternating masks
+    ``0b1010...``, ``0b1100...`` and so on.  A run of equal bits as long
+    as the window gives at most two runs, set directly; otherwise the
+    pattern is doubled until it covers the window.  Either way the cost is
+    linear in ``end - start`` whatever the size of the table.
+
+    INPUT:
+
+    - ``c`` -- an integer, the bit of the row number, where 0 is the low
+      order bit.
+    - ``start`` -- an integer representing the first row.
+    - ``end`` -- an integer representing the row after the last one.
+
+    OUTPUT:
+
+    - Returns an integer with ``end - start`` significant bits.
+
+    EXAMPLES::
+
+        sage: import sage.logic.logiceval as logiceval
+        sage: hex(logiceval.row_mask(0, 0, 16)), hex(logiceval.row_mask(1, 0, 16))
+        ('0xaaaa', '0xcccc')
+        sage: bin(logiceval.row_mask(1, 3, 8))
+        '0b11001'
+
+    Windows of huge tables are cheap::
+
+        sage: bin(logiceval.row_mask(100, 2**100 - 2, 2**100 + 3))
+        '0b11100'
+        sage: logiceval.row_mask(499, 0, 2) == 0
+        True
+    """
+    length = end - start
+    if(length <= 0):
+        return 0
+    half = 1 << c
+    if(half >= length):
+        full = (1 << length) - 1
+        first = (start >> c) & 1
+        k = half - start % half         #rows before the bit flips
+        if(k >= length):
+            return full * first
+        low = (1 << k) - 1
+        if(first):
+            return low
+        return full ^ low
+    offset = start % (2 * half)
+    pattern = ((1 << half) - 1) << half
+    size = 2 * half
+    while(size < offset + length):
+        pattern |= pattern << size
+        size *= 2
+    return (pattern >> offset) & ((1 << length) - 1)
+
+def row_numbers(start, end, step=1):
+    r"""
+    This function iterates over the row numbers ``start, start + step,
+    ...`` below ``end``, as ``xrange`` does.
+
+    ``xrange`` cannot take the long integers numbering the rows of tables
+    of 64 variables or more, so it is only used when ``end`` is small
+    enough.
+
+    EXAMPLES::
+
+        sage: import sage.logic.logiceval as logiceval
+        sage: list(logiceval.row_numbers(2, 9, 3))
+        [2, 5, 8]
+        sage: list(logiceval.row_numbers(2**69, 2**69 + 2))
+        [590295810358705651712L, 590295810358705651713L]
+    """
+    if(max(start, end) <= sys.maxint):
+        return xrange(start, end, step)
+    return _long_range(start, end, step)
+
+def _long_range(start, end, step):
+    r"""
+    Iterate over ``start, start + step, ...`` below ``end`` without
+    ``xrange``.
+
+    EXAMPLES::
+
+        sage: import sage.logic.logiceval as logiceval
+        sage: list(logiceval._long_range(0, 5, 2))
+        [0, 2, 4]
+    """
+    i = start
+    while(i < end):
+        yield i
+        i += step
+
+def falsify(tree, vars_order, rng, width=None, fixed=None):
+    r"""
+    This function evaluates ``tree`` on ``width`` random assignments at
+    once and returns one that makes it false.
+
+    Each variable is given a random integer whose bit ``k`` is its value
+    in the ``k``-th assignment, and the tree is evaluated on these as by
+    :func:`eval_bitmask`, with a few operations on integers per node.
+
+    INPUT:
+
+    - ``tree`` -- a parse tree.
+    - ``vars_order`` -- a list of the variable names in ``tree``.
+    - ``rng`` -- a ``random.Random`` instance giving the assignments.
+    - ``width`` -- (default: ``None``) the number of assignments; if
+      ``None``, ``sample_width``.
+    - ``fixed`` -- (default: ``None``) a dictionary giving the value
+      ``True`` or ``False`` of the variables that are not random.
+
+    OUTPUT:
+
+    - Returns the first of the assignments that makes ``tree`` false, as
+      a dictionary from the variable names to ``True`` or ``False``, or
+      ``None`` if they all make it true.
+
+    EXAMPLES::
+
+        sage: import random, sage.logic.logiceval as logiceval
+        sage: logiceval.falsify(['|', 'a', 'b'], ['a', 'b'], random.Random(1), 8)
+        {'a': False, 'b': False}
+        sage: logiceval.falsify(['|', 'a', 'b'], ['a', 'b'], random.Random(1), fixed={'b': True}) is None
+        True
+    """
+    if(width is None):
+        width = sample_width
+    if(fixed is None):
+        fixed = {}
+    full = (1 << width) - 1
+    masks = {}
+    for v in vars_order:
+        if(v in fixed):
+            masks[v] = (0, full)[bool(fixed[v])]
+        else:
+            masks[v] = rng.getrandbits(width)
+    rows = _eval_bitmask_node(tree, masks, full) ^ full
+    if(rows == 0):
+        return None
+    k = len(bin(rows & -rows)) - 3     #index of the lowest set bit
+    return dict([(v, bool(masks[v] >> k & 1)) for v in vars_order])
+
+def quick_check(tree, vars_order, rounds=4, seed=None, fixed=None):
+    r"""
+    This function looks for an assignment making ``tree`` false among
+    random ones, as a fast way to refute a claimed tautology before
+    proving it.
+
+    Each round evaluates ``tree`` on ``sample_width`` random assignments
+    at once with :func:`falsify`, so a formula that is false on a fair
+    share of its assignments is refuted at once.  Finding no
+    counterexample proves nothing.
+
+    INPUT:
+
+    - ``tree`` -- a parse tree.
+    - ``vars_order`` -- a list of the variable names in ``tree``.
+    - ``rounds`` -- (default: 4) the largest number of rounds.
+    - ``seed`` -- (default: ``None``) the seed of the random assignments,
+      so that the same seed finds the same counterexample.
+    - ``fixed`` -- (default: ``None``) a dictionary giving the value
+      ``True`` or ``False`` of the variables that are not random.
+
+    OUTPUT:
+
+    - Returns an assignment making ``tree`` false, as a dictionary from
+      the variable names to ``True`` or ``False``, or ``None`` if none
+      was found.
+
+    EXAMPLES::
+
+        sage: import sage.logic.logiceval as logiceval
+        sage: tree = ['->', ['&', 'a', 'b'], ['|', 'c', 'a']]
+        sage: logiceval.quick_check(tree, ['a', 'b', 'c']) is None
+        True
+        sage: tree = ['->', ['|', 'a', 'b'], ['|', 'c', 'a']]
+        sage: logiceval.quick_check(tree, ['a', 'b', 'c'], seed=2)
+        {'a': False, 'c': False, 'b': True}
+    """
+    rng = random.Random(seed)
+    for i in range(rounds):
+        counterexample = falsify(tree, vars_order, rng, fixed=fixed)
+        if(counterexample is not None):
+            return counterexample
+    return None
+
+def eval_chunks(tree, vars_order, start=0, end=-1, chunk_size=65536):
+    r"""
+    This function evaluates ``tree`` on the rows of a truth table, one
+    fixed-size chunk of rows at a time, with NumPy boolean arrays.
+
+    The rows ``start, start + 1, ..., end - 1`` are split into chunks of
+    ``chunk_size`` rows; the first chunk begins at ``start`` and the last
+    one ends at ``end``.  For each chunk every variable is given a boolean
+    array holding its value in each row, with the row numbering of
+    :func:`eval_bitmask`, and each node of ``tree`` is one vectorized
+    operation.  Only one chunk is held in memory at a time.
+
+    INPUT:
+
+    - ``tree`` -- a parse tree.
+    - ``vars_order`` -- a list of the variable names in ``tree``.
+    - ``start`` -- an integer representing the first row, initialized
+      to 0.
+    - ``end`` -- an integer representing the row after the last one,
+      initialized to -1 which is converted to ``2^n``.
+    - ``chunk_size`` -- (default: 65536) the number of rows per chunk.
+
+    OUTPUT:
+
+    - Returns an iterator over pairs ``(first, values)`` where ``values``
+      is a NumPy boolean array holding the value of ``tree`` in rows
+      ``first, first + 1, ...``.
+
+    EXAMPLES::
+
+        sage: import sage.logic.logiceval as logiceval
+        sage: t = ['|', 'a', ['~', 'b', None]]
+        sage: [(i, v.tolist()) for i, v in logiceval.eval_chunks(t, ['a', 'b'], chunk_size=3)]
+        [(0, [True, False, True]), (3, [True])]
+        sage: [(i, v.tolist()) for i, v in logiceval.eval_chunks(t, ['a', 'b'], 1, 3)]
+        [(1, [False, True])]
+    """
+    import numpy
+    n = len(vars_order)
+    if(end == -1):
+        end = 2 ** n
+    one = numpy.uint64(1)
+    for first in row_numbers(start, end, chunk_size):
+        rows = numpy.arange(first, min(first + chunk_size, end), dtype=numpy.uint64)
+        arrays = {}
+        for m in range(n):
+            shift = numpy.uint64(n - 1 - m)
+            arrays[vars_order[m]] = ((rows >> shift) & one).astype(bool)
+        yield first, _eval_array_node(tree, arrays)
+
+def _eval_array_node(tree, arrays, memo=None):
+    r"""
+    Return the boolean array of ``tree`` given the boolean array of each
+    variable in ``arrays``.  As in :func:`_eval_bitmask_node`, the nodes
+    are walked without recursion and shared subtrees are evaluated once
+    using ``memo``.
+
+    EXAMPLES::
+
+        sage: import numpy
+        sage: import sage.logic.logiceval as logiceval
+        sage: a = numpy.array([False, False, True, True])
+        sage: b = numpy.array([False, True, False, True])
+        sage: logiceval._eval_array_node(['<->', 'a', 'b'], {'a': a, 'b': b}).tolist()
+        [True, False, False, True]
+    """
+    def visit(node, lval, rval):
+        op = node[0]
+        if(op == '~'):
+            return ~lval
+        if(op == '&'):
+            return lval & rval
+        if(op == '|'):
+            return lval | rval
+        if(op == '^'):
+            return lval ^ rval
+        if(op == '->'):
+            return ~lval | rval
+        if(op == '<->'):
+            return ~(lval ^ rval)
+        raise SyntaxError('unknown operator ' + str(op))
+    return logicparser._post_order(tree, visit, arrays.__getitem__, memo)
+
+def eval_rows(tree, vars_order, rows, columns=None, chunk_size=65536):
+    r"""
+    This function evaluates ``tree`` on a stream of assignments of its
+    variables, one fixed-size chunk of assignments at a time.
+
+    The assignments of a chunk are bit-sliced: each variable is given the
+    integer whose bit ``k`` is its value in the ``k``-th assignment, and
+    the chunk is then evaluated by :func:`eval_bitmask` style bitwise
+    operations, one per node of ``tree``.  Only one chunk is held in
+    memory at a time.
+
+    INPUT:
+
+    - ``tree`` -- a parse tree.
+    - ``vars_order`` -- a list of the variable names in ``tree``.
+    - ``rows`` -- an iterable of assignments. An assignment is either a
+      dictionary mapping each variable name to its value, or a sequence
+      of values in the order of ``columns``, such as a row read by
+      ``csv.reader``.  A value is ``True``, ``False``, ``1``, ``0`` or
+      one of the strings ``'True'``, ``'False'``, ``'true'``,
+      ``'false'``, ``'1'`` and ``'0'``.
+    - ``columns`` -- (default: ``None``) the list of the names of the
+      values of a sequence, which may include names not in
+      ``vars_order``; if ``None``, ``vars_order``.
+    - ``chunk_size`` -- (default: 65536) the number of assignments per
+      chunk.
+
+    OUTPUT:
+
+    - Returns an iterator over triples ``(first, length, bits)`` where
+      bit ``k`` of the integer ``bits`` is the value of ``tree`` for the
+      assignment ``first + k``, for ``k < length``.
+
+    EXAMPLES::
+
+        sage: import sage.logic.logiceval as logiceval
+        sage: rows = [{'a': True, 'b': False}, {'a': 1, 'b': 1}, {'a': 'False', 'b': '0'}]
+        sage: list(logiceval.eval_rows(['->', 'a', 'b'], ['a', 'b'], rows, chunk_size=2))
+        [(0, 2, 2), (2, 1, 1)]
+        sage: list(logiceval.eval_rows(['&', 'a', 'b'], ['a', 'b'], [[0, 'x', 1], [1, 'y', 1]], ['a', 'id', 'b']))
+        [(0, 2, 2)]
+
+    Every variable must have a value::
+
+        sage: list(logiceval.eval_rows(['&', 'a', 'b'], ['a', 'b'], [[True, 'yes']]))
+        Traceback (most recent call last):
+        ...
+        ValueError: invalid value of b in assignments 0 to 0
+        sage: list(logiceval.eval_rows(['&', 'a', 'b'], ['a', 'b'], [{'a': True, 'b': True}, {'a': True}]))
+        Traceback (most recent call last):
+        ...
+        ValueError: invalid value of b in assignments 0 to 1
+        sage: list(logiceval.eval_rows(['&', 'a', 'b'], ['a', 'b'], [[True]]))
+        Traceback (most recent call last):
+        ...
+        ValueError: invalid value of b in assignments 0 to 0
+    """
+    if(columns is None):
+        columns = vars_order
+    position = {}
+    for j in range(len(columns)):
+        position[columns[j]] = j
+    rows = iter(rows)
+    first = 0
+    while(True):
+        chunk = list(itertools.islice(rows, chunk_size))
+        if(not chunk):
+            return
+        chunk.reverse()
+        keyed = isinstance(chunk[0], dict)
+        masks = {}
+        for v in vars_order:
+            try:
+                if(keyed):
+                    key = v
+                else:
+                    key = position[v]
+                text = ''.join([__bit_text.get(row[key], '?') for row in chunk])
+            except (KeyError, IndexError):       #a missing value
+                text = '?'
+            if('?' in text):
+                raise ValueError('invalid value of %s in assignments %d to %d'
+                                 % (v, first, first + len(chunk) - 1))
+            masks[v] = int(text, 2)
+        length = len(chunk)
+        yield first, length, _eval_bitmask_node(tree, masks, (1 << length) - 1)
+        first += length
+
+def eval_batch(tree, vars_order, rows, columns=None, chunk_size=65536):
+    r"""
+    This function evaluates ``tree`` on a batch of assignments of its
+    variables and returns the values packed in one integer.
+
+    The assignments are evaluated by :func:`eval_rows`, whose
+    documentation describes ``rows``, ``columns`` and ``chunk_size``.
+
+    OUTPUT:
+
+    - Returns the pair ``(bits, count)`` where ``count`` is the number
+      of assignments and bit ``k`` of the integer ``bits`` is the value
+      of ``tree`` for the ``k``-th.
+
+    EXAMPLES::
+
+        sage: import sage.logic.logiceval as logiceval
+        sage: rows = [[a, b] for a in [0, 1] for b in [0, 1]] * 3
+        sage: bits, count = logiceval.eval_batch(['^', 'a', 'b'], ['a', 'b'], rows, chunk_size=5)
+        sage: bin(bits), count
+        ('0b11001100110', 12)
+        sage: logiceval.eval_batch('a', ['a'], [])
+        (0, 0)
+    """
+    parts = []
+    count = 0
+    for first, length, bits in eval_rows(tree, vars_order, rows, columns, chunk_size):
+        parts.append(bits)
+        count += length
+    if(not parts):
+        return 0, 0
+    #join neighbouring parts pairwise; all but the last have ``width`` bits
+    width = chunk_size
+    while(len(parts) > 1):
+        joined = []
+        for i in range(0, len(parts) - 1, 2):
+            joined.append(parts[i] | parts[i + 1] << width)
+        if(len(parts) % 2 == 1):
+            joined.append(parts[-1])
+        parts = joined
+        width *= 2
+    return parts[0], count
+
+def eval_array(tree, vars_order, array, columns=None):
+    r"""
+    This function evaluates ``tree`` on the assignments given by the rows
+    of a two-dimensional NumPy array, with one vectorized operation per
+    node of ``tree``.
+
+    INPUT:
+
+    - ``tree`` -- a parse tree.
+    - ``vars_order`` -- a list of the variable names in ``tree``.
+    - ``array`` -- a two-dimensional NumPy array with one row per
+      assignment; nonzero entries are true.
+    - ``columns`` -- (default: ``None``) the list of the names of the
+      columns of ``array``, which may include names not in
+      ``vars_order``; if ``None``, ``vars_order``.
+
+    OUTPUT:
+
+    - Returns a NumPy boolean array holding the value of ``tree`` for
+      each row of ``array``.
+
+    EXAMPLES::
+
+        sage: import numpy
+        sage: import sage.logic.logiceval as logiceval
+        sage: a = numpy.array([[0, 5, 0], [1, 7, 0], [1, 9, 1]])
+        sage: logiceval.eval_array(['->', 'p', 'q'], ['p', 'q'], a, ['p', 'n', 'q']).tolist()
+        [True, False, True]
+    """
+    if(columns is None):
+        columns = vars_order
+    names = set(vars_order)
+    arrays = {}
+    for j in range(len(columns)):
+        if(columns[j] in names):
+            arrays[columns[j]] = array[:, j].astype(bool)
+    return _eval_array_node(tree, arrays)
+
+def column(tree, vars_order, start=0, end=-1, algorithm='compiled'):
+    r"""
+    This function iterates over the values of ``tree`` in the rows
+    ``start, start + 1, ..., end - 1`` of its truth table.
+
+    INPUT:
+
+    - ``tree`` -- a parse tree.
+    - ``vars_order`` -- a list of the variable names in ``tree``; row
+      ``i`` assigns to ``vars_order[m]`` bit ``n - 1 - m`` of ``i``.
+    - ``start`` -- an integer representing the first row, initialized
+      to 0.
+    - ``end`` -- an integer representing the row after the last one,
+      initialized to -1 which is converted to ``2^n``.
+    - ``algorithm`` -- (default: ``'compiled'``) one of
+
+      - ``'compiled'`` -- evaluate the function of :func:`compile_tree`
+        row by row.
+      - ``'bitmask'`` -- evaluate every row at once with
+        :func:`eval_bitmask`.
+      - ``'numpy'`` -- evaluate chunks of rows with :func:`eval_chunks`.
+      - ``'gray'`` -- walk the rows in Gray code order with
+        :func:`eval_gray`, so each row only updates the nodes above
+        the one variable that changed.
+
+    OUTPUT:
+
+    - Returns an iterator over ``True`` and ``False``, one per row.
+
+    EXAMPLES::
+
+        sage: import sage.logic.logiceval as logiceval
+        sage: t = ['->', 'a', 'b']
+        sage: list(logiceval.column(t, ['a', 'b']))
+        [True, True, False, True]
+        sage: list(logiceval.column(t, ['a', 'b'], 1, 3, algorithm='bitmask'))
+        [True, False]
+    """
+    n = len(vars_order)
+    if(end == -1):
+        end = 2 ** n
+    if(algorithm == 'compiled'):
+        return _compiled_column(compile_tree(tree, vars_order), n, start, end)
+    elif(algorithm == 'bitmask'):
+        length = max(end - start, 0)
+        bits = bin(eval_bitmask(tree, vars_order, start, end) | (1 << length))
+        return (b == '1' for b in bits[:2:-1])
+    elif(algorithm == 'numpy'):
+        chunks = eval_chunks(tree, vars_order, start, end)
+        return (b for first, values in chunks for b in values.tolist())
+    elif(algorithm == 'gray'):
+        return _gray_column(tree, vars_order, start, end)
+    raise ValueError("algorithm must be 'compiled', 'bitmask', 'numpy' or 'gray'")
+
+def _compiled_column(f, n, start, end):
+    r"""
+    Iterate over the values of the compiled function ``f`` of ``n``
+    variables in the rows ``start, ..., end - 1``.
+
+    EXAMPLES::
+
+        sage: import sage.logic.logiceval as logiceval
+        sage: f = logiceval.compile_tree(['&', 'a', 'b'], ['a', 'b'])
+        sage: list(logiceval._compiled_column(f, 2, 0, 4))
+        [False, False, False, True]
+    """
+    shifts = range(n - 1, -1, -1)
+    for i in row_numbers(start, end):
+        yield f([(i >> j) & 1 == 1 for j in shifts])
+
+def eval_gray(tree, vars_order, start=0, end=-1, block=16):
+    r"""
+    This function evaluates ``tree`` on the rows of a truth table,
+    visiting them in Gray code order so that consecutive rows differ in
+    exactly one variable.
+
+    The rows are walked in aligned blocks of ``2^block`` rows.  Within a
+    block only the low ``block`` bits of the row number change, and they
+    are enumerated in Gray code order.  The value of every node of
+    ``tree`` is kept from one row to the next, and when a variable is
+    flipped only the nodes above its occurrences are recomputed, by a
+    straight-line function generated for that variable.
+
+    INPUT:
+
+    - ``tree`` -- a parse tree.
+    - ``vars_order`` -- a list of the variable names in ``tree``, with
+      the row numbering of :func:`eval_bitmask`.
+    - ``start`` -- an integer representing the first row, initialized
+      to 0.
+    - ``end`` -- an integer representing the row after the last one,
+      initialized to -1 which is converted to ``2^n``.
+    - ``block`` -- (default: 16) the number of low bits of the row
+      number that are walked in Gray code order.
+
+    OUTPUT:
+
+    - Returns an iterator over pairs ``(row, value)`` covering every row
+      from ``start`` to ``end - 1`` exactly once, in visiting order.
+
+    EXAMPLES::
+
+        sage: import sage.logic.logiceval as logiceval
+        sage: list(logiceval.eval_gray(['&', 'a', 'b'], ['a', 'b']))
+        [(0, False), (1, False), (3, True), (2, False)]
+        sage: list(logiceval.eval_gray(['|', 'a', 'b'], ['a', 'b'], 1, 4, block=1))
+        [(1, True), (2, True), (3, True)]
+    """
+    n = len(vars_order)
+    if(end == -1):
+        end = 2 ** n
+    if(start >= end):
+        return
+    size, leaves, evaluate, flips = _gray_network(tree, vars_order)
+    vals = [False] * size
+    b = min(n, block)
+    size = 1 << b
+    for base in row_numbers(start - start % size, end, size):
+        for m in range(n):
+            bit = (base >> (n - 1 - m)) & 1 == 1
+            for k in leaves[m]:
+                vals[k] = bit
+        value = evaluate(vals)
+        g = 0
+        for step in xrange(size):
+            if(step > 0):
+                p = (step & -step).bit_length() - 1
+                g ^= 1 << p
+                value = flips[n - 1 - p](vals)
+            row = base | g
+            if(start <= row < end):
+                yield row, value
+
+def _gray_column(tree, vars_order, start, end, block=16):
+    r"""
+    Iterate over the values of ``tree`` in the rows ``start, ..., end - 1``
+    in their usual order, computed block by block with :func:`eval_gray`.
+
+    EXAMPLES::
+
+        sage: import sage.logic.logiceval as logiceval
+        sage: list(logiceval._gray_column(['&', 'a', 'b'], ['a', 'b'], 0, 4))
+        [False, False, False, True]
+    """
+    size = 1 << min(len(vars_order), block)
+    buf = [False] * size
+    base = None
+    for row, value in eval_gray(tree, vars_order, start, end, block):
+        if(row - row % size != base):
+            if(base is not None):
+                for b in buf[max(start - base, 0):]:
+                    yield b
+            base = row - row % size
+        buf[row - base] = value
+    if(base is not None):
+        for b in buf[max(start - base, 0):min(end - base, size)]:
+            yield b
+
+#Python expression of each operator on the names of its operands
+_node_code = {'~': 'not %s', '&': '%s and %s', '|': '%s or %s',
+              '^': '%s != %s', '->': 'not %s or %s', '<->': '%s == %s'}
+
+def _operands(node, l, r):
+    r"""
+    Return the tuple of the operands ``l`` and ``r`` of ``node`` that its
+    entry of ``_node_code`` takes.
+
+    EXAMPLES::
+
+        sage: import sage.logic.logiceval as logiceval
+        sage: logiceval._operands(['~', 'a', None], 'x', None)
+        ('x',)
+        sage: logiceval._operands(['zz', 'a', 'b'], 'x', 'y')
+        Traceback (most recent call last):
+        ...
+        SyntaxError: unknown operator zz
+    """
+    if(node[0] not in _node_code):
+        raise SyntaxError('unknown operator ' + str(node[0]))
+    if(node[0] == '~'):
+        return (l,)
+    return (l, r)
+
+def _gray_network(tree, vars_order):
+    r"""
+    Return the tuple ``(size, leaves, evaluate, flips)`` describing the
+    nodes of ``tree``, numbered in post-order, for :func:`eval_gray`.
+    Each variable and each subtree object shared by several parents is
+    a single node.
+
+    Here ``size`` is the number of nodes, ``leaves[m]`` lists the nodes of
+    the variable ``vars_order[m]``, ``evaluate`` computes every operator
+    node of a list of node values from its variable nodes, and
+    ``flips[m]`` negates the nodes of ``vars_order[m]`` and recomputes
+    the nodes above them.  Both functions return the value of the root.
+
+    EXAMPLES::
+
+        sage: import sage.logic.logiceval as logiceval
+        sage: size, leaves, evaluate, flips = logiceval._gray_network(['&', 'a', ['~', 'b', None]], ['a', 'b'])
+        sage: size, leaves
+        (4, [[2], [0]])
+        sage: v = [False, None, True, None]
+        sage: evaluate(v), v
+        (True, [False, True, True, True])
+        sage: flips[1](v), v
+        (False, [True, False, True, False])
+    """
+    index = {}
+    for m in range(len(vars_order)):
+        index[vars_order[m]] = m
+    code = []
+    parents = []
+    leaves = [[] for v in vars_order]
+    numbers = {}
+    def leaf(t):
+        if(t not in numbers):
+            k = len(code)
+            code.append(None)
+            parents.append([])
+            leaves[index[t]].append(k)
+            numbers[t] = k
+        return numbers[t]
+    def visit(t, lk, rk):
+        args = _operands(t, lk, rk)
+        k = len(code)
+        code.append('    v[%d] = ' % k + _node_code[t[0]] % tuple(['v[%d]' % c for c in args]))
+        parents.append([])
+        for c in args:
+            parents[c].append(k)
+        return k
+    root = '    return v[%d]' % logicparser._post_order(tree, visit, leaf)
+    lines = [line for line in code if line is not None]
+    evaluate = _make_function(lines + [root])
+    flips = []
+    for m in range(len(vars_order)):
+        above = set()
+        pending = list(leaves[m])
+        while(pending):
+            for k in parents[pending.pop()]:
+                if(k not in above):
+                    above.add(k)
+                    pending.append(k)
+        lines = ['    v[%d] = not v[%d]' % (k, k) for k in leaves[m]]
+        lines += [code[k] for k in sorted(above)]
+        flips.append(_make_function(lines + [root]))
+    return len(code), leaves, evaluate, flips
+
+def _make_function(lines):
+    r"""
+    Return the function of one argument ``v`` whose body is ``lines``.
+
+    EXAMPLES::
+
+        sage: import sage.logic.logiceval as logiceval
+        sage: logiceval._make_function(['    return v[0] or v[1]'])([False, True])
+        True
+    """
+    namespace = {}
+    exec 'def f(v):\n' + '\n'.join(lines) in namespace
+    return namespace['f']
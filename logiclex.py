@@ -0,0 +1,174 @@
+r"""
+LogicLex
+
+Module providing the lexer shared by :func:`sage.logic.logic.tokenize`
+and :func:`sage.logic.logicparser.tokenize`.
+
+A formula is read in a single pass by one regular expression, so the
+time taken is linear in its length whatever the number of variables.
+Each token is a :class:`Token` record of its kind, its text and its
+offset in the formula.  The kind of an operator or parenthesis is given
+by the table of operators passed in, the kind of a variable name is
+``'NAME'``.
+
+EXAMPLES::
+
+    sage: from sage.logic.logiclex import lex
+    sage: tokens, vars_order = lex('a & !b', {'&': 'AND', '!': 'NOT'})
+    sage: tokens
+    [Token(kind='NAME', text='a', pos=0), Token(kind='AND', text='&', pos=2), Token(kind='NOT', text='!', pos=4), Token(kind='NAME', text='b', pos=5)]
+    sage: vars_order
+    ['a', 'b']
+"""
+#*****************************************************************************
+# Distributed under the terms of the GNU General Public License (GPL)
+# http://www.gnu.org/licenses/
+#*****************************************************************************
+
+import re
+from collections import namedtuple
+
+#A token of kind ``kind`` spelled ``text`` starting at offset ``pos``
+Token = namedtuple('Token', ['kind', 'text', 'pos'])
+
+#Valid variable names
+__name = re.compile(r'[A-Za-z][A-Za-z0-9_]*\Z')
+
+#Compiled scanners by table of operators
+__scanners = {}
+
+class LexError(NameError):
+    r"""
+    The error raised for an invalid variable name or a character that
+    starts no operator.
+
+    It is a subclass of ``NameError``, which the tokenizers raised for
+    invalid names before, and records the span ``pos:end`` of the
+    offending ``text`` in the formula.
+
+    EXAMPLES::
+
+        sage: from sage.logic.logiclex import lex
+        sage: try:
+        ....:     lex('a & 3b', {'&': '&'})
+        ....: except NameError as e:
+        ....:     print e
+        ....:     print e.text, e.pos, e.end
+        invalid variable name '3b' at 4:6
+        3b 4 6
+    """
+    def __init__(self, message, text, pos):
+        r"""
+        This function initializes the data fields. See :class:`LexError`
+        for full documentation.
+
+        EXAMPLES::
+
+            sage: from sage.logic.logiclex import LexError
+            sage: LexError("unexpected character '-'", '-', 3).end
+            4
+        """
+        NameError.__init__(self, '%s at %d:%d' % (message, pos, pos + len(text)))
+        self.text = text
+        self.pos = pos
+        self.end = pos + len(text)
+
+def lex(s, operators, errors=None):
+    r"""
+    This function splits the formula ``s`` into tokens.
+
+    Tokens are separated by whitespace or by the characters of the
+    operators. The variable names are entered in a dictionary as they are
+    found, so the list of distinct names is built in linear time.
+
+    INPUT:
+
+    - ``s`` -- a string containing a boolean formula.
+    - ``operators`` -- a dictionary mapping the text of each operator,
+      including the parentheses, to the kind of its tokens.
+    - ``errors`` -- (default: ``None``) if a list, the
+      :class:`LexError` of each invalid name or character is appended
+      to it and the lexer goes on, otherwise the first one is raised.
+
+    OUTPUT:
+
+    - Returns the tuple ``(tokens, vars_order)`` of the list of
+      :class:`Token` records of ``s`` and the list of its variable names
+      in the order they were found.
+
+    EXAMPLES::
+
+        sage: from sage.logic.logiclex import lex
+        sage: ops = {'(': '(', ')': ')', '->': '->', '<->': '<->'}
+        sage: tokens, vars_order = lex('(x<->y)->x', ops)
+        sage: [t.text for t in tokens], vars_order
+        (['(', 'x', '<->', 'y', ')', '->', 'x'], ['x', 'y'])
+
+    Errors give the span of the offending text::
+
+        sage: errors = []
+        sage: tokens, vars_order = lex('p - q_1 & @r', ops, errors)
+        sage: [str(e) for e in errors]
+        ["unexpected character '-' at 2:3", "invalid variable name '&' at 8:9", "invalid variable name '@r' at 10:12"]
+        sage: vars_order
+        ['p', 'q_1']
+        sage: lex('p <- q', ops)
+        Traceback (most recent call last):
+        ...
+        LexError: unexpected character '<' at 2:3
+    """
+    scanner = _scanner(operators)
+    tokens = []
+    vars_order = []
+    index = {}
+    pos = 0
+    while(True):
+        m = scanner.match(s, pos)
+        if(m is None):                 #only whitespace is left
+            break
+        pos = m.end()
+        kind = m.lastgroup
+        text = m.group(kind)
+        start = m.start(kind)
+        if(kind == 'op'):
+            tokens.append(Token(operators[text], text, start))
+            continue
+        if(kind == 'name' and __name.match(text)):
+            tokens.append(Token('NAME', text, start))
+            if(text not in index):
+                index[text] = len(vars_order)
+                vars_order.append(text)
+            continue
+        if(kind == 'name'):
+            e = LexError('invalid variable name %r' % text, text, start)
+        else:
+            e = LexError('unexpected character %r' % text, text, start)
+        if(errors is None):
+            raise e
+        errors.append(e)
+    return tokens, vars_order
+
+def _scanner(operators):
+    r"""
+    Return the regular expression matching the next token of a formula
+    with the given operators, after any whitespace, in the group ``op``
+    for an operator, ``name`` for a variable name, or ``bad`` for a
+    single character starting no operator.
+
+    EXAMPLES::
+
+        sage: from sage.logic.logiclex import _scanner
+        sage: m = _scanner({'->': '->'}).match('  ab->c')
+        sage: m.lastgroup, m.group('name'), m.end()
+        ('name', 'ab', 4)
+    """
+    key = tuple(sorted(operators))
+    scanner = __scanners.get(key)
+    if(scanner is None):
+        ops = sorted(operators, key=len, reverse=True)
+        chars = ''.join(sorted(set(''.join(ops))))
+        scanner = re.compile(r'\s*(?:(?P<op>%s)|(?P<name>[^\s%s]+)|(?P<bad>.))'
+                             % ('|'.join([re.escape(op) for op in ops]),
+                                re.escape(chars)), re.DOTALL)
+        __scanners[key] = scanner
+    return scanner
@@ -0,0 +1,365 @@
+r"""
+LogicMin
+
+Module that finds small sum-of-products forms of boolean functions given
+by their truth tables.
+
+A function of ``n`` variables is given by two integers used as bitsets
+over the ``2^n`` rows of its truth table, numbered as in
+:func:`sage.logic.logiceval.eval_bitmask`: bit ``k`` of ``on`` is set if
+the function is true on row ``k``, and bit ``k`` of ``dc`` if its value
+on row ``k`` does not matter.  A product term is a cube ``(mask, value)``
+of row numbers: the rows ``k`` with ``k & mask == value``.
+
+For few variables the Quine-McCluskey method finds a minimal sum.  For
+more variables an ESPRESSO style heuristic repeatedly expands, removes
+redundant cubes and reduces the cover while it gets cheaper.
+
+EXAMPLES::
+
+    sage: import sage.logic.logicmin as logicmin
+    sage: logicmin.minimize(0b11101000, 0, 3)
+    [(3, 3), (5, 5), (6, 6)]
+"""
+#*****************************************************************************
+# Distributed under the terms of the GNU General Public License (GPL)
+# http://www.gnu.org/licenses/
+#*****************************************************************************
+
+from logiceval import row_mask
+
+#Largest number of variables minimize handles with Quine-McCluskey
+qm_limit = 8
+
+def minimize(on, dc, n, algorithm='auto'):
+    r"""
+    This function returns a small list of cubes whose union contains every
+    row of ``on`` and no row outside ``on`` and ``dc``.
+
+    INPUT:
+
+    - ``on`` -- an integer, the bitset of the rows where the function is
+      true.
+    - ``dc`` -- an integer, the bitset of the rows where the value of the
+      function does not matter.
+    - ``n`` -- the number of variables.
+    - ``algorithm`` -- (default: ``'auto'``) ``'qm'`` for an exact
+      minimum by Quine-McCluskey, ``'espresso'`` for the heuristic, or
+      ``'auto'`` for ``'qm'`` when ``n`` is at most ``qm_limit``.
+
+    OUTPUT:
+
+    - Returns a list of cubes ``(mask, value)``, sorted by the variables
+      they fix, with the fewest cubes and then the fewest literals that
+      the algorithm finds.
+
+    EXAMPLES::
+
+        sage: import sage.logic.logicmin as logicmin
+        sage: logicmin.minimize(0b0110, 0, 2)
+        [(3, 1), (3, 2)]
+        sage: logicmin.minimize(0b0110, 0b1000, 2, 'espresso')
+        [(1, 1), (2, 2)]
+        sage: logicmin.minimize(0, 0, 2), logicmin.minimize(0b1111, 0, 2)
+        ([], [(0, 0)])
+    """
+    if(algorithm == 'auto'):
+        if(n <= qm_limit):
+            algorithm = 'qm'
+        else:
+            algorithm = 'espresso'
+    if(algorithm == 'qm'):
+        cubes = _quine_mccluskey(on, dc, n)
+    elif(algorithm == 'espresso'):
+        cubes = _espresso(on, dc, n)
+    else:
+        raise ValueError("algorithm must be 'auto', 'qm' or 'espresso'")
+    return sorted(cubes, key=lambda c: _cube_key(c, n))
+
+def prime_implicants(on, dc, n):
+    r"""
+    This function returns the prime implicants of the function true on the
+    rows of ``on`` and free on the rows of ``dc``: the cubes inside
+    ``on | dc`` that are contained in no larger such cube.
+
+    Cubes are merged level by level: two cubes fixing the same variables
+    and differing in one of them combine into a cube without it.
+
+    EXAMPLES::
+
+        sage: import sage.logic.logicmin as logicmin
+        sage: sorted(logicmin.prime_implicants(0b1001100, 0, 3))
+        [(3, 2), (6, 2)]
+    """
+    cubes = set([((1 << n) - 1, k) for k in _bits(on | dc)])
+    primes = []
+    while(cubes):
+        merged = set()
+        used = set()
+        for mask, value in cubes:
+            free = mask & ~value
+            while(free):
+                bit = free & -free
+                free ^= bit
+                if((mask, value | bit) in cubes):
+                    merged.add((mask & ~bit, value))
+                    used.add((mask, value))
+                    used.add((mask, value | bit))
+        primes.extend([c for c in cubes if c not in used])
+        cubes = merged
+    return primes
+
+def _quine_mccluskey(on, dc, n, budget=100000):
+    r"""
+    Return a cheapest cover of ``on`` by prime implicants, found by
+    branch and bound over the rows covered by the fewest primes.  After
+    ``budget`` branches the best cover found so far is returned.
+
+    EXAMPLES::
+
+        sage: import sage.logic.logicmin as logicmin
+        sage: sorted(logicmin._quine_mccluskey(0b11111100, 0, 3))
+        [(2, 2), (4, 4)]
+    """
+    rows = _bits(on)
+    primes = prime_implicants(on, dc, n)
+    covers = []
+    for mask, value in primes:
+        s = 0
+        for i in range(len(rows)):
+            if(rows[i] & mask == value):
+                s |= 1 << i
+        covers.append(s)
+    costs = [(n + 1) + _count(mask) for mask, value in primes]
+    candidates = [[p for p in range(len(primes)) if covers[p] >> i & 1]
+                  for i in range(len(rows))]
+    for c in candidates:
+        c.sort(key=lambda p: -_count(covers[p]))
+    best = [None, None]
+    stack = [((1 << len(rows)) - 1, [], 0)]
+    while(stack and budget > 0):
+        need, chosen, cost = stack.pop()
+        budget -= 1
+        if(best[1] is not None and cost + (n + 1) * (need != 0) >= best[1]):
+            continue
+        if(need == 0):
+            best = [chosen, cost]
+            continue
+        row = min(_bits(need), key=lambda i: len(candidates[i]))
+        for p in reversed(candidates[row]):
+            stack.append((need & ~covers[p], chosen + [p], cost + costs[p]))
+    return [primes[p] for p in best[0]]
+
+def _espresso(on, dc, n):
+    r"""
+    Return a cover of ``on`` by cubes inside ``on | dc`` computed by the
+    ESPRESSO loop of expand, irredundant and reduce steps.
+
+    Sets of rows are integers of ``2^n`` bits, so testing a cube against
+    the rows where the function is false takes a few operations on long
+    integers rather than a loop over rows.
+
+    EXAMPLES::
+
+        sage: import sage.logic.logicmin as logicmin
+        sage: sorted(logicmin._espresso(0b11111100, 0, 3))
+        [(2, 2), (4, 4)]
+    """
+    size = 1 << n
+    full = (1 << size) - 1
+    off = full & ~(on | dc)
+    masks = [row_mask(j, 0, size) for j in range(n)]
+    cover = []
+    uncovered = on
+    while(uncovered):
+        k = (uncovered & -uncovered).bit_length() - 1
+        cube = _expand(((1 << n) - 1, k), off, uncovered, masks, full)
+        cover.append(cube)
+        uncovered &= ~_cube_rows(cube, masks, full)
+    cover = _irredundant(cover, on, masks, full)
+    cost = _cost(cover)
+    while(True):
+        new = _reduce(cover, on, masks, full)
+        new = [_expand(c, off, on, masks, full) for c in new]
+        new = _irredundant(new, on, masks, full)
+        if(_cost(new) >= cost):
+            return cover
+        cover, cost = new, _cost(new)
+
+def _expand(cube, off, target, masks, full):
+    r"""
+    Free as many variables of ``cube`` as possible while it stays out of
+    ``off``, trying first the variables whose freeing covers the most
+    rows of ``target``.
+
+    EXAMPLES::
+
+        sage: import sage.logic.logicmin as logicmin
+        sage: masks = [logicmin.row_mask(j, 0, 8) for j in range(3)]
+        sage: logicmin._expand((7, 7), 0b00000011, 0b11111100, masks, 255)
+        (4, 4)
+    """
+    mask, value = cube
+    rows = _cube_rows(cube, masks, full)
+    gains = []
+    for j in _bits(mask):
+        gains.append((-_count(_free(rows, j, value) & target), j))
+    gains.sort()
+    for gain, j in gains:
+        freed = _free(rows, j, value)
+        if(freed & off == 0):
+            rows = freed
+            mask &= ~(1 << j)
+            value &= ~(1 << j)
+    return mask, value
+
+def _irredundant(cover, on, masks, full):
+    r"""
+    Remove from ``cover`` the cubes whose rows of ``on`` are covered by
+    the other cubes, trying the smallest cubes first.
+
+    EXAMPLES::
+
+        sage: import sage.logic.logicmin as logicmin
+        sage: masks = [logicmin.row_mask(j, 0, 4) for j in range(2)]
+        sage: logicmin._irredundant([(1, 1), (3, 3), (2, 2)], 0b1110, masks, 15)
+        [(1, 1), (2, 2)]
+    """
+    rows = [_cube_rows(c, masks, full) for c in cover]
+    order = sorted(range(len(cover)), key=lambda i: _count(rows[i]))
+    kept = set(range(len(cover)))
+    for i in order:
+        others = 0
+        for k in kept:
+            if(k != i):
+                others |= rows[k]
+        if(rows[i] & on & ~others == 0):
+            kept.remove(i)
+    return [cover[i] for i in sorted(kept)]
+
+def _reduce(cover, on, masks, full):
+    r"""
+    Shrink each cube of ``cover`` in turn to the smallest cube containing
+    the rows of ``on`` that no other cube covers.
+
+    EXAMPLES::
+
+        sage: import sage.logic.logicmin as logicmin
+        sage: masks = [logicmin.row_mask(j, 0, 4) for j in range(2)]
+        sage: logicmin._reduce([(0, 0), (2, 2)], 0b1110, masks, 15)
+        [(3, 1), (2, 2)]
+    """
+    rows = [_cube_rows(c, masks, full) for c in cover]
+    cover = list(cover)
+    for i in range(len(cover)):
+        others = 0
+        for k in range(len(cover)):
+            if(k != i):
+                others |= rows[k]
+        essential = rows[i] & on & ~others
+        if(essential == 0):
+            continue
+        mask = value = 0
+        for j in range(len(masks)):
+            if(essential & masks[j] == 0):
+                mask |= 1 << j
+            elif(essential & ~masks[j] == 0):
+                mask |= 1 << j
+                value |= 1 << j
+        cover[i] = (mask, value)
+        rows[i] = _cube_rows(cover[i], masks, full)
+    return cover
+
+def _cube_rows(cube, masks, full):
+    r"""
+    Return the bitset of the rows in ``cube``, where ``masks[j]`` is the
+    bitset of the rows with bit ``j`` set.
+
+    EXAMPLES::
+
+        sage: import sage.logic.logicmin as logicmin
+        sage: masks = [logicmin.row_mask(j, 0, 8) for j in range(3)]
+        sage: bin(logicmin._cube_rows((5, 4), masks, 255))
+        '0b1010000'
+    """
+    mask, value = cube
+    rows = full
+    for j in _bits(mask):
+        if(value >> j & 1):
+            rows &= masks[j]
+        else:
+            rows &= ~masks[j]
+    return rows
+
+def _free(rows, j, value):
+    r"""
+    Return the rows of the cube with rows ``rows`` after freeing its
+    variable at bit ``j``, which it fixes as in ``value``.
+
+    EXAMPLES::
+
+        sage: import sage.logic.logicmin as logicmin
+        sage: bin(logicmin._free(0b0011, 1, 0))
+        '0b1111'
+    """
+    if(value >> j & 1):
+        return rows | rows >> (1 << j)
+    return rows | rows << (1 << j)
+
+def _cost(cover):
+    r"""
+    Return the cost of ``cover``, comparing first the number of cubes and
+    then the number of literals.
+
+    EXAMPLES::
+
+        sage: import sage.logic.logicmin as logicmin
+        sage: logicmin._cost([(3, 1), (1, 0)])
+        (2, 3)
+    """
+    return len(cover), sum([_count(mask) for mask, value in cover])
+
+def _cube_key(cube, n):
+    r"""
+    Return a key sorting cubes by the values they give to the variables,
+    taken with the high bit of the row number first.
+
+    EXAMPLES::
+
+        sage: import sage.logic.logicmin as logicmin
+        sage: logicmin._cube_key((5, 4), 3)
+        '1-0'
+    """
+    mask, value = cube
+    key = ''
+    for j in range(n - 1, -1, -1):
+        if(not mask >> j & 1):
+            key += '-'
+        else:
+            key += str(value >> j & 1)
+    return key
+
+def _bits(x):
+    r"""
+    Return the list of the positions of the bits set in ``x``.
+
+    EXAMPLES::
+
+        sage: import sage.logic.logicmin as logicmin
+        sage: logicmin._bits(0b100110)
+        [1, 2, 5]
+    """
+    s = bin(x)[:1:-1]
+    return [i for i in range(len(s)) if s[i] == '1']
+
+def _count(x):
+    r"""
+    Return the number of bits set in ``x``.
+
+    EXAMPLES::
+
+        sage: import sage.logic.logicmin as logicmin
+        sage: logicmin._count(0b100110)
+        3
+    """
+    return bin(x).count('1')
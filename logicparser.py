@@ -18,11 +18,26 @@ EXAMPLES::
 """
 
 from types import *
-import string
+import itertools
+import logiclex
+import weakref
+from logiccache import LRUCache, normalize
 
-__symbols = '()&|~<->^'
 __op_list = ['~', '&', '|', '^', '->', '<->']
 
+#Precedence of the binary operators, higher binding tighter
+__precedence = dict([(__op_list[i], len(__op_list) - i) for i in range(1, len(__op_list))])
+
+#Kinds of the operator tokens for logiclex.lex, which are their text
+__lex_ops = dict([(op, op) for op in ['(', ')'] + __op_list])
+
+#Results of parse, keyed by the normalized formula
+parse_cache = LRUCache(1024)
+
+#Interned nodes, keyed by operator and the keys of the operands
+__nodes = weakref.WeakValueDictionary()
+__node_ids = itertools.count()
+
 def parse(s):
     r"""
     This function produces a parse tree from a boolean formula ``s``.
@@ -34,7 +49,13 @@ def parse(s):
     OUTPUT:
 	
     - Returns the tuple (parse tree of ``s``, variables in ``s``).
-    
+      The parse tree is interned by :func:`intern_tree`, so it cannot
+      be modified.
+
+    The results are kept in ``parse_cache``, a
+    :class:`sage.logic.logiccache.LRUCache` keyed by ``s`` with its
+    whitespace normalized, so parsing a formula again is a lookup.
+
     EXAMPLES::
 	
         sage: import sage.logic.logicparser as logicparser
@@ -42,13 +63,20 @@ def parse(s):
         sage: t = logicparser.parse(s)
         sage: t
         (['|', 'a', ['&', 'b', 'c']], ['a', 'b', 'c'])
+        sage: logicparser.parse(' a | b&c')[0] is t[0]
+        True
     """
-    toks, vars_order = tokenize(s)
-    tree = tree_parse(toks)
-        #special case of tree == single variable
-    if(type(tree) is StringType and len([tree]) == 1):
-                return ['&', tree, tree], vars_order
-    return tree, vars_order    
+    key = normalize(s)
+    result = parse_cache.get(key)
+    if(result is None):
+        toks, vars_order = tokenize(s)
+        tree = tree_parse(toks)
+            #special case of tree == single variable
+        if(type(tree) is StringType and len([tree]) == 1):
+            tree = ['&', tree, tree]
+        result = (intern_tree(tree), tuple(vars_order))
+        parse_cache.put(key, result)
+    return result[0], list(result[1])
 
 def tokenize(s):
     r"""
@@ -69,67 +97,45 @@ def tokenize(s):
         sage: t = logicparser.tokenize(s)
         sage: t
         (['(', 'a', '|', 'b', '&', 'c', ')'], ['a', 'b', 'c'])        
+
+    An invalid variable name raises a
+    :class:`sage.logic.logiclex.LexError` giving its offsets::
+
+        sage: logicparser.tokenize('a | 2b')
+        Traceback (most recent call last):
+        ...
+        LexError: invalid variable name '2b' at 4:6
     """
-    i = 0  
+    tokens, vars_order = logiclex.lex(s, __lex_ops)
     toks = ['(']
-    vars_order = []
-    
-    while(i < len(s)):        
-        tok = ""     
-        skip = valid = 1
-        if(s[i] in '()~&|^'):
-            tok = s[i]
-        elif(s[i:i + 2] == '->'):
-            tok = '->'
-            skip = 2
-        elif(s[i:i + 3] == '<->'):
-            tok = '<->'
-            skip = 3
-        if(len(tok) > 0):
-            toks.append(tok)
-            i += skip
-            continue
-        else:
-            #token is a variable name
-            if(s[i] == ' '):
-                i += 1
-                continue
-             
-            while(i < len(s) and s[i] not in __symbols and s[i] != ' '):
-                tok += s[i]
-                i += 1
-             
-            if(len(tok) > 0):
-                if(tok[0] not in string.letters): 
-                    valid = 0
-                for c in tok:
-                    if(c not in string.letters and c not in string.digits and c != '_'):
-                        valid = 0
-                  
-            if(valid == 1): 
-                toks.append(tok)
-                if(tok not in vars_order):
-                    vars_order.append(tok)
-            else:
-                msg = 'invalid variable name ' + tok
-                msg += ": identifiers must begin with a letter and contain only "
-                msg += "alphanumerics and underscores" 
-                raise NameError, msg
-        
+    for tok in tokens:
+        toks.append(tok.text)
     toks.append(')')
     return toks, vars_order
 
 def tree_parse(toks):
     r"""
     This function produces a parse tree from the tokens in ``toks``.
-    
+
+    The tokens are read once, from left to right. Operands and the
+    binary operators waiting for their right operand are kept on two
+    explicit stacks, an operator being applied as soon as an operator of
+    lower precedence follows it, and an open parenthesis is a mark on the
+    operator stack.  A run of ``~`` applies to the operand or
+    parenthesized group after it, double negations cancelling. The time
+    taken is linear in the number of tokens and there is no recursion, so
+    long formulas are no problem.
+
     INPUT:
 	
-    - ``toks`` -- a list of tokens.
+    - ``toks`` -- a list of tokens; operands may be variable names or
+      parse trees.
             
     OUTPUT:
 	
-    - Returns a parse tree of the tokens toks.
+    - Returns a parse tree of the tokens toks.  ``~`` binds tightest,
+      followed by ``&``, ``|``, ``^``, ``->`` and ``<->``, and operators
+      of the same precedence are applied from left to right.
    
     EXAMPLES::
 	
@@ -137,19 +143,67 @@ def tree_parse(toks):
         sage: t = ['(', 'a', '|', 'b', '&', 'c', ')']
         sage: logicparser.tree_parse(t)
         ['|', 'a', ['&', 'b', 'c']]
+        sage: logicparser.tree_parse(['(', '~', '~', '~', '(', 'a', '->', 'b', '->', 'c', ')', ')'])
+        ['~', ['->', ['->', 'a', 'b'], 'c'], None]
+
+    Malformed token lists raise a ``SyntaxError``::
+
+        sage: logicparser.tree_parse(['(', 'a', '&', ')'])
+        Traceback (most recent call last):
+        ...
+        SyntaxError: missing operand before )
+        sage: logicparser.tree_parse(['(', 'a', ')', ')'])
+        Traceback (most recent call last):
+        ...
+        SyntaxError: unbalanced )
     """
-    stack = []
+    operands = []
+    ops = []                    #binary operators and '(' or '~(' marks
+    negate = False
+    need_operand = True
     for tok in toks:
-        stack.append(tok)
-        if(tok == ')'):
-            lrtoks = []
-            while(tok != '('):
-                tok = stack.pop()
-                lrtoks.insert(0, tok) 
-            branch = parse_ltor(lrtoks[1:-1])
-            stack.append(branch)
-    return stack[0]     
-        
+        if(tok == '~'):
+            if(not need_operand):
+                raise SyntaxError('missing operator before ~')
+            negate = not negate
+        elif(tok == '('):
+            if(not need_operand):
+                raise SyntaxError('missing operator before (')
+            ops.append(('(', '~(')[negate])
+            negate = False
+        elif(tok == ')'):
+            if(need_operand):
+                raise SyntaxError('missing operand before )')
+            while(ops and ops[-1] in __precedence):
+                _reduce(operands, ops.pop())
+            if(not ops):
+                raise SyntaxError('unbalanced )')
+            if(ops.pop() == '~('):
+                operands[-1] = ['~', operands[-1], None]
+        elif(isinstance(tok, list) or tok not in __precedence):
+            if(not need_operand):
+                raise SyntaxError('missing operator before %s' % (tok,))
+            if(negate):
+                tok = ['~', tok, None]
+            operands.append(tok)
+            negate = need_operand = False
+        else:
+            if(need_operand):
+                raise SyntaxError('missing operand before %s' % tok)
+            p = __precedence[tok]
+            while(ops and ops[-1] in __precedence and __precedence[ops[-1]] >= p):
+                _reduce(operands, ops.pop())
+            ops.append(tok)
+            need_operand = True
+    if(need_operand):
+        raise SyntaxError('missing operand at end')
+    while(ops):
+        op = ops.pop()
+        if(op not in __precedence):
+            raise SyntaxError('unbalanced (')
+        _reduce(operands, op)
+    return operands[0]
+
 def parse_ltor(toks, n = 0):
     r"""
     This function produces a parse tree from the tokens in ``toks`` under
@@ -158,12 +212,13 @@ def parse_ltor(toks, n = 0):
     INPUT:
     
     - ``toks`` -- a list of tokens.
-    - ``n`` -- an integer representing which order of operations
-	  are occurring.
+    - ``n`` -- (default: 0) ignored; it used to be the level of
+      precedence of the recursion.
             
     OUTPUT:
 	
-    - Returns a parse tree of the tokens toks.
+    - Returns a parse tree of the tokens toks, as given by
+      :func:`tree_parse`.
    
     EXAMPLES::
 	
@@ -171,32 +226,27 @@ def parse_ltor(toks, n = 0):
         sage: t = ['a', '|', 'b', '&', 'c']
         sage: logicparser.parse_ltor(t)
         ['|', 'a', ['&', 'b', 'c']]
+        sage: t = ['a%d' % i for i in range(5000)]
+        sage: logicparser.parse_ltor(sum([[a, '|'] for a in t], [])[:-1])[2]
+        'a4999'
     """
-    i = 0
-    for tok in toks:        
-        if(tok == __op_list[n]):
-            if(tok == '~'):
-                #cancel double negations
-                if(toks[i] == '~' and toks[i + 1] == '~'):
-                    del toks[i]
-                    del toks[i]
-                    return parse_ltor(toks, n)
-                args = [toks[i], toks[i + 1], None]
-                toks[i] = args
-                del toks[i + 1]
-                return parse_ltor(toks, n)
-            else:
-                args = [toks[i - 1], toks[i], toks[i + 1]]
-                toks[i - 1] = [args[1], args[0], args[2]]   
-                del toks[i]
-                del toks[i]
-                return parse_ltor(toks, n)
-        i += 1
-    if(n + 1 < len(__op_list)):        
-        return parse_ltor(toks, n + 1)
-    if(len(toks) > 1):
-        raise SyntaxError
-    return toks[0]    
+    return tree_parse(['('] + list(toks) + [')'])
+
+def _reduce(operands, op):
+    r"""
+    Replace the last two trees of ``operands`` by the tree applying the
+    binary operator ``op`` to them.
+
+    EXAMPLES::
+
+        sage: import sage.logic.logicparser as logicparser
+        sage: operands = ['x', 'a', 'b']
+        sage: logicparser._reduce(operands, '^')
+        sage: operands
+        ['x', ['^', 'a', 'b']]
+    """
+    right = operands.pop()
+    operands[-1] = [op, operands[-1], right]
 
 def apply_func(tree, func):
     r"""
@@ -212,6 +262,12 @@ def apply_func(tree, func):
     - Returns a parse tree after func has been applied
       to it.
 
+    ``func`` is applied once to each distinct node object of ``tree``,
+    after its operands, so a subtree shared by several parents, as in the
+    trees made by :func:`intern_tree`, is only transformed once.  It is
+    always given a new list ``[op, left, right]`` with the transformed
+    operands, which it may modify; :func:`transform` avoids the copies.
+
     EXAMPLES::
 	
         sage: import sage.logic.logicparser as logicparser
@@ -219,17 +275,344 @@ def apply_func(tree, func):
         sage: f = lambda t: t
         sage: logicparser.apply_func(t, f)
         ['|', ['&', 'a', 'b'], ['&', 'a', 'c']]
+        sage: calls = []
+        sage: u = logicparser.intern_tree(['^', ['&', 'a', 'b'], ['~', ['&', 'a', 'b'], None]])
+        sage: logicparser.apply_func(u, lambda t: calls.append(t[0]) or t)
+        ['^', ['&', 'a', 'b'], ['~', ['&', 'a', 'b'], None]]
+        sage: calls
+        ['&', '~', '^']
+
+    ``func`` may rewrite its argument in place, even for the immutable
+    trees made by :func:`parse`::
+
+        sage: def rewrite(t):
+        ....:     if(t[0] == '->'):
+        ....:         t[0] = '|'
+        ....:         t[1] = ['~', t[1], None]
+        ....:     return t
+        sage: logicparser.apply_func(logicparser.parse('(a->b)&c')[0], rewrite)
+        ['&', ['|', ['~', 'a', None], 'b'], 'c']
+    """
+    return _post_order(tree, lambda node, l, r: func([node[0], l, r]), lambda v: v)
+
+def fold(tree, func, leaf=None):
+    r"""
+    This function computes a value for ``tree`` from the values of its
+    operands, working up from the variables.
+
+    The nodes are visited in post-order with an explicit stack, so deep
+    trees need no recursion, and the value of a node object shared by
+    several parents is computed once.
+
+    INPUT:
+
+    - ``tree`` -- a parse tree.
+    - ``func`` -- a function called as ``func(op, left, right)`` for each
+      node, where ``left`` and ``right`` are the values of its operands
+      (``right`` is ``None`` for ``'~'``), returning the value of the
+      node.
+    - ``leaf`` -- (default: ``None``) a function giving the value of a
+      variable name; if ``None``, the value of a name is the name.
+
+    OUTPUT:
+
+    - Returns the value of ``tree``.
+
+    EXAMPLES::
+
+        sage: import sage.logic.logicparser as logicparser
+        sage: t = ['|', ['&', 'a', 'b'], ['~', 'a', None]]
+        sage: logicparser.fold(t, lambda op, l, r: 1 + l + (r or 0), lambda v: 0)
+        3
+        sage: env = {'a': True, 'b': False}
+        sage: ops = {'&': lambda x, y: x and y, '|': lambda x, y: x or y, '~': lambda x, y: not x}
+        sage: logicparser.fold(t, lambda op, l, r: ops[op](l, r), env.get)
+        False
+
+    A chain of 100000 operations needs no recursion::
+
+        sage: t = 'x'
+        sage: for i in range(100000):
+        ....:     t = ['&', t, 'y']
+        sage: logicparser.fold(t, lambda op, l, r: l + 1, lambda v: 0)
+        100000
+    """
+    if(leaf is None):
+        leaf = lambda v: v
+    return _post_order(tree, lambda node, l, r: func(node[0], l, r), leaf)
+
+def transform(tree, func):
+    r"""
+    This function rewrites ``tree`` from the bottom up, replacing each node
+    by the result of ``func``.
+
+    ``func`` is called once for each distinct node object, after its
+    operands have been rewritten. It is given the node itself if neither
+    operand changed and a new node ``[op, left, right]`` with the new
+    operands otherwise, so subtrees that ``func`` leaves alone are shared
+    with ``tree`` rather than copied, and the identity rewrite returns
+    ``tree`` itself. ``func`` must not modify its argument.
+
+    INPUT:
+
+    - ``tree`` -- a parse tree.
+    - ``func`` -- a function taking a node and returning its replacement,
+      a parse tree or a variable name.
+
+    OUTPUT:
+
+    - Returns the rewritten parse tree.
+
+    EXAMPLES::
+
+        sage: import sage.logic.logicparser as logicparser
+        sage: def nnf_step(t):
+        ....:     if(t[0] == '~' and isinstance(t[1], list) and t[1][0] == '~'):
+        ....:         return t[1][1]
+        ....:     if(t[0] == '->'):
+        ....:         return ['|', ['~', t[1], None], t[2]]
+        ....:     return t
+        sage: t = ['&', ['->', 'a', 'b'], ['|', 'c', ['~', ['~', 'd', None], None]]]
+        sage: u = logicparser.transform(t, nnf_step)
+        sage: u
+        ['&', ['|', ['~', 'a', None], 'b'], ['|', 'c', 'd']]
+        sage: logicparser.transform(t, lambda t: t) is t
+        True
+
+    Unchanged subtrees are shared::
+
+        sage: t = ['|', ['&', 'a', 'b'], ['->', 'c', 'd']]
+        sage: logicparser.transform(t, nnf_step)[1] is t[1]
+        True
+    """
+    def rewrite(node, l, r):
+        if(l is node[1] and r is node[2]):
+            return func(node)
+        return func([node[0], l, r])
+    return _post_order(tree, rewrite, lambda v: v)
+
+def _post_order(tree, visit, leaf, values=None):
+    r"""
+    Return the value of ``tree``, where the value of a node is
+    ``visit(node, left, right)`` for the values ``left`` and ``right`` of
+    its operands, of a variable name ``v`` is ``leaf(v)``, and of a
+    missing operand ``None``.  Each node object is visited once, the
+    values being kept by ``id`` in the dictionary ``values``, which may
+    be passed in to share them between several trees.
+
+    EXAMPLES::
+
+        sage: import sage.logic.logicparser as logicparser
+        sage: t = ['&', 'a', 'b']
+        sage: visited = []
+        sage: logicparser._post_order(['|', t, t], lambda n, l, r: visited.append(n[0]) or l + r, str.upper)
+        'ABAB'
+        sage: visited
+        ['&', '|']
+        sage: values = {}
+        sage: logicparser._post_order(t, lambda n, l, r: l + r, str.upper, values)
+        'AB'
+        sage: logicparser._post_order(['~', t, None], lambda n, l, r: l.lower(), str.upper, values)
+        'ab'
+    """
+    if(not isinstance(tree, list)):
+        return leaf(tree)
+    if(values is None):
+        values = {}
+    stack = [tree]
+    while(stack):
+        node = stack[-1]
+        if(id(node) in values):
+            stack.pop()
+            continue
+        ready = True
+        for child in (node[2], node[1]):
+            if(isinstance(child, list) and id(child) not in values):
+                stack.append(child)
+                ready = False
+        if(not ready):
+            continue
+        stack.pop()
+        operands = []
+        for child in (node[1], node[2]):
+            if(isinstance(child, list)):
+                operands.append(values[id(child)])
+            elif(child is None):
+                operands.append(None)
+            else:
+                operands.append(leaf(child))
+        values[id(node)] = visit(node, operands[0], operands[1])
+    return values[id(tree)]
+
+class Node(list):
+    r"""
+    An interned node of a parse tree, made by :func:`intern_tree`.
+
+    A node is a list ``[op, left, right]`` like the nodes of other parse
+    trees, but it cannot be modified, and there is at most one node with
+    given contents at a time, so equal subtrees are the same object.
+    Each node has a unique integer ``id`` and a hash computed once.
+
+    EXAMPLES::
+
+        sage: import sage.logic.logicparser as logicparser
+        sage: t = logicparser.intern_tree(['|', ['&', 'a', 'b'], ['&', 'a', 'b']])
+        sage: t[1] is t[2]
+        True
+        sage: t == ['|', ['&', 'a', 'b'], ['&', 'a', 'b']]
+        True
+        sage: hash(t) == hash(logicparser.intern_tree(['|', ['&', 'a', 'b'], ['&', 'a', 'b']]))
+        True
+        sage: t[0] = '&'
+        Traceback (most recent call last):
+        ...
+        TypeError: interned nodes cannot be modified
+    """
+    __slots__ = ('id', 'hash', '__weakref__')
+
+    def __init__(self, op, left, right, id):
+        r"""
+        This function initializes the data fields. See :class:`Node`
+        for full documentation.
+
+        EXAMPLES::
+
+            sage: import sage.logic.logicparser as logicparser
+            sage: logicparser.Node('~', 'a', None, -1)
+            ['~', 'a', None]
+        """
+        list.__init__(self, (op, left, right))
+        self.id = id
+        self.hash = hash((op, left, right))
+
+    def __hash__(self):
+        r"""
+        Return the hash computed when this node was made.
+
+        EXAMPLES::
+
+            sage: import sage.logic.logicparser as logicparser
+            sage: t = logicparser.intern_tree(['~', 'a', None])
+            sage: hash(t) == t.hash
+            True
+        """
+        return self.hash
+
+    def __reduce__(self):
+        r"""
+        Return the arguments for pickling this node, which is interned
+        again when unpickled.
+
+        EXAMPLES::
+
+            sage: import pickle, sage.logic.logicparser as logicparser
+            sage: t = logicparser.intern_tree(['&', 'a', ['~', 'b', None]])
+            sage: pickle.loads(pickle.dumps(t)) is t
+            True
+        """
+        return (_intern_node, (self[0], self[1], self[2]))
+
+    def __readonly(self, *args):
+        r"""
+        Refuse to modify this node.
+
+        EXAMPLES::
+
+            sage: import sage.logic.logicparser as logicparser
+            sage: logicparser.intern_tree(['~', 'a', None]).append('b')
+            Traceback (most recent call last):
+            ...
+            TypeError: interned nodes cannot be modified
+        """
+        raise TypeError('interned nodes cannot be modified')
+
+    __setitem__ = __delitem__ = __setslice__ = __delslice__ = __readonly
+    __iadd__ = __imul__ = append = extend = insert = __readonly
+    pop = remove = reverse = sort = __readonly
+
+def intern_tree(tree):
+    r"""
+    This function returns the parse tree ``tree`` made of interned nodes.
+
+    Structurally equal subtrees of the result are a single :class:`Node`,
+    so the result is a directed acyclic graph in which repeated
+    subformulas are stored once.  :func:`apply_func` and the evaluators
+    of :mod:`sage.logic.logiceval`, :mod:`sage.logic.logiccnf` and
+    :mod:`sage.logic.logicbdd` handle each shared node only once.
+
+    INPUT:
+
+    - ``tree`` -- a parse tree.
+
+    OUTPUT:
+
+    - Returns a parse tree equal to ``tree`` whose nodes are instances of
+      :class:`Node`.
+
+    EXAMPLES::
+
+        sage: import sage.logic.logicparser as logicparser
+        sage: t, vars_order = logicparser.parse('(a&b|c)->(a&b|c)&d')
+        sage: u = logicparser.intern_tree(t)
+        sage: u == t, u[1] is u[2][1]
+        (True, True)
+        sage: logicparser.intern_tree(t) is u
+        True
+    """
+    if(not isinstance(tree, list)):
+        return tree
+    memo = {}
+    results = []
+    stack = [(tree, False)]
+    while(stack):
+        node, ready = stack.pop()
+        if(not isinstance(node, list)):
+            results.append(node)
+        elif(isinstance(node, Node)):
+            results.append(node)
+        elif(id(node) in memo):
+            results.append(memo[id(node)])
+        elif(not ready):
+            stack.append((node, True))
+            stack.append((node[2], False))
+            stack.append((node[1], False))
+        else:
+            right = results.pop()
+            left = results.pop()
+            result = _intern_node(node[0], left, right)
+            memo[id(node)] = result
+            results.append(result)
+    return results[0]
+
+def _intern_node(op, left, right):
+    r"""
+    Return the interned node ``[op, left, right]``, where ``left`` and
+    ``right`` are interned nodes or leaves.
+
+    EXAMPLES::
+
+        sage: import sage.logic.logicparser as logicparser
+        sage: logicparser._intern_node('&', 'a', 'b') is logicparser._intern_node('&', 'a', 'b')
+        True
+    """
+    key = (op, _node_key(left), _node_key(right))
+    node = __nodes.get(key)
+    if(node is None):
+        node = Node(op, left, right, __node_ids.next())
+        __nodes[key] = node
+    return node
+
+def _node_key(x):
+    r"""
+    Return the key of the operand ``x`` in the table of interned nodes:
+    its ``id`` if it is a node, otherwise ``x`` itself.
+
+    EXAMPLES::
+
+        sage: import sage.logic.logicparser as logicparser
+        sage: logicparser._node_key('a'), logicparser._node_key(None)
+        ('a', None)
     """
-    if(type(tree[1]) is ListType and type(tree[2]) is ListType):
-        lval = apply_func(tree[1], func)
-        rval = apply_func(tree[2], func)
-    elif(type(tree[1]) is ListType):
-        lval = apply_func(tree[1], func)
-        rval = tree[2]
-    elif(type(tree[2]) is ListType):
-        lval = tree[1]
-        rval = apply_func(tree[2], func)
-    else:
-        lval = tree[1]
-        rval = tree[2]
-    return func([tree[0], lval, rval])
+    if(isinstance(x, Node)):
+        return ('node', x.id)
+    return x
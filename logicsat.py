@@ -0,0 +1,606 @@
+r"""
+LogicSAT
+
+Module that decides satisfiability of formulas in conjunctive normal
+form with a conflict-driven clause learning (CDCL) solver.
+
+Clauses are given as lists of nonzero integers in the DIMACS convention,
+as produced by :mod:`sage.logic.logiccnf`.  The solver uses unit
+propagation over two watched literals per clause, learns a clause at the
+first unique implication point of every conflict, picks decisions by
+variable activity with saved phases, and restarts on the Luby sequence.
+
+EXAMPLES::
+
+    sage: from sage.logic.logicsat import Solver
+    sage: s = Solver(3)
+    sage: s.add_clause([1, 2])
+    True
+    sage: s.add_clause([-1, 3])
+    True
+    sage: s.add_clause([-2, -3])
+    True
+    sage: s.solve()
+    True
+    sage: s.solve([1, 2])
+    False
+"""
+#*****************************************************************************
+# Distributed under the terms of the GNU General Public License (GPL)
+# http://www.gnu.org/licenses/
+#*****************************************************************************
+
+import heapq
+
+class Solver:
+    r"""
+    A CDCL SAT solver.
+
+    Variables are numbered from 1; a literal is a variable number, or its
+    negative for the negated variable.  Internally the literal of variable
+    ``v`` is ``2*v`` and its negation ``2*v + 1``.
+
+    INPUT:
+
+    - ``nvars`` -- (default: 0) the number of variables to start with.
+
+    EXAMPLES::
+
+        sage: from sage.logic.logicsat import Solver
+        sage: s = Solver()
+        sage: s.new_var(), s.new_var()
+        (1, 2)
+        sage: s.add_clause([1, -2])
+        True
+        sage: s.solve([2])
+        True
+        sage: s.model()
+        [1, 2]
+    """
+    def __init__(self, nvars=0):
+        r"""
+        This function initializes the data fields. See :class:`Solver`
+        for full documentation.
+
+        EXAMPLES::
+
+            sage: from sage.logic.logicsat import Solver
+            sage: Solver(4).nvars()
+            4
+        """
+        self.__ok = True
+        self.__watches = [[], []]
+        self.__value = [None, None]
+        self.__level = [0]
+        self.__reason = [None]
+        self.__activity = [0.0]
+        self.__phase = [False]
+        self.__seen = [False]
+        self.__trail = []
+        self.__trail_lim = []
+        self.__qhead = 0
+        self.__heap = []
+        self.__inc = 1.0
+        self.__model = None
+        self.conflicts = 0
+        self.decisions = 0
+        for i in range(nvars):
+            self.new_var()
+
+    def nvars(self):
+        r"""
+        Return the number of variables of this solver.
+
+        EXAMPLES::
+
+            sage: from sage.logic.logicsat import Solver
+            sage: s = Solver(2)
+            sage: s.add_clause([1, 5])
+            True
+            sage: s.nvars()
+            5
+        """
+        return len(self.__level) - 1
+
+    def new_var(self):
+        r"""
+        Add a variable to this solver and return its number.
+
+        EXAMPLES::
+
+            sage: from sage.logic.logicsat import Solver
+            sage: Solver(2).new_var()
+            3
+        """
+        v = len(self.__level)
+        self.__watches.extend([[], []])
+        self.__value.extend([None, None])
+        self.__level.append(0)
+        self.__reason.append(None)
+        self.__activity.append(0.0)
+        self.__phase.append(False)
+        self.__seen.append(False)
+        heapq.heappush(self.__heap, (0.0, v))
+        return v
+
+    def add_clause(self, clause):
+        r"""
+        Add the clause ``clause`` to this solver.
+
+        Variables that do not exist yet are created.  Clauses may be added
+        between calls to :meth:`solve`; the clauses learned so far are
+        kept.
+
+        INPUT:
+
+        - ``clause`` -- a list of literals.
+
+        OUTPUT:
+
+        - Returns ``False`` if the clauses are now known to be
+          unsatisfiable, ``True`` otherwise.
+
+        EXAMPLES::
+
+            sage: from sage.logic.logicsat import Solver
+            sage: s = Solver()
+            sage: s.add_clause([1, -1])
+            True
+            sage: s.add_clause([1])
+            True
+            sage: s.add_clause([-1, 2])
+            True
+            sage: s.add_clause([-2])
+            False
+            sage: s.solve()
+            False
+        """
+        if(not self.__ok):
+            return False
+        lits = set()
+        for l in clause:
+            while(abs(l) > self.nvars()):
+                self.new_var()
+            lits.add(_internal(l))
+        value = self.__value
+        c = []
+        for l in lits:
+            if(l ^ 1 in lits or value[l] is True):
+                return True
+            if(value[l] is None):
+                c.append(l)
+        if(len(c) == 0):
+            self.__ok = False
+        elif(len(c) == 1):
+            self.__enqueue(c[0], None)
+            self.__ok = self.__propagate() is None
+        else:
+            self.__watches[c[0]].append(c)
+            self.__watches[c[1]].append(c)
+        return self.__ok
+
+    def solve(self, assumptions=()):
+        r"""
+        Decide whether the clauses of this solver are satisfiable.
+
+        INPUT:
+
+        - ``assumptions`` -- (default: ``()``) a sequence of literals
+          which must all be true in the solution.
+
+        OUTPUT:
+
+        - Returns ``True`` if there is an assignment satisfying all the
+          clauses and assumptions, which is then given by :meth:`model`,
+          and ``False`` otherwise.
+
+        EXAMPLES::
+
+            sage: from sage.logic.logicsat import Solver
+            sage: s = Solver()
+            sage: for c in [[1, 2, 3], [-1, -2], [-1, -3], [-2, -3]]:
+            ....:     _ = s.add_clause(c)
+            sage: s.solve([-1, -2])
+            True
+            sage: s.model()
+            [-1, -2, 3]
+            sage: s.solve([-1, -2, -3])
+            False
+            sage: s.solve([4])
+            True
+        """
+        self.__model = None
+        if(not self.__ok):
+            return False
+        for l in assumptions:
+            while(abs(l) > self.nvars()):
+                self.new_var()
+        assumptions = [_internal(l) for l in assumptions]
+        if(self.__propagate() is not None):
+            self.__ok = False
+            return False
+        restarts = 0
+        status = None
+        while(status is None):
+            status = self.__search(100 * _luby(restarts), assumptions)
+            restarts += 1
+        self.__cancel_until(0)
+        return status
+
+    def model(self):
+        r"""
+        Return the assignment found by the last successful call to
+        :meth:`solve`, as the list of the true literal of each variable.
+
+        EXAMPLES::
+
+            sage: from sage.logic.logicsat import Solver
+            sage: s = Solver(2)
+            sage: s.add_clause([-1, 2])
+            True
+            sage: s.solve([1])
+            True
+            sage: s.model()
+            [1, 2]
+            sage: s.solve([-2, 1])
+            False
+            sage: s.model() is None
+            True
+        """
+        return self.__model
+
+    def __search(self, budget, assumptions):
+        r"""
+        Search for a solution until ``budget`` conflicts have occurred.
+
+        Returns ``True`` or ``False`` when satisfiability is decided, and
+        ``None`` when the search should be restarted.
+
+        EXAMPLES::
+
+            sage: from sage.logic.logicsat import Solver
+            sage: s = Solver(1)
+            sage: s._Solver__search(10, [])
+            True
+        """
+        value = self.__value
+        trail = self.__trail
+        trail_lim = self.__trail_lim
+        conflicts = 0
+        while(True):
+            confl = self.__propagate()
+            if(confl is not None):
+                conflicts += 1
+                self.conflicts += 1
+                if(len(trail_lim) == 0):
+                    self.__ok = False
+                    return False
+                learnt, level = self.__analyze(confl)
+                self.__cancel_until(level)
+                if(len(learnt) == 1):
+                    self.__enqueue(learnt[0], None)
+                else:
+                    self.__watches[learnt[0]].append(learnt)
+                    self.__watches[learnt[1]].append(learnt)
+                    self.__enqueue(learnt[0], learnt)
+                self.__inc /= 0.95
+                continue
+            if(conflicts >= budget):
+                self.__cancel_until(0)
+                return None
+            lit = None
+            while(len(trail_lim) < len(assumptions)):
+                a = assumptions[len(trail_lim)]
+                if(value[a] is True):
+                    trail_lim.append(len(trail))
+                elif(value[a] is False):
+                    return False
+                else:
+                    lit = a
+                    break
+            if(lit is None):
+                lit = self.__pick_branch()
+                if(lit is None):
+                    self.__model = [_external(l) for l in sorted(trail)]
+                    return True
+                self.decisions += 1
+            trail_lim.append(len(trail))
+            self.__enqueue(lit, None)
+
+    def __enqueue(self, lit, reason):
+        r"""
+        Make the literal ``lit`` true at the current decision level,
+        implied by the clause ``reason``.
+
+        EXAMPLES::
+
+            sage: from sage.logic.logicsat import Solver
+            sage: s = Solver(1)
+            sage: s._Solver__enqueue(3, None)
+            sage: s.solve()
+            True
+            sage: s.model()
+            [-1]
+        """
+        self.__value[lit] = True
+        self.__value[lit ^ 1] = False
+        v = lit >> 1
+        self.__level[v] = len(self.__trail_lim)
+        self.__reason[v] = reason
+        self.__trail.append(lit)
+
+    def __propagate(self):
+        r"""
+        Apply unit propagation to the literals assigned since the last
+        call. Returns a clause whose literals are all false, or ``None``
+        if there is none.
+
+        EXAMPLES::
+
+            sage: from sage.logic.logicsat import Solver
+            sage: s = Solver(2)
+            sage: s.add_clause([-1, 2]), s.add_clause([-1, -2])
+            (True, True)
+            sage: s._Solver__enqueue(2, None)
+            sage: s._Solver__propagate()
+            [5, 3]
+        """
+        value = self.__value
+        watches = self.__watches
+        trail = self.__trail
+        qhead = self.__qhead
+        while(qhead < len(trail)):
+            false_lit = trail[qhead] ^ 1
+            qhead += 1
+            ws = watches[false_lit]
+            kept = watches[false_lit] = []
+            i = 0
+            while(i < len(ws)):
+                c = ws[i]
+                i += 1
+                if(c[0] == false_lit):
+                    c[0] = c[1]
+                    c[1] = false_lit
+                first = c[0]
+                if(value[first] is True):
+                    kept.append(c)
+                    continue
+                for k in xrange(2, len(c)):
+                    if(value[c[k]] is not False):
+                        c[1] = c[k]
+                        c[k] = false_lit
+                        watches[c[1]].append(c)
+                        break
+                else:
+                    kept.append(c)
+                    if(value[first] is False):
+                        kept.extend(ws[i:])
+                        self.__qhead = len(trail)
+                        return c
+                    self.__enqueue(first, c)
+        self.__qhead = qhead
+        return None
+
+    def __analyze(self, confl):
+        r"""
+        Derive from the conflicting clause ``confl`` a learned clause
+        whose first literal is the negation of the first unique
+        implication point. Returns the clause and the decision level to
+        go back to.
+
+        EXAMPLES::
+
+            sage: from sage.logic.logicsat import Solver
+            sage: s = Solver(3)
+            sage: s.add_clause([-1, 2, 3]), s.add_clause([-1, 2, -3])
+            (True, True)
+            sage: s._Solver__trail_lim.append(0)
+            sage: s._Solver__enqueue(2, None)
+            sage: s._Solver__trail_lim.append(1)
+            sage: s._Solver__enqueue(5, None)
+            sage: confl = s._Solver__propagate()
+            sage: s._Solver__analyze(confl)
+            ([4, 3], 1)
+        """
+        seen = self.__seen
+        level = self.__level
+        reason = self.__reason
+        trail = self.__trail
+        current = len(self.__trail_lim)
+        learnt = [None]
+        pending = 0
+        p = None
+        i = len(trail) - 1
+        while(True):
+            for q in confl:
+                v = q >> 1
+                if(q != p and not seen[v] and level[v] > 0):
+                    seen[v] = True
+                    self.__bump(v)
+                    if(level[v] >= current):
+                        pending += 1
+                    else:
+                        learnt.append(q)
+            while(not seen[trail[i] >> 1]):
+                i -= 1
+            p = trail[i]
+            i -= 1
+            confl = reason[p >> 1]
+            seen[p >> 1] = False
+            pending -= 1
+            if(pending == 0):
+                break
+        learnt[0] = p ^ 1
+        #drop literals implied by the others
+        kept = [learnt[0]]
+        for q in learnt[1:]:
+            r = reason[q >> 1]
+            if(r is None):
+                kept.append(q)
+                continue
+            for x in r:
+                if(x != q ^ 1 and not seen[x >> 1] and level[x >> 1] > 0):
+                    kept.append(q)
+                    break
+        for q in learnt:
+            seen[q >> 1] = False
+        back = 0
+        for k in range(1, len(kept)):
+            if(level[kept[k] >> 1] > back):
+                back = level[kept[k] >> 1]
+                kept[1], kept[k] = kept[k], kept[1]
+        return kept, back
+
+    def __bump(self, v):
+        r"""
+        Increase the activity of variable ``v``.
+
+        EXAMPLES::
+
+            sage: from sage.logic.logicsat import Solver
+            sage: s = Solver(2)
+            sage: s._Solver__bump(2)
+            sage: s.solve()
+            True
+            sage: s.decisions
+            2
+        """
+        activity = self.__activity
+        activity[v] += self.__inc
+        if(activity[v] > 1e100):
+            for k in range(len(activity)):
+                activity[k] *= 1e-100
+            self.__inc *= 1e-100
+            self.__rebuild_heap()
+        else:
+            heapq.heappush(self.__heap, (-activity[v], v))
+
+    def __rebuild_heap(self):
+        r"""
+        Rebuild the heap of decision candidates from the unassigned
+        variables.
+
+        EXAMPLES::
+
+            sage: from sage.logic.logicsat import Solver
+            sage: s = Solver(3)
+            sage: s._Solver__rebuild_heap()
+            sage: sorted(s._Solver__heap)
+            [(-0.0, 1), (-0.0, 2), (-0.0, 3)]
+        """
+        value = self.__value
+        activity = self.__activity
+        self.__heap = [(-activity[v], v) for v in range(1, len(activity))
+                       if value[2 * v] is None]
+        heapq.heapify(self.__heap)
+
+    def __pick_branch(self):
+        r"""
+        Return the next decision literal: the unassigned variable of
+        highest activity with its saved phase, or ``None`` if every
+        variable is assigned.
+
+        EXAMPLES::
+
+            sage: from sage.logic.logicsat import Solver
+            sage: s = Solver(2)
+            sage: s._Solver__bump(2)
+            sage: s._Solver__pick_branch()
+            5
+        """
+        heap = self.__heap
+        value = self.__value
+        activity = self.__activity
+        if(len(heap) > 4 * len(activity) + 1000):
+            self.__rebuild_heap()
+            heap = self.__heap
+        while(heap):
+            a, v = heapq.heappop(heap)
+            if(value[2 * v] is None and -a == activity[v]):
+                if(self.__phase[v]):
+                    return 2 * v
+                return 2 * v + 1
+        return None
+
+    def __cancel_until(self, level):
+        r"""
+        Undo all assignments above decision level ``level``, saving the
+        value of each variable as its phase.
+
+        EXAMPLES::
+
+            sage: from sage.logic.logicsat import Solver
+            sage: s = Solver(2)
+            sage: s._Solver__trail_lim.append(0)
+            sage: s._Solver__enqueue(2, None)
+            sage: s._Solver__cancel_until(0)
+            sage: s._Solver__pick_branch()
+            2
+        """
+        trail_lim = self.__trail_lim
+        if(len(trail_lim) <= level):
+            return
+        trail = self.__trail
+        value = self.__value
+        activity = self.__activity
+        lim = trail_lim[level]
+        for lit in trail[lim:]:
+            v = lit >> 1
+            value[lit] = value[lit ^ 1] = None
+            self.__reason[v] = None
+            self.__phase[v] = not (lit & 1)
+            heapq.heappush(self.__heap, (-activity[v], v))
+        del trail[lim:]
+        del trail_lim[level:]
+        self.__qhead = lim
+
+def _internal(lit):
+    r"""
+    Return the internal form of the DIMACS literal ``lit``.
+
+    EXAMPLES::
+
+        sage: import sage.logic.logicsat as logicsat
+        sage: logicsat._internal(3), logicsat._internal(-3)
+        (6, 7)
+    """
+    if(lit > 0):
+        return 2 * lit
+    if(lit < 0):
+        return -2 * lit + 1
+    raise ValueError('0 is not a literal')
+
+def _external(lit):
+    r"""
+    Return the DIMACS form of the internal literal ``lit``.
+
+    EXAMPLES::
+
+        sage: import sage.logic.logicsat as logicsat
+        sage: logicsat._external(6), logicsat._external(7)
+        (3, -3)
+    """
+    if(lit & 1):
+        return -(lit >> 1)
+    return lit >> 1
+
+def _luby(i):
+    r"""
+    Return term ``i`` of the Luby sequence 1, 1, 2, 1, 1, 2, 4, ...
+
+    EXAMPLES::
+
+        sage: import sage.logic.logicsat as logicsat
+        sage: [logicsat._luby(i) for i in range(15)]
+        [1, 1, 2, 1, 1, 2, 4, 1, 1, 2, 1, 1, 2, 4, 8]
+    """
+    size = 1
+    seq = 0
+    while(size < i + 1):
+        seq += 1
+        size = 2 * size + 1
+    while(size - 1 != i):
+        size = (size - 1) >> 1
+        seq -= 1
+        i = i % size
+    return 2 ** seq
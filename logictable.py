@@ -108,50 +108,77 @@ If the second argument is negative, truthtable defaults to the end
 # http://www.gnu.org/licenses/
 #*************************************************************************************
 
+import binascii
+import ctypes
+import mmap
+import multiprocessing
+import multiprocessing.sharedctypes
+import logiceval
+import logicparser
+
 #Global variables
 __table = []
 __vars_order = []
 
-class TruthTable:
-        r"""
-        Creates a truth table defined by the 2-D array ``t`` and the list
-        of variables ``vo`` where each variable occurs only once.
+class TruthTable(object):
+    r"""
+    Creates a truth table defined by the 2-D array ``t`` and the list
+    of variables ``vo`` where each variable occurs only once.
 
-        INPUT:
+    INPUT:
   	
-        - ``self`` -- the calling object.
-        - ``t`` -- a 2-D array containing the table values
-        - ``vo`` -- a list of the variables in the expression in order, 
-          with each variable occurring only once.
-                  
-        OUTPUT:
+    - ``self`` -- the calling object.
+    - ``t`` -- a 2-D array containing the table values, or any other
+      iterable over consecutive rows such as a :class:`TableRows` or a
+      :class:`PackedRows`
+    - ``vo`` -- a list of the variables in the expression in order, 
+      with each variable occurring only once.
+    - ``values`` -- (default: ``None``) the list of the names of the
+      value columns; if ``None``, ``['value']``, or ``['value1',
+      'value2', ...]`` for a :class:`PackedColumns`.
+              
+    OUTPUT:
 		
-        - Effectively returns an instance of this class.
+    - Effectively returns an instance of this class.
 
-        EXAMPLES:
-        
-        This example illustrates the creation of a table.
+    Only the value column of the table is kept, packed one bit per row
+    in a :class:`PackedRows`; the values of the variables follow from
+    the row number.  Rows are rebuilt when they are indexed, printed or
+    listed by :meth:`get_table_list`.  A table of several formulas,
+    made by :func:`multi_truthtable`, keeps one packed column per
+    formula in a :class:`PackedColumns`.
+
+    EXAMPLES:
+    
+    This example illustrates the creation of a table.
 		
-        ::
+    ::
 		
-            sage: import sage.logic.propcalc as propcalc
-            sage: s = propcalc.formula("a&b|~(c|a)")
-            sage: s.truthtable() 
-            a      b      c      value
-            False  False  False  True
-            False  False  True   False
-            False  True   False  True
-            False  True   True   False
-            True   False  False  False
-            True   False  True   False
-            True   True   False  True
-            True   True   True   True
+        sage: import sage.logic.propcalc as propcalc
+        sage: s = propcalc.formula("a&b|~(c|a)")
+        sage: s.truthtable() 
+        a      b      c      value
+        False  False  False  True
+        False  False  True   False
+        False  True   False  True
+        False  True   True   False
+        True   False  False  False
+        True   False  True   False
+        True   True   False  True
+        True   True   True   True
 
-        .. NOTE:: 
+    A table can be indexed by row, counting from its first row::
+
+        sage: from sage.logic.logictable import TruthTable
+        sage: t = TruthTable([[True, False, True], [True, True, False]], ['a', 'b'])
+        sage: len(t), t[0], t[-1]
+        (2, [True, False, True], [True, True, False])
+
+    .. NOTE:: 
 		
-            There should be no errors.
-        """
-    def __init__(self, t, vo):
+        There should be no errors.
+    """
+    def __init__(self, t, vo, values=None):
         r"""
         This function initializes the data fields and is called when a 
         new table is created. See :class:`TruthTable` for full documentation.
@@ -179,8 +206,95 @@ class TruthTable:
 		
             There should be no errors.
         """
+        if(isinstance(t, TableRows)):
+            t = t.pack()
+        elif(not isinstance(t, (PackedRows, PackedColumns))):
+            t = _pack_table(t, vo)
+        if(values is None and isinstance(t, PackedColumns)):
+            values = ['value%d' % (i + 1) for i in range(t.width())]
+        elif(values is None):
+            values = ['value']
         self.__table = t
         self.__vars_order = vo
+        self.__values = values
+
+    def __len__(self):
+        r"""
+        Return the number of rows of this table.
+
+        EXAMPLES::
+
+            sage: from sage.logic.logictable import TableRows, TruthTable
+            sage: len(TruthTable(TableRows(['&', 'a', 'b'], ['a', 'b'], 1), ['a', 'b']))
+            3
+        """
+        return len(self.__table)
+
+    def __getitem__(self, k):
+        r"""
+        Return row ``k`` of this table, counting from 0 at its first row.
+
+        EXAMPLES::
+
+            sage: from sage.logic.logictable import TableRows, TruthTable
+            sage: t = TruthTable(TableRows(['&', 'a', 'b'], ['a', 'b'], 1), ['a', 'b'])
+            sage: t[2]
+            [True, True, True]
+
+        Slicing gives the table of a range of rows without copying::
+
+            sage: t[1:]
+            a      b      value
+            True   False  False
+            True   True   True
+
+        Slice bounds below ``-len(t)`` are clamped to the first row::
+
+            sage: len(t[-5:]), len(t[-4:2])
+            (3, 2)
+        """
+        if(isinstance(k, slice)):
+            return TruthTable(self.__table[k], self.__vars_order, self.__values)
+        return self.__table[k]
+
+    def save(self, filename, formula=''):
+        r"""
+        Write this table to the file ``filename`` in the format read by
+        :func:`open_truthtable`.
+
+        INPUT:
+
+        - ``filename`` -- the name of the file to write.
+        - ``formula`` -- (default: ``''``) the formula of this table, to
+          be recorded in the header of the file.
+
+        EXAMPLES::
+
+            sage: from sage.logic.logictable import TableRows, TruthTable, open_truthtable
+            sage: t = TruthTable(TableRows(['|', 'a', 'b'], ['a', 'b']), ['a', 'b'])
+            sage: filename = tmp_filename()
+            sage: t.save(filename, 'a|b')
+            sage: open_truthtable(filename).get_table_list() == t.get_table_list()
+            True
+
+        Only tables with one value column can be saved::
+
+            sage: from sage.logic.logictable import multi_truthtable
+            sage: multi_truthtable(['a', 'b'], ['a', 'b']).save(filename)
+            Traceback (most recent call last):
+            ...
+            ValueError: only tables with one value column can be saved
+        """
+        if(isinstance(self.__table, PackedColumns)):
+            raise ValueError('only tables with one value column can be saved')
+        start, end = self.__table.row_range()
+        f = open(filename, 'wb')
+        try:
+            _write_header(f, self.__vars_order, formula, start, end)
+            for data in self.__table.packed_bytes():
+                f.write(data)
+        finally:
+            f.close()
 
     def _latex_(self):
         r"""
@@ -207,22 +321,28 @@ class TruthTable:
             sage: latex(s.truthtable(2, 1))
             \\\begin{tabular}{llll}human & monkey & man & value \\\hli\end{tabular}
         """
-        vars_len = []
-        rt = s = ""
-        self.__vars_order.reverse()
-        s = r'\\\begin{tabular}{' 
-        s += 'l' * (len(self.__vars_order) + 1) + '}'
-        for var in self.__vars_order: 
+        return ''.join(self._latex_pieces())[:-3] + r'\end{tabular}'
+
+    def _latex_pieces(self):
+        r"""
+        Iterate over the pieces of the `\LaTeX` representation of this
+        table, producing one row at a time.
+
+        EXAMPLES::
+
+            sage: from sage.logic.logictable import TruthTable
+            sage: t = TruthTable([[False, True, True]], ['a', 'b'])
+            sage: list(t._latex_pieces())
+            ['\\\\\\begin{tabular}{lll}b & a & value \\\\\\hline ', 'False & True & True \\\\']
+        """
+        vo = self.__vars_order[::-1]
+        s = r'\\\begin{tabular}{'
+        s += 'l' * (len(vo) + len(self.__values)) + '}'
+        for var in vo:
             s += var + ' & '
-        rt += s + r'value \\' + r'\hline '
+        yield s + ' & '.join(self.__values) + r' \\' + r'\hline '
         for row in self.__table:
-            s = ""
-            for i in row:
-                s += str(i) + ' & '
-            rt += s[:-3] + r' \\'
-        rt = rt[:-3] + r'\end{tabular}'
-        self.__vars_order.reverse()
-        return rt
+            yield ' & '.join([str(i) for i in row]) + r' \\'
 
     def __repr__(self):
         r"""
@@ -259,16 +379,39 @@ class TruthTable:
 			
         There should be no errors.
         """        
+        return ''.join(self._repr_lines())
+
+    def _repr_lines(self):
+        r"""
+        Iterate over the lines of the string representation of this
+        table, producing one row at a time.
+
+        EXAMPLES::
+
+            sage: from sage.logic.logictable import TruthTable
+            sage: t = TruthTable([[False, True, True]], ['a', 'b'])
+            sage: list(t._repr_lines())
+            ['a      b      value\n', 'False  True   True   \n']
+            sage: t = TruthTable([[False, True, True]], ['a', 'b'], ['longer_name'])
+            sage: list(t._repr_lines())
+            ['a      b      longer_name\n', 'False  True   True   \n']
+
+        The variables and the names of the values may be any sequences::
+
+            sage: t = TruthTable([[False, True, True]], ('a', 'b'), ('value',))
+            sage: list(t._repr_lines())
+            ['a      b      value\n', 'False  True   True   \n']
+        """
         vars_len = []
-        line = rt = s = ""
-        for var in self.__vars_order:
+        line = s = ""
+        for var in list(self.__vars_order) + list(self.__values[:-1]):
             vars_len.append(len(var))
             s = var + ' '
             while(len(s) < len('False ')):
                 s += ' '
             s += ' '
-            line += s  
-        rt += line + 'value\n'
+            line += s
+        yield line + self.__values[-1] + '\n'
         for row in self.__table:
             line = s = ""
             i = 0
@@ -281,11 +424,10 @@ class TruthTable:
                 if(i < len(vars_len)):
                     while(len(s) <= vars_len[i]):
                         s += ' '
-                s += ' ' 
+                s += ' '
                 line += s
                 i += 1
-            rt += line + '\n'
-        return rt
+            yield line + '\n'
 
     def get_table_list(self):
         r"""
@@ -306,6 +448,784 @@ class TruthTable:
             sage: s.truthtable().get_table_list()
             [['man', 'monkey', 'human'], [False, False, False, True], [False, False, True, True], [False, True, False, True], [False, True, True, True], [True, False, False, False], [True, False, True, False], [True, True, False, False], [True, True, True, True]]
         """        
-        t = self.__table[:]
+        t = list(self.__table)
         t.insert(0, self.__vars_order)
         return t
+
+def _pack_table(t, vo):
+    r"""
+    Return the :class:`PackedRows` holding the consecutive rows ``t`` of
+    the table with variables ``vo``.
+
+    The first row fixes the row number of the table; the values may be
+    booleans or the strings ``'True'`` and ``'False'``.
+
+    EXAMPLES::
+
+        sage: import sage.logic.logictable as logictable
+        sage: list(logictable._pack_table([[True, False, True], [True, True, 'False']], ['a', 'b']))
+        [[True, False, True], [True, True, False]]
+    """
+    bits = bytearray()
+    start = k = 0
+    for row in t:
+        if(k == 0):
+            for e in row[:-1]:
+                start = 2 * start + (e == True or e == 'True')
+        if(k & 7 == 0):
+            bits.append(0)
+        if(row[-1] == True or row[-1] == 'True'):
+            bits[-1] |= 1 << (k & 7)
+        k += 1
+    return PackedRows(bits, vo, start, start + k)
+
+class TableRows:
+    r"""
+    The rows of the truth table of a parse tree, computed on demand.
+
+    Iterating over an instance evaluates the rows ``start`` to ``end - 1``
+    one at a time, so a :class:`TruthTable` built from it can be printed
+    any number of times without ever holding the table in memory.  Each
+    row is a list of booleans, the values of the variables followed by
+    the value of the tree, in the same order as a full table.
+
+    INPUT:
+
+    - ``tree`` -- a parse tree as produced by
+      :func:`sage.logic.logicparser.parse`.
+    - ``vo`` -- a list of the variables in ``tree`` in order, with each
+      variable occurring only once.
+    - ``start`` -- (default: 0) the first row; a negative value is
+      converted to 0.
+    - ``end`` -- (default: -1) the row after the last one; a negative
+      value, or one past the end of the table, is converted to ``2^n``.
+    - ``algorithm`` -- (default: ``'compiled'``) passed on to
+      :func:`sage.logic.logiceval.column`.
+
+    EXAMPLES::
+
+        sage: from sage.logic.logictable import TableRows, TruthTable
+        sage: rows = TableRows(['->', 'a', 'b'], ['a', 'b'], 1, 3)
+        sage: len(rows)
+        2
+        sage: list(rows)
+        [[False, True, True], [True, False, False]]
+        sage: TruthTable(rows, ['a', 'b'])
+        a      b      value
+        False  True   True
+        True   False  False
+    """
+    def __init__(self, tree, vo, start=0, end=-1, algorithm='compiled'):
+        r"""
+        This function initializes the data fields. See :class:`TableRows`
+        for full documentation.
+
+        EXAMPLES::
+
+            sage: from sage.logic.logictable import TableRows
+            sage: list(TableRows(['&', 'a', 'b'], ['a', 'b'], 9, -1))
+            []
+        """
+        self.__tree = tree
+        self.__vars_order = vo
+        self.__start, self.__end = _row_range(vo, start, end)
+        self.__algorithm = algorithm
+
+    def pack(self):
+        r"""
+        Return these rows as a :class:`PackedRows`.
+
+        The values are computed with
+        :func:`sage.logic.logiceval.eval_bitmask`, a bounded number of
+        rows at a time.
+
+        EXAMPLES::
+
+            sage: from sage.logic.logictable import TableRows
+            sage: rows = TableRows(['->', 'a', 'b'], ['a', 'b'], 1)
+            sage: list(rows.pack()) == list(rows)
+            True
+        """
+        start, end = self.__start, self.__end
+        bits = bytearray((end - start + 7) // 8)
+        for first in logiceval.row_numbers(start, end, 1 << 20):
+            data = _pack_rows(self.__tree, self.__vars_order, first,
+                              min(first + (1 << 20), end))
+            bits[(first - start) // 8:(first - start) // 8 + len(data)] = data
+        return PackedRows(bits, self.__vars_order, start, end)
+
+    def __len__(self):
+        r"""
+        Return the number of rows.
+
+        EXAMPLES::
+
+            sage: from sage.logic.logictable import TableRows
+            sage: len(TableRows(['&', 'a', 'b'], ['a', 'b']))
+            4
+        """
+        return int(self.__end - self.__start)
+
+    def __iter__(self):
+        r"""
+        Iterate over the rows, evaluating each one as it is needed.
+
+        EXAMPLES::
+
+            sage: from sage.logic.logictable import TableRows
+            sage: list(TableRows(['|', 'a', 'b'], ['a', 'b'], 2))
+            [[True, False, True], [True, True, True]]
+        """
+        vo = self.__vars_order
+        values = logiceval.column(self.__tree, vo, self.__start,
+                                  self.__end, self.__algorithm)
+        shifts = range(len(vo) - 1, -1, -1)
+        for i in logiceval.row_numbers(self.__start, self.__end):
+            row = [(i >> j) & 1 == 1 for j in shifts]
+            row.append(values.next())
+            yield row
+
+
+class PackedRows(object):
+    r"""
+    The rows of a truth table stored as its packed value column.
+
+    Only the values are stored, one bit per row: the value of row
+    ``start + k`` is bit ``k % 8`` of byte ``k // 8`` of ``bits``.  The
+    values of the variables follow from the row number, so each row is
+    rebuilt only when it is asked for.
+
+    INPUT:
+
+    - ``bits`` -- a sequence of byte values, such as a ``bytearray`` or a
+      shared ``ctypes`` array of unsigned bytes.
+    - ``vo`` -- a list of the variables in order, with each variable
+      occurring only once.
+    - ``start`` -- (default: 0) the row of the first bit.
+    - ``end`` -- (default: -1) the row after the last one, converted as
+      in :class:`TableRows`.
+    - ``offset`` -- (default: 0) the bit of ``bits`` holding the value
+      of row ``start``, so that a slice of a table can share its bits.
+
+    EXAMPLES::
+
+        sage: from sage.logic.logictable import PackedRows
+        sage: rows = PackedRows(bytearray([0b1011]), ['a', 'b'])
+        sage: len(rows), rows[2]
+        (4, [True, False, False])
+        sage: list(rows)
+        [[False, False, True], [False, True, True], [True, False, False], [True, True, True]]
+    """
+    def __init__(self, bits, vo, start=0, end=-1, offset=0):
+        r"""
+        This function initializes the data fields. See :class:`PackedRows`
+        for full documentation.
+
+        EXAMPLES::
+
+            sage: from sage.logic.logictable import PackedRows
+            sage: list(PackedRows(bytearray([1]), ['a', 'b'], 3))
+            [[True, True, True]]
+        """
+        self.__bits = bits
+        self.__vars_order = vo
+        self.__start, self.__end = _row_range(vo, start, end)
+        self.__offset = offset
+
+    def row_range(self):
+        r"""
+        Return the pair ``(start, end)`` of the first row and the row
+        after the last one.
+
+        EXAMPLES::
+
+            sage: from sage.logic.logictable import PackedRows
+            sage: PackedRows(bytearray(1), ['a', 'b'], 1, 3).row_range()
+            (1, 3)
+        """
+        return self.__start, self.__end
+
+    def packed_bytes(self, size=1 << 17):
+        r"""
+        Iterate over the packed values of these rows, at most ``size``
+        bytes at a time, with the value of the first row in the lowest
+        bit of the first byte.
+
+        EXAMPLES::
+
+            sage: from sage.logic.logictable import PackedRows
+            sage: rows = PackedRows(bytearray([0b10110100, 1]), ['a', 'b', 'c', 'd'], 0, 9)
+            sage: list(rows.packed_bytes())
+            ['\xb4\x01']
+            sage: list(rows[2:].packed_bytes())
+            ['m']
+        """
+        bits, offset = self.__bits, self.__offset
+        shift = offset & 7
+        for first in xrange(0, len(self), 8 * size):
+            last = min(first + 8 * size, len(self))
+            lo = (offset + first) >> 3
+            hi = (offset + last + 7) >> 3
+            data = bytearray(bits[lo:hi])
+            if(shift):
+                x = int(binascii.hexlify(str(data[::-1])), 16) >> shift
+                data = bytearray(_to_bytes(x, len(data)))
+            data = data[:(last - first + 7) >> 3]
+            if(len(data) > 0 and (last - first) & 7):
+                data[-1] &= (1 << ((last - first) & 7)) - 1
+            yield str(data)
+
+    def __len__(self):
+        r"""
+        Return the number of rows.
+
+        EXAMPLES::
+
+            sage: from sage.logic.logictable import PackedRows
+            sage: len(PackedRows(bytearray(1), ['a', 'b', 'c'], 2, 7))
+            5
+        """
+        return int(self.__end - self.__start)
+
+    def __getitem__(self, k):
+        r"""
+        Return row ``k`` of this table, counting from 0 at ``start``.
+
+        If ``k`` is a slice, the rows it selects are returned as a
+        :class:`PackedRows` sharing the same bits.
+
+        EXAMPLES::
+
+            sage: from sage.logic.logictable import PackedRows
+            sage: rows = PackedRows(bytearray([2]), ['a', 'b'], 1)
+            sage: rows[1], rows[-1]
+            ([True, False, True], [True, True, False])
+            sage: list(rows[1:])
+            [[True, False, True], [True, True, False]]
+            sage: len(rows[-5:]), len(rows[-4:2])
+            (3, 2)
+        """
+        if(isinstance(k, slice)):
+            first, last, step = k.indices(len(self))
+            if(step != 1):
+                raise ValueError('only contiguous rows can be sliced')
+            last = max(first, last)
+            return PackedRows(self.__bits, self.__vars_order,
+                              self.__start + first, self.__start + last,
+                              self.__offset + first)
+        if(k < 0):
+            k += len(self)
+        if(k < 0 or k >= len(self)):
+            raise IndexError('row index out of range')
+        i = self.__start + k
+        n = len(self.__vars_order)
+        row = [(i >> j) & 1 == 1 for j in range(n - 1, -1, -1)]
+        k += self.__offset
+        row.append((self.__bits[k >> 3] >> (k & 7)) & 1 == 1)
+        return row
+
+    def __iter__(self):
+        r"""
+        Iterate over the rows.
+
+        EXAMPLES::
+
+            sage: from sage.logic.logictable import PackedRows
+            sage: list(PackedRows(bytearray([1]), ['a'], 0, 2))
+            [[False, True], [True, False]]
+        """
+        for k in xrange(len(self)):
+            yield self[k]
+
+class PackedColumns(object):
+    r"""
+    The rows of a truth table with several value columns, each stored as
+    a :class:`PackedRows` over the same rows.
+
+    A row is the list of the values of the variables followed by the
+    value in each column.
+
+    INPUT:
+
+    - ``columns`` -- a nonempty list of :class:`PackedRows` with the same
+      variables and rows.
+    - ``vo`` -- a list of the variables in order, with each variable
+      occurring only once.
+
+    EXAMPLES::
+
+        sage: from sage.logic.logictable import PackedColumns, PackedRows
+        sage: rows = PackedColumns([PackedRows(bytearray([8]), ['a', 'b']),
+        ....:                       PackedRows(bytearray([14]), ['a', 'b'])], ['a', 'b'])
+        sage: len(rows), rows.width(), rows[1]
+        (4, 2, [False, True, False, True])
+        sage: list(rows[2:])
+        [[True, False, False, True], [True, True, True, True]]
+    """
+    def __init__(self, columns, vo):
+        r"""
+        This function initializes the data fields. See
+        :class:`PackedColumns` for full documentation.
+
+        EXAMPLES::
+
+            sage: from sage.logic.logictable import PackedColumns, PackedRows
+            sage: PackedColumns([PackedRows(bytearray(1), ['a'])], ['a']).width()
+            1
+        """
+        self.__columns = columns
+        self.__vars_order = vo
+
+    def width(self):
+        r"""
+        Return the number of value columns.
+
+        EXAMPLES::
+
+            sage: from sage.logic.logictable import PackedColumns, PackedRows
+            sage: PackedColumns([PackedRows(bytearray(1), ['a'])] * 3, ['a']).width()
+            3
+        """
+        return len(self.__columns)
+
+    def column(self, i):
+        r"""
+        Return the value column ``i`` as a :class:`PackedRows`.
+
+        EXAMPLES::
+
+            sage: from sage.logic.logictable import PackedColumns, PackedRows
+            sage: rows = PackedColumns([PackedRows(bytearray([8]), ['a', 'b']),
+            ....:                       PackedRows(bytearray([14]), ['a', 'b'])], ['a', 'b'])
+            sage: list(rows.column(1))
+            [[False, False, False], [False, True, True], [True, False, True], [True, True, True]]
+        """
+        return self.__columns[i]
+
+    def row_range(self):
+        r"""
+        Return the pair ``(start, end)`` of the first row and the row
+        after the last one.
+
+        EXAMPLES::
+
+            sage: from sage.logic.logictable import PackedColumns, PackedRows
+            sage: PackedColumns([PackedRows(bytearray(1), ['a', 'b'], 1, 3)], ['a', 'b']).row_range()
+            (1, 3)
+        """
+        return self.__columns[0].row_range()
+
+    def __len__(self):
+        r"""
+        Return the number of rows.
+
+        EXAMPLES::
+
+            sage: from sage.logic.logictable import PackedColumns, PackedRows
+            sage: len(PackedColumns([PackedRows(bytearray(1), ['a', 'b'], 1)], ['a', 'b']))
+            3
+        """
+        return len(self.__columns[0])
+
+    def __getitem__(self, k):
+        r"""
+        Return row ``k`` of this table, counting from 0 at its first row.
+
+        If ``k`` is a slice, the rows it selects are returned as a
+        :class:`PackedColumns` sharing the same bits.
+
+        EXAMPLES::
+
+            sage: from sage.logic.logictable import PackedColumns, PackedRows
+            sage: rows = PackedColumns([PackedRows(bytearray([2]), ['a']),
+            ....:                       PackedRows(bytearray([3]), ['a'])], ['a'])
+            sage: rows[-1], len(rows[:1]), len(rows[-3:])
+            ([True, True, True], 1, 2)
+        """
+        if(isinstance(k, slice)):
+            return PackedColumns([c[k] for c in self.__columns], self.__vars_order)
+        row = self.__columns[0][k]
+        for c in self.__columns[1:]:
+            row.append(c[k][-1])
+        return row
+
+    def __iter__(self):
+        r"""
+        Iterate over the rows.
+
+        EXAMPLES::
+
+            sage: from sage.logic.logictable import PackedColumns, PackedRows
+            sage: list(PackedColumns([PackedRows(bytearray([1]), ['a'])] * 2, ['a']))
+            [[False, True, True], [True, False, False]]
+        """
+        for k in xrange(len(self)):
+            yield self[k]
+
+def multi_truthtable(trees, vo, start=0, end=-1, values=None):
+    r"""
+    This function builds the truth table of several parse trees over the
+    same variables, with one value column per tree.
+
+    The trees are merged into one directed acyclic graph by
+    :func:`sage.logic.logicparser.intern_tree`, so a subformula common to
+    several trees is a single node.  The rows are then enumerated once:
+    :func:`sage.logic.logiceval.eval_bitmasks` evaluates every node of
+    the graph a bounded number of rows at a time, and the packed values
+    of each tree go to its own column.
+
+    INPUT:
+
+    - ``trees`` -- a list of parse trees as produced by
+      :func:`sage.logic.logicparser.parse`.
+    - ``vo`` -- a list of the variables in the trees in order, with each
+      variable occurring only once.
+    - ``start`` -- (default: 0) the first row.
+    - ``end`` -- (default: -1) the row after the last one, converted as
+      in :class:`TableRows`.
+    - ``values`` -- (default: ``None``) the names of the value columns,
+      as for :class:`TruthTable`.
+
+    OUTPUT:
+
+    - Returns a :class:`TruthTable` over a :class:`PackedColumns`.
+
+    EXAMPLES::
+
+        sage: from sage.logic.logictable import multi_truthtable
+        sage: t = multi_truthtable([['&', 'a', 'b'], ['|', 'a', 'b'], ['->', ['&', 'a', 'b'], 'c']],
+        ....:                      ['a', 'b', 'c'], 4, values=['and', 'or', 'implies'])
+        sage: t
+        a      b      c      and    or     implies
+        True   False  False  False  True   True
+        True   False  True   False  True   True
+        True   True   False  True   True   False
+        True   True   True   True   True   True
+        sage: t[2]
+        [True, True, False, True, True, False]
+    """
+    trees = [logicparser.intern_tree(tree) for tree in trees]
+    start, end = _row_range(vo, start, end)
+    size = (end - start + 7) // 8
+    columns = [bytearray(size) for tree in trees]
+    for first in logiceval.row_numbers(start, end, 1 << 20):
+        last = min(first + (1 << 20), end)
+        lo = (first - start) // 8
+        for bits, x in zip(columns, logiceval.eval_bitmasks(trees, vo, first, last)):
+            data = _to_bytes(x, (last - first + 7) // 8)
+            bits[lo:lo + len(data)] = data
+    columns = [PackedRows(bits, vo, start, end) for bits in columns]
+    return TruthTable(PackedColumns(columns, vo), vo, values)
+
+def parallel_truthtable(tree, vo, start=0, end=-1, processes=None):
+    r"""
+    This function builds the truth table of ``tree`` with a pool of
+    worker processes.
+
+    The rows ``start`` to ``end - 1`` are split into shards whose sizes
+    are multiples of 8 rows.  Each worker evaluates a shard with
+    :func:`sage.logic.logiceval.eval_bitmask` and copies the packed bits
+    straight into a buffer in shared memory, so no rows are pickled and
+    no two workers write the same byte.
+
+    INPUT:
+
+    - ``tree`` -- a parse tree as produced by
+      :func:`sage.logic.logicparser.parse`.
+    - ``vo`` -- a list of the variables in ``tree`` in order, with each
+      variable occurring only once.
+    - ``start`` -- (default: 0) the first row.
+    - ``end`` -- (default: -1) the row after the last one, converted as
+      in :class:`TableRows`.
+    - ``processes`` -- (default: ``None``) the number of worker processes;
+      ``None`` means one per CPU.
+
+    OUTPUT:
+
+    - Returns a :class:`TruthTable` over a :class:`PackedRows`.
+
+    EXAMPLES::
+
+        sage: from sage.logic.logictable import parallel_truthtable
+        sage: parallel_truthtable(['->', 'a', 'b'], ['a', 'b'], processes=2)
+        a      b      value
+        False  False  True
+        False  True   True
+        True   False  False
+        True   True   True
+    """
+    start, end = _row_range(vo, start, end)
+    size = (end - start + 7) // 8
+    bits = multiprocessing.sharedctypes.RawArray(ctypes.c_ubyte, max(size, 1))
+    if(end > start):
+        if(processes is None):
+            processes = multiprocessing.cpu_count()
+        shard = -(-(end - start) // (4 * processes))
+        shard = min(max(shard + (-shard) % 8, 8), 1 << 22)
+        shards = [(first, min(first + shard, end))
+                  for first in logiceval.row_numbers(start, end, shard)]
+        pool = multiprocessing.Pool(processes, _init_shard,
+                                    (bits, tree, vo, start))
+        try:
+            pool.map(_fill_shard, shards)
+        finally:
+            pool.close()
+            pool.join()
+    return TruthTable(PackedRows(bits, vo, start, end), vo)
+
+#State of a worker process of parallel_truthtable
+__shard = None
+
+def _init_shard(bits, tree, vo, start):
+    r"""
+    Store the shared buffer and the table being built in the worker
+    process calling this function.
+
+    EXAMPLES::
+
+        sage: import sage.logic.logictable as logictable
+        sage: logictable._init_shard(bytearray(1), ['&', 'a', 'b'], ['a', 'b'], 0)
+    """
+    global __shard
+    __shard = (bits, tree, vo, start)
+
+def _fill_shard(rows):
+    r"""
+    Evaluate the rows ``rows[0]`` to ``rows[1] - 1`` of the table set up
+    by :func:`_init_shard` and copy their packed bits into the shared
+    buffer.
+
+    EXAMPLES::
+
+        sage: import ctypes, sage.logic.logictable as logictable
+        sage: bits = (ctypes.c_ubyte * 1)()
+        sage: logictable._init_shard(bits, ['|', 'a', 'b'], ['a', 'b'], 0)
+        sage: logictable._fill_shard((0, 4))
+        sage: bits[0]
+        14
+    """
+    bits, tree, vo, start = __shard
+    first, last = rows
+    data = _pack_rows(tree, vo, first, last)
+    ctypes.memmove(ctypes.addressof(bits) + (first - start) // 8, data, len(data))
+
+def _pack_rows(tree, vo, first, last):
+    r"""
+    Return the values of ``tree`` in the rows ``first`` to ``last - 1``
+    packed into bytes, the first row in the lowest bit.
+
+    EXAMPLES::
+
+        sage: import sage.logic.logictable as logictable
+        sage: logictable._pack_rows(['|', 'a', 'b'], ['a', 'b'], 0, 4)
+        '\x0e'
+    """
+    return _to_bytes(logiceval.eval_bitmask(tree, vo, first, last),
+                     (last - first + 7) // 8)
+
+def _to_bytes(x, size):
+    r"""
+    Return the ``size`` bytes of the nonnegative integer ``x``, lowest
+    byte first.
+
+    EXAMPLES::
+
+        sage: import sage.logic.logictable as logictable
+        sage: logictable._to_bytes(0x1234, 3)
+        '4\x12\x00'
+    """
+    return binascii.unhexlify(('%x' % x).zfill(2 * size))[::-1]
+
+def _row_range(vo, start, end):
+    r"""
+    Return the rows ``(start, end)`` of the table with variables ``vo``,
+    after converting a negative ``start`` to 0 and a negative or too
+    large ``end`` to the number of rows.
+
+    EXAMPLES::
+
+        sage: import sage.logic.logictable as logictable
+        sage: logictable._row_range(['a', 'b'], -1, -2), logictable._row_range(['a', 'b'], 9, 5)
+        ((0, 4), (4, 4))
+    """
+    n = 2 ** len(vo)
+    if(end < 0 or end > n):
+        end = n
+    start = min(max(start, 0), n)
+    return start, max(start, end)
+
+#Format of the files written by write_truthtable and TruthTable.save
+__magic = 'LOGICTABLE 1'
+__data_align = 64
+
+def write_truthtable(filename, tree, vo, start=0, end=-1, formula='',
+                     algorithm='bitmask'):
+    r"""
+    This function writes the truth table of ``tree`` straight to the
+    file ``filename``, without building it in memory.
+
+    The file starts with a text header, one ``key value`` pair per line
+    and ended by an empty line, holding the variables, the formula and
+    the row range.  After padding to a multiple of 64 bytes come the
+    values of the rows, packed one bit per row with the first row in the
+    lowest bit of the first byte.  The values are computed and written a
+    bounded number of rows at a time.
+
+    INPUT:
+
+    - ``filename`` -- the name of the file to write.
+    - ``tree`` -- a parse tree as produced by
+      :func:`sage.logic.logicparser.parse`.
+    - ``vo`` -- a list of the variables in ``tree`` in order, with each
+      variable occurring only once.
+    - ``start`` -- (default: 0) the first row.
+    - ``end`` -- (default: -1) the row after the last one, converted as
+      in :class:`TableRows`.
+    - ``formula`` -- (default: ``''``) the formula of ``tree``, to be
+      recorded in the header.
+    - ``algorithm`` -- (default: ``'bitmask'``) ``'bitmask'`` to use
+      :func:`sage.logic.logiceval.eval_bitmask` or ``'numpy'`` to use
+      :func:`sage.logic.logiceval.eval_chunks`.
+
+    EXAMPLES::
+
+        sage: from sage.logic.logictable import write_truthtable, open_truthtable
+        sage: filename = tmp_filename()
+        sage: write_truthtable(filename, ['&', 'a', 'b'], ['a', 'b'], 1, formula='a&b')
+        sage: open(filename).read(49)
+        'LOGICTABLE 1\nvars a b\nformula a&b\nstart 1\nend 4\n\n'
+        sage: open_truthtable(filename)
+        a      b      value
+        False  True   False
+        True   False  False
+        True   True   True
+
+    Both algorithms write the same file, with the unused bits of the
+    last byte cleared::
+
+        sage: write_truthtable(filename, ['|', 'a', 'b'], ['a', 'b'], 1, algorithm='numpy')
+        sage: data = open(filename, 'rb').read()
+        sage: write_truthtable(filename, ['|', 'a', 'b'], ['a', 'b'], 1)
+        sage: open(filename, 'rb').read() == data, ord(data[-1])
+        (True, 7)
+    """
+    start, end = _row_range(vo, start, end)
+    f = open(filename, 'wb')
+    try:
+        _write_header(f, vo, formula, start, end)
+        if(algorithm == 'bitmask'):
+            for first in logiceval.row_numbers(start, end, 1 << 20):
+                f.write(_pack_rows(tree, vo, first, min(first + (1 << 20), end)))
+        elif(algorithm == 'numpy'):
+            import numpy
+            for first, values in logiceval.eval_chunks(tree, vo, start, end):
+                n = len(values)
+                values = numpy.resize(values, (n + 7) // 8 * 8)
+                values[n:] = False
+                f.write(numpy.packbits(values.reshape(-1, 8)[:, ::-1]).tobytes())
+        else:
+            raise ValueError("algorithm must be 'bitmask' or 'numpy'")
+    finally:
+        f.close()
+
+def open_truthtable(filename):
+    r"""
+    This function opens a truth table written by :func:`write_truthtable`
+    or :meth:`TruthTable.save`.
+
+    The file is mapped into memory with ``mmap`` and the values are read
+    from the mapping as they are needed, so opening a file is immediate
+    and several processes can share one table.
+
+    INPUT:
+
+    - ``filename`` -- the name of the file to read.
+
+    OUTPUT:
+
+    - Returns a :class:`TruthTable`. Its rows can be indexed and sliced
+      without reading the rest of the file.
+
+    EXAMPLES::
+
+        sage: from sage.logic.logictable import write_truthtable, open_truthtable
+        sage: filename = tmp_filename()
+        sage: write_truthtable(filename, ['->', 'a', ['|', 'b', 'c']], ['a', 'b', 'c'])
+        sage: t = open_truthtable(filename)
+        sage: len(t), t[4]
+        (8, [True, False, False, False])
+        sage: t[5:7]
+        a      b      c      value
+        True   False  True   True
+        True   True   False  True
+    """
+    vo, formula, start, end, offset = read_header(filename)
+    size = (end - start + 7) // 8
+    f = open(filename, 'rb')
+    try:
+        if(size == 0):
+            bits = bytearray()
+        else:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+            bits = (ctypes.c_ubyte * size).from_buffer(mm, offset)
+    finally:
+        f.close()
+    return TruthTable(PackedRows(bits, vo, start, end), vo)
+
+def read_header(filename):
+    r"""
+    This function reads the header of a file written by
+    :func:`write_truthtable` or :meth:`TruthTable.save`.
+
+    INPUT:
+
+    - ``filename`` -- the name of the file to read.
+
+    OUTPUT:
+
+    - Returns the tuple ``(vo, formula, start, end, offset)`` of the
+      variables, the formula, the row range and the position of the
+      packed values in the file.
+
+    EXAMPLES::
+
+        sage: from sage.logic.logictable import write_truthtable, read_header
+        sage: filename = tmp_filename()
+        sage: write_truthtable(filename, ['^', 'p', 'q'], ['p', 'q'], formula='p^q')
+        sage: read_header(filename)
+        (['p', 'q'], 'p^q', 0, 4, 64)
+    """
+    f = open(filename, 'rb')
+    try:
+        lines = [f.readline()]
+        while(lines[-1] not in ('\n', '')):
+            lines.append(f.readline())
+    finally:
+        f.close()
+    if(lines[0] != __magic + '\n' or lines[-1] != '\n'):
+        raise ValueError('%s is not a truth table file' % filename)
+    header = {}
+    for line in lines[1:-1]:
+        key, sep, value = line[:-1].partition(' ')
+        header[key] = value
+    offset = sum([len(line) for line in lines])
+    offset += -offset % __data_align
+    return (header['vars'].split(), header['formula'],
+            int(header['start']), int(header['end']), offset)
+
+def _write_header(f, vo, formula, start, end):
+    r"""
+    Write to the file ``f`` the header of a truth table with variables
+    ``vo``, formula ``formula`` and rows ``start`` to ``end - 1``.
+
+    EXAMPLES::
+
+        sage: import StringIO, sage.logic.logictable as logictable
+        sage: f = StringIO.StringIO()
+        sage: logictable._write_header(f, ['a'], 'a', 0, 2)
+        sage: len(f.getvalue()), f.getvalue().rstrip('\0')
+        (64, 'LOGICTABLE 1\nvars a\nformula a\nstart 0\nend 2\n\n')
+    """
+    header = '%s\nvars %s\nformula %s\nstart %d\nend %d\n\n' % (
+        __magic, ' '.join(vo), ' '.join(formula.split('\n')), start, end)
+    f.write(header + '\0' * (-len(header) % __data_align))